@@ -0,0 +1,242 @@
+"""
+cli.py
+
+Headless command-line entry point for bulk shop operations, for cron jobs
+and scripts. Never imports tkinter; uses the same pooled connections and
+settings (.env) as the GUI.
+
+Usage:
+    python cli.py import-customers FILE
+    python cli.py export-customers FILE
+    python cli.py export-analytics DIR [--full] [--table NAME ...]
+    python cli.py metrics [--json]
+    python cli.py archive [--older-than-days N] [--batch-size N]
+    python cli.py notify
+    python cli.py report [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+    python cli.py migrate [--list]
+    python cli.py reconcile-counters
+
+Progress goes to stderr, results to stdout.
+
+Scheduled maintenance runs from cron on one machine, never from the GUI
+terminals, e.g.:
+    30 2 * * *  python cli.py archive
+    15 * * * *  python cli.py reconcile-counters
+
+Exit status:
+    0 success, 1 failed, 2 bad arguments, 3 database (or mail server) unreachable,
+    4 partly failed (e.g. some emails not sent), 5 optional package missing.
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import logging
+import sys
+
+from config import get_settings
+from database import (
+    CustomerManager,
+    DatabaseError,
+    DatabaseUnavailableError,
+    export_analytics,
+    get_work_order_metrics,
+    get_customer_metrics,
+    archive_closed_work_orders,
+    rebuild_work_order_counters,
+    get_technician_report,
+    pending_migrations,
+    run_migrations,
+    ANALYTICS_TABLES,
+)
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2  # argparse's own exit status
+EXIT_UNAVAILABLE = 3
+EXIT_PARTIAL = 4
+EXIT_MISSING_DEPENDENCY = 5
+
+
+def _progress(label):
+    """Progress callback printing running counts to stderr."""
+    def report(count):
+        print(f"{label}: {count}", file=sys.stderr, flush=True)
+    return report
+
+
+def _date(text):
+    try:
+        return datetime.datetime.strptime(text, "%Y-%m-%d")
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {text!r}") from e
+
+
+# --- Subcommands -------------------------------------------------------------
+def cmd_import_customers(args):
+    count = CustomerManager.import_customers_from_csv(
+        args.file, chunk_size=args.chunk_size, progress=_progress("imported")
+    )
+    print(f"Imported {count} customers from {args.file}.")
+    return EXIT_OK
+
+
+def cmd_export_customers(args):
+    count = CustomerManager.export_customers_to_csv(
+        args.file, chunk_size=args.chunk_size, progress=_progress("exported")
+    )
+    print(f"Exported {count} customers to {args.file}.")
+    return EXIT_OK
+
+
+def cmd_export_analytics(args):
+    written = export_analytics(
+        args.directory, tables=args.table, incremental=not args.full,
+        progress=lambda table, count: print(f"{table}: {count}", file=sys.stderr, flush=True),
+    )
+    for table, count in written.items():
+        print(f"{table}: {count} rows")
+    return EXIT_OK
+
+
+def cmd_metrics(args):
+    snapshot = {
+        "taken_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "work_orders": get_work_order_metrics(),
+        "customers": dict(zip(("total", "new_last_24_hours"), get_customer_metrics() or (0, 0))),
+    }
+    if args.json:
+        print(json.dumps(snapshot, default=str))
+    else:
+        print(f"Snapshot at {snapshot['taken_at']}")
+        for section in ("work_orders", "customers"):
+            for name, value in snapshot[section].items():
+                print(f"  {section}.{name}: {value}")
+    return EXIT_OK
+
+
+def cmd_archive(args):
+    from utils.archiver import ArchiveJob  # pylint: disable=import-outside-toplevel
+    days = args.older_than_days if args.older_than_days is not None else get_settings().archive_after_days
+    job = ArchiveJob(archive_closed_work_orders, days, batch_size=args.batch_size, pause=args.pause)
+    moved = job.run_once(progress=_progress("archived"))
+    print(f"Archived {moved} closed work orders older than {days} days.")
+    return EXIT_OK
+
+
+def cmd_notify(_args):
+    # smtplib loads only for this command
+    from utils.notify_email import send_due_notifications  # pylint: disable=import-outside-toplevel
+    results = send_due_notifications(progress=_progress("recorded"))
+    sent = sum(1 for result in results if result.status == "sent")
+    deferred = sum(1 for result in results if result.status == "deferred")
+    failed = len(results) - sent - deferred
+    print(f"Follow-up emails: {sent} sent, {failed} failed, {deferred} deferred.")
+    if deferred:
+        print("SMTP server unreachable; deferred emails go out on the next run.", file=sys.stderr)
+        return EXIT_UNAVAILABLE
+    return EXIT_PARTIAL if failed else EXIT_OK
+
+
+def cmd_report(args):
+    from utils.reports import format_report  # pylint: disable=import-outside-toplevel
+    today = datetime.datetime.combine(datetime.date.today(), datetime.time())
+    start = args.start or today - datetime.timedelta(days=365)
+    end = args.end or today + datetime.timedelta(days=1)
+    print(format_report(get_technician_report(start, end)))
+    return EXIT_OK
+
+
+def cmd_migrate(args):
+    if args.list:
+        for migration in pending_migrations():
+            print(f"pending: {migration.version:03d}_{migration.name}")
+        return EXIT_OK
+    applied = run_migrations(
+        progress=lambda m: print(f"applied {m.version:03d}_{m.name}", file=sys.stderr, flush=True)
+    )
+    print(f"Applied {len(applied)} migration(s).")
+    return EXIT_OK
+
+
+def cmd_reconcile_counters(_args):
+    rebuild_work_order_counters()
+    print("Work order counters rebuilt.")
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Headless repair shop operations.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="also log to stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("import-customers", help="import customers from CSV")
+    command.add_argument("file")
+    command.add_argument("--chunk-size", type=int, default=1000)
+    command.set_defaults(func=cmd_import_customers)
+
+    command = commands.add_parser("export-customers", help="export customers to CSV")
+    command.add_argument("file")
+    command.add_argument("--chunk-size", type=int, default=5000)
+    command.set_defaults(func=cmd_export_customers)
+
+    command = commands.add_parser("export-analytics", help="partitioned Parquet export (needs pyarrow)")
+    command.add_argument("directory")
+    command.add_argument("--full", action="store_true", help="rebuild instead of appending new rows")
+    command.add_argument("--table", action="append", choices=sorted(ANALYTICS_TABLES))
+    command.set_defaults(func=cmd_export_analytics)
+
+    command = commands.add_parser("metrics", help="print a metrics snapshot")
+    command.add_argument("--json", action="store_true")
+    command.set_defaults(func=cmd_metrics)
+
+    command = commands.add_parser("archive", help="move old closed work orders to the archive")
+    command.add_argument("--older-than-days", type=int)
+    command.add_argument("--batch-size", type=int, default=500)
+    command.add_argument("--pause", type=float, default=2.0, help="seconds between batches")
+    command.set_defaults(func=cmd_archive)
+
+    command = commands.add_parser("notify", help="send due follow-up emails")
+    command.set_defaults(func=cmd_notify)
+
+    command = commands.add_parser("report", help="technician throughput and turnaround")
+    command.add_argument("--from", dest="start", type=_date)
+    command.add_argument("--to", dest="end", type=_date, help="exclusive end date")
+    command.set_defaults(func=cmd_report)
+
+    command = commands.add_parser("migrate", help="apply pending schema migrations (needs ALTER privilege)")
+    command.add_argument("--list", action="store_true", help="only list pending migrations")
+    command.set_defaults(func=cmd_migrate)
+
+    command = commands.add_parser("reconcile-counters", help="rebuild the dashboard counters from work_orders")
+    command.set_defaults(func=cmd_reconcile_counters)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.verbose:
+        logging.getLogger().addHandler(logging.StreamHandler(sys.stderr))
+    try:
+        return args.func(args)
+    except DatabaseUnavailableError as e:
+        print(f"Database unreachable: {e}", file=sys.stderr)
+        return EXIT_UNAVAILABLE
+    except ImportError as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_MISSING_DEPENDENCY
+    except KeyError as e:  # a CSV row without an expected header
+        logging.error("cli %s failed: missing column %s", args.command, e)
+        print(f"{args.command} failed: missing column {e.args[0]!r} in the CSV header", file=sys.stderr)
+        return EXIT_FAILED
+    except (DatabaseError, OSError, ValueError, csv.Error) as e:
+        logging.error("cli %s failed: %s", args.command, e)
+        print(f"{args.command} failed: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1,80 @@
-# Config file placeholder
\ No newline at end of file
+"""
+config.py
+
+Application settings, read from the environment (and a .env file, when
+python-dotenv is installed) once per process and cached.
+
+Classes:
+    Settings - Database, journal, archive, attachment store, SMTP and cache service settings.
+
+Functions:
+    - get_settings(): The cached Settings for this process.
+"""
+
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+Settings = namedtuple("Settings", [
+    "db_type", "db_host", "db_port", "db_name", "db_user", "db_password", "db_pool_size",
+    "db_pool_reset", "db_statement_cache", "db_replicas", "db_read_your_writes", "db_replica_retry", "db_replica_max_lag",
+    "journal_path", "archive_after_days", "attachment_store", "thumbnail_cache",
+    "smtp_host", "smtp_port", "smtp_sender", "smtp_user", "smtp_password",
+    "smtp_starttls", "smtp_rate",
+    "service_url", "service_bind", "service_cache_ttl",
+])
+
+
+def _load_dotenv():
+    # Imported here so programs that never read settings don't pay for it.
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def _endpoints(text, default_port=3306):
+    """Parse "host[:port],host[:port]" into (host, port) pairs."""
+    endpoints = []
+    for item in text.split(","):
+        host, _, port = item.strip().partition(":")
+        if host:
+            endpoints.append((host, int(port or default_port)))
+    return tuple(endpoints)
+
+
+@lru_cache(maxsize=None)
+def get_settings():
+    """Parse the environment into Settings on first call; later calls reuse it."""
+    _load_dotenv()
+    env = os.getenv
+    return Settings(
+        db_type=env("DB_TYPE", "mariadb"),
+        db_host=env("DB_HOST", "localhost"),
+        db_port=int(env("DB_PORT", "3306")),
+        db_name=env("DB_NAME", "shop"),
+        db_user=env("DB_USER", "root"),
+        db_password=env("DB_PASSWORD", "RepairShop"),
+        db_pool_size=int(env("DB_POOL_SIZE", "8")),  # 0 disables pooling
+        db_pool_reset=env("DB_POOL_RESET", "true").lower() == "true",  # false: prepared statements outlive a checkout (needed for prepared=True)
+        db_statement_cache=int(env("DB_STATEMENT_CACHE", "32")),  # prepared statements per connection; 0 disables
+        db_replicas=_endpoints(env("DB_REPLICAS", "")),  # "host:port,host:port"
+        db_read_your_writes=float(env("DB_READ_YOUR_WRITES", "5")),  # seconds on the primary after a write
+        db_replica_retry=float(env("DB_REPLICA_RETRY", "30")),
+        db_replica_max_lag=float(env("DB_REPLICA_MAX_LAG")) if env("DB_REPLICA_MAX_LAG") else None,
+        journal_path=env("JOURNAL_PATH", "write_journal.sqlite3"),
+        archive_after_days=int(env("ARCHIVE_AFTER_DAYS", "180")),
+        attachment_store=env("ATTACHMENT_STORE", "attachments"),
+        thumbnail_cache=env("THUMBNAIL_CACHE", "thumbnail_cache"),
+        smtp_host=env("SMTP_HOST", "localhost"),
+        smtp_port=int(env("SMTP_PORT", "25")),
+        smtp_sender=env("SMTP_SENDER", "shop@localhost"),
+        smtp_user=env("SMTP_USER") or None,
+        smtp_password=env("SMTP_PASSWORD") or None,
+        smtp_starttls=env("SMTP_STARTTLS", "false").lower() == "true",
+        smtp_rate=float(env("SMTP_RATE", "10")),
+        service_url=env("SERVICE_URL") or None,  # set to run the GUI in client mode
+        service_bind=env("SERVICE_BIND", "127.0.0.1:8765"),
+        service_cache_ttl=float(env("SERVICE_CACHE_TTL", "30")),
+    )
@@ -5,13 +5,31 @@ This module provides database utilities and helpers for the application.
 It handles database connections, query execution, and data fetching.
 
 Modules:
-    - mariadb and mysql.connector: Database connectivity.
-    - dotenv: Environment variable management.
+    - mariadb: Database connectivity (imported lazily via utils.drivers).
+    - config: Cached settings parsed from the environment / .env.
+    - utils.journal: Local write-behind journal for UI mutations.
+    - utils.schema: Cached table/column capability detection.
+    - utils.columns: Typed column lists and named projections per table.
+    - utils.rows: Row factories (plain tuples, named records, columnar batches).
 
 Functions:
     - fetch_all(query, params): Fetch all records for a query.
+    - get_db_stats(): Data-access counters (single-flight, replicas, prepared statements).
     - batch_insert(query, data): Insert multiple records in one batch.
+    - insert_row(query, params): Insert one row and return its id.
+    - transaction(): Unit of work sharing one connection and one commit.
     - get_db_connection(): Context manager for database connection.
+    - get_write_journal(): Queue writes locally and replay them in the background.
+    - get_schema(): Tables and columns available in the connected database.
+    - run_migrations(): Apply pending schema migrations (administrators, via cli.py migrate).
+    - prefetch_session(username, role): Concurrent login-time data prefetch.
+    - load_work_order_aggregate(work_order_id): A work order and its related rows.
+    - store_attachments(work_order_id, paths): Store files concurrently, record them in one batch.
+    - export_analytics(root): Partitioned Parquet export of work orders, customers and audit log.
+    - service_op(name, reads, writes): Route cacheable reads through the shared-cache service.
+    - get_technician_report(start, end): Cached technician throughput/turnaround report.
+    - get_parts_index(): In-memory autocomplete index over the parts catalog.
+    - reserve_parts(work_order_id, reservations): Atomically reserve stock for a work order.
 
 Author: McClure, M.T.
 Date: 12-4-2024
@@ -20,52 +38,242 @@ Date: 12-4-2024
 import os
 import csv
 import logging
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
-import mariadb
-import mysql.connector
-
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Database configuration
-DB_TYPE = os.getenv("DB_TYPE", "mariadb")
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = int(os.getenv("DB_PORT", "3306"))  # Convert default to string for os.getenv
-DB_NAME = os.getenv("DB_NAME", "shop")
-DB_USER = os.getenv("DB_USER", "root")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "RepairShop")
+from itertools import count, islice
+import functools
+
+from config import get_settings
+from utils.drivers import mariadb
+from utils.journal import WriteJournal
+from utils.schema import SchemaCatalog
+from utils.columns import resolve_fields, column_type
+from utils.rows import tuple_rows, record_rows, columnar_rows
+from utils.deadlines import mysql_dayofweek
+from utils.session import SessionCache
+from utils.aggregates import AggregateCache, WorkOrderAggregate
+from utils.attachment_store import AttachmentStore
+from utils.thumbnails import ThumbnailCache
+from utils.parts_index import PartsIndex
+from utils.analytics_export import ParquetExporter
+from utils.reports import ReportCache, build_report
+from utils.service_client import ServiceClient, ServiceUnavailable, ServiceCallError
+from utils.single_flight import SingleFlight
+from utils.replicas import ReplicaSet
+from utils.statements import StatementCache
+from utils import migrations
 
 logging.basicConfig(filename='app.log',level=logging.INFO)
 
+# Row factories for result sets. RECORDS rows index by position or name.
+TUPLES = tuple_rows
+RECORDS = record_rows
+COLUMNAR = columnar_rows
+
 class DatabaseError(Exception):
     """Custom exception for database errors."""
 
+class DatabaseUnavailableError(DatabaseError):
+    """The database server could not be reached."""
+
+# Server-gone/lost-connection error codes (server shutdown, connection killed,
+# can't connect, server has gone away, lost connection during query, lost
+# connection to server)
+_CONNECTION_LOST_CODES = frozenset({1053, 1927, 2002, 2003, 2006, 2013, 2055})
+
+def _connection_lost(error):
+    """True if a driver error means the connection failed, not that the statement was rejected."""
+    return (
+        isinstance(error, (mariadb.InterfaceError, mariadb.OperationalError))
+        or getattr(error, "errno", None) in _CONNECTION_LOST_CODES
+    )
+
+class InsufficientStockError(DatabaseError):
+    """A parts reservation asked for more than is on hand; nothing was reserved."""
+
+    def __init__(self, shortages):
+        self.shortages = shortages  # [(part_id, requested)]
+        super().__init__(
+            "Not enough stock for part(s): "
+            + ", ".join(str(part_id) for part_id, _ in shortages)
+        )
+
+_pools = {}  # (host, port) -> ConnectionPool
+_pool_lock = threading.Lock()
+
+def _connect(host=None, port=None):
+    """A pooled connection (DB_POOL_SIZE > 0) or a fresh one; the primary by default."""
+    settings = get_settings()
+    params = {
+        "host": host or settings.db_host,
+        "port": port or settings.db_port,
+        "user": settings.db_user,
+        "password": settings.db_password,
+        "database": settings.db_name,
+    }
+    if settings.db_pool_size <= 0:
+        return mariadb.connect(**params)
+    endpoint = (params["host"], params["port"])
+    with _pool_lock:
+        pool = _pools.get(endpoint)
+        if pool is None:
+            pool = _pools[endpoint] = mariadb.ConnectionPool(
+                pool_name="repair_shop" if not _pools else f"repair_shop_{len(_pools)}",
+                pool_size=settings.db_pool_size,
+                pool_reset_connection=settings.db_pool_reset,
+                **params
+            )
+    try:
+        connection = pool.get_connection()
+    except mariadb.PoolError:
+        # Every pooled connection is busy; don't make the caller wait for one.
+        return mariadb.connect(**params)
+    if not settings.db_pool_reset:
+        # No reset: at least never hand on a transaction an earlier user left open.
+        connection.rollback()
+    return connection
+
+# Read replicas (DB_REPLICAS="host:port,host:port")
+# fetch_all/fetch_one/stream_rows read from a replica, round-robin, unless this
+# process wrote within the last DB_READ_YOUR_WRITES seconds; then they stay
+# on the primary so the user sees what they just saved. Any connection taken
+# with get_db_connection() counts as a write.
+_replicas = None
+_replicas_configured = False
+_last_write_at = float("-inf")
+_primary_reads = 0
+
+class _ReplicaFailed(DatabaseError):
+    """A replica dropped mid-read; the read is retried on the primary."""
+
+def get_replicas():
+    """The ReplicaSet from DB_REPLICAS, or None when reads all go to the primary."""
+    global _replicas, _replicas_configured
+    if not _replicas_configured:
+        settings = get_settings()
+        if settings.db_replicas:
+            _replicas = ReplicaSet(
+                settings.db_replicas, _connect,
+                retry_interval=settings.db_replica_retry, max_lag=settings.db_replica_max_lag,
+            )
+        _replicas_configured = True
+    return _replicas
+
+# Prepared statements (DB_STATEMENT_CACHE per connection)
+# fetch_one/fetch_all(prepared=True) run on a server-side prepared cursor kept
+# per pooled connection. The pool resets a connection when it is returned
+# (DB_POOL_RESET, on by default), which frees its statements; as each fetch
+# is its own checkout, a statement would never be reused, so with reset on
+# (or without pooling) prepared=True falls back to a plain text query.
+# DB_POOL_RESET=false keeps statements across checkouts, at the cost of
+# session state (variables, temporary tables) carrying over; each checkout
+# still rolls back any open transaction.
+_statement_cache = None
+
+def _statements_reusable():
+    settings = get_settings()
+    return settings.db_pool_size > 0 and not settings.db_pool_reset and settings.db_statement_cache > 0
+
+def _get_statement_cache():
+    global _statement_cache
+    if _statement_cache is None:
+        _statement_cache = StatementCache(
+            get_settings().db_statement_cache, lambda connection: connection.cursor(prepared=True)
+        )
+    return _statement_cache
+
+def _cursor_for(connection, query, prepared):
+    return _get_statement_cache().cursor(connection, query) if prepared else connection.cursor()
+
+def _probe_replica(connection):
+    """Health check query; returns seconds behind the primary (None if unknown)."""
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SHOW SLAVE STATUS")
+    except mariadb.ProgrammingError:
+        # No REPLICATION CLIENT privilege: check liveness only
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        return None
+    status = cursor.fetchone()
+    return status.get("Seconds_Behind_Master") if status else None
+
+def check_replicas():
+    """Health-check every replica (run periodically; see MainGUI)."""
+    replicas = get_replicas()
+    if replicas is not None:
+        replicas.check(_probe_replica)
+
+@contextmanager
+def read_connection():
+    """
+    Connection for a read-only query: a healthy replica when configured and
+    outside the read-your-writes window, otherwise the primary.
+    """
+    global _primary_reads
+    replicas = get_replicas()
+    picked = None
+    if replicas is not None and time.monotonic() - _last_write_at > get_settings().db_read_your_writes:
+        picked = replicas.acquire()
+    if picked is None:
+        _primary_reads += 1
+        with get_db_connection(read_only=True) as primary_connection:
+            yield primary_connection
+        return
+    connection, replica = picked
+    try:
+        yield connection
+    except (mariadb.InterfaceError, mariadb.OperationalError) as e:
+        replicas.mark_down(replica, e)
+        raise _ReplicaFailed(str(e)) from e
+    finally:
+        connection.close()
+
+def _run_read(read):
+    """read(connection) on a replica (or the primary), retried on the primary if the replica drops."""
+    try:
+        with read_connection() as connection:
+            return read(connection)
+    except _ReplicaFailed:
+        with get_db_connection(read_only=True) as connection:
+            return read(connection)
+
 @contextmanager
-def get_db_connection():
-    """Connection to database"""
+def get_db_connection(read_only=False):
+    """
+    Connection to the primary database; close() hands pooled connections
+    back to the pool. Unless ``read_only``, using it starts this process's
+    read-your-writes window.
+    """
     real_connection = None
     try:
-        real_connection = mariadb.connect(
-            host=DB_HOST,
-            port=DB_PORT,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_NAME,
-        )
+        real_connection = _connect()
+    except mariadb.Error as e:
+        logging.error("Database connection error: %s", e)
+        raise DatabaseUnavailableError("Failed to connect to the database.") from e
+    try:
         yield real_connection
     except mariadb.Error as e:
         logging.error("Database connection error: %s", e)
+        if _connection_lost(e):
+            raise DatabaseUnavailableError("Lost the database connection.") from e
         raise DatabaseError("Failed to connect to the database.") from e
     finally:
         if real_connection:
             real_connection.close()
+        if not read_only:
+            _note_write()
 
-def execute_query(query, params=(), commit=False):
+def _column_names(cursor):
+    return [column[0] for column in cursor.description or ()]
+
+def execute_query(query, params=(), commit=False, row_factory=RECORDS):
     """Execute a query on the database."""
     try:
-        with get_db_connection() as ex_connection:
+        with get_db_connection(read_only=not commit) as ex_connection:
             cursor = ex_connection.cursor()
             print("Executing query:", query)  # Debugging
             print("Parameters:", params)  # Debugging
@@ -73,14 +281,14 @@ def execute_query(query, params=(), commit=False):
             if commit:  # Commit for INSERT/UPDATE/DELETE queries
                 ex_connection.commit()
                 return None  # These queries don't return rows
-            return cursor.fetchall()  # Fetch results for SELECT queries
+            return row_factory(_column_names(cursor), cursor.fetchall())  # SELECT results
     except mariadb.Error as e:
         logging.error("Query execution failed: %s", e)
         raise DatabaseError(f"Query execution failed: {e}") from e  # Explicit re-raise
 
 # Database queries
 def find_customer_by_barcode(barcode):
-    return fetch_one("SELECT id FROM customers WHERE barcode=%s", (barcode,))
+    return fetch_one("SELECT id FROM customers WHERE barcode=%s", (barcode,), prepared=True)
 
 def find_customer_by_contact(phone_digits=None, email=None):
     # phone stored as digits-only recommended; adjust if you store formatted
@@ -89,58 +297,132 @@ def find_customer_by_contact(phone_digits=None, email=None):
                       (phone_digits,))
         if r: return r
     if email:
-        r = fetch_one("SELECT id FROM customers WHERE email=%s LIMIT 1", (email,))
+        r = fetch_one("SELECT id FROM customers WHERE email=%s LIMIT 1", (email,), prepared=True)
         if r: return r
     return None
 
 def find_customer_by_name(first, last):
     return fetch_one("SELECT id FROM customers WHERE first_name=%s AND last_name=%s LIMIT 1",
-                     (first, last))
+                     (first, last), prepared=True)
 
 def find_work_order_by_code_or_number(code_or_no):
     # support either explicit scan_code or an order number text like WO-1042
-    r = fetch_one("SELECT id, customer_id FROM work_orders WHERE scan_code=%s LIMIT 1", (code_or_no,))
-    if r: return r
-    r = fetch_one("SELECT id, customer_id FROM work_orders WHERE id=%s LIMIT 1", (code_or_no,))
-    return r
+    # (archived orders are checked only after the hot table misses)
+    for table in work_order_tables():
+        r = fetch_one(f"SELECT id, customer_id FROM {table} WHERE scan_code=%s LIMIT 1", (code_or_no,),
+                      prepared=True)
+        if r: return r
+        r = fetch_one(f"SELECT id, customer_id FROM {table} WHERE id=%s LIMIT 1", (code_or_no,),
+                      prepared=True)
+        if r: return r
+    return None
+
+# Single-flight reads: concurrent fetch_all/fetch_one calls with the same
+# normalized SQL, params and row factory share one execution and its result.
+# The key includes a write counter so a read issued after this process
+# commits a write never joins a query that started before it.
+_single_flight = SingleFlight()
+_write_counter = count(1)
+_last_write = 0
+
+def _note_write():
+    global _last_write, _last_write_at
+    _last_write = next(_write_counter)
+    _last_write_at = time.monotonic()
+
+def _params_key(params):
+    if isinstance(params, (list, tuple)):
+        try:
+            params = tuple(params)
+            hash(params)
+            return params
+        except TypeError:
+            pass
+    return repr(params)
+
+def _coalesced(kind, query, params, row_factory, run):
+    key = (kind, " ".join(query.split()), _params_key(params), row_factory, _last_write)
+    result, shared = _single_flight.do(key, run)
+    if shared and isinstance(result, list):
+        return list(result)  # each caller may mutate its own list
+    return result
+
+def fetch_one(query, params=(), row_factory=RECORDS, prepared=False):
+    """
+    Fetch one record from the database (shared with identical concurrent calls).
+    ``prepared`` runs it as a cached server-side prepared statement when
+    pooled connections keep their session (DB_POOL_RESET=false); use it for
+    fixed, frequently repeated SQL text.
+    """
+    return _coalesced("one", query, params, row_factory,
+                      lambda: _fetch_one(query, params, row_factory, prepared))
+
+def _fetch_one(query, params, row_factory, prepared):
+    prepared = prepared and _statements_reusable()
+    def read(db_connection):
+        cursor = _cursor_for(db_connection, query, prepared)
+        _execute(db_connection, cursor, query, params, prepared)
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        rows = row_factory(_column_names(cursor), [row])
+        return rows[0]
 
-def fetch_one(query, params=()):
-    """Fetch one record from the database."""
     try:
-        with get_db_connection() as db_connection:
-            cursor = db_connection.cursor()
-            cursor.execute(query, params)
-            return cursor.fetchone()
+        return _run_read(read)
     except mariadb.Error as e:
         logging.error("Error fetching one record: %s", e)
         raise DatabaseError("Fetch one query failed.") from e
 
-def fetch_all(query, params=()):
+def fetch_all(query, params=(), row_factory=RECORDS, prepared=False):
     """
     Fetch all records from the database.
     
     Args:
         query (str): The SQL query to execute.
         params (tuple): Parameters for the SQL query.
+        row_factory (callable): Shapes the rows; RECORDS (default) allows
+            access by position or column name, TUPLES returns plain tuples and
+            COLUMNAR returns one array-backed ColumnBatch.
+        prepared (bool): Run as a cached server-side prepared statement
+            when pooled connections keep their session (DB_POOL_RESET=false),
+            for fixed, frequently repeated SQL text.
 
     Returns:
         list: A list of all records returned by the query.
 
     Raises:
         DatabaseError: If the query execution fails.
+
+    Identical concurrent calls share one execution (see get_db_stats()).
     """
+    return _coalesced("all", query, params, row_factory,
+                      lambda: _fetch_all(query, params, row_factory, prepared))
+
+def _fetch_all(query, params, row_factory, prepared):
+    prepared = prepared and _statements_reusable()
+    def read(fetch_connection):
+        cursor = _cursor_for(fetch_connection, query, prepared)
+        logging.debug("Executing query: %s with params: %s", query, params)  # Debugging info
+        _execute(fetch_connection, cursor, query, params, prepared)
+        results = cursor.fetchall()
+        logging.debug("Query returned %d records.", len(results))  # Debugging info
+        return row_factory(_column_names(cursor), results)
+
     try:
-        with get_db_connection() as fetch_connection:
-            cursor = fetch_connection.cursor()
-            logging.debug("Executing query: %s with params: %s", query, params)  # Debugging info
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-            logging.debug("Query returned %d records.", len(results))  # Debugging info
-            return results
+        return _run_read(read)
     except mariadb.Error as e:
         logging.error("Database error during fetch_all: %s", e)
         raise DatabaseError("Fetch all query failed.") from e
 
+def _execute(connection, cursor, query, params, prepared):
+    try:
+        cursor.execute(query, params)
+    except mariadb.Error:
+        if prepared:
+            _get_statement_cache().discard(connection, query)  # re-prepare next time
+        raise
+
 def batch_insert(query, data):
     """Insert multiple records into the database."""
     try:
@@ -152,81 +434,502 @@ def batch_insert(query, data):
         logging.error("Error during batch insert: %s", e)
         raise DatabaseError("Batch insert failed.") from e
 
-def insert_file_metadata(work_order_id, file_name, file_path, file_type):
+def insert_row(query, params=()):
+    """Run one INSERT in its own transaction and return the new row's id (lastrowid)."""
+    with transaction() as tx:
+        return tx.insert(query, params)
+
+# Units of work
+class Transaction:
     """
-    Inserts metadata into the database for file attachments.
+    One connection and cursor shared by every statement of a unit of work,
+    so multi-step writes cost one connection and one commit.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.cursor = connection.cursor()
+
+    def execute(self, query, params=()):
+        """Run a statement; returns the number of rows it affected."""
+        self.cursor.execute(query, params)
+        return self.cursor.rowcount
+
+    def executemany(self, query, data):
+        self.cursor.executemany(query, data)
+        return self.cursor.rowcount
+
+    def insert(self, query, params=()):
+        """Run an INSERT; returns the new row's id (lastrowid)."""
+        self.cursor.execute(query, params)
+        return self.cursor.lastrowid
+
+    def fetch_one(self, query, params=(), row_factory=RECORDS):
+        self.cursor.execute(query, params)
+        row = self.cursor.fetchone()
+        return None if row is None else row_factory(_column_names(self.cursor), [row])[0]
+
+    def fetch_all(self, query, params=(), row_factory=RECORDS):
+        self.cursor.execute(query, params)
+        return row_factory(_column_names(self.cursor), self.cursor.fetchall())
+
+@contextmanager
+def transaction():
+    """
+    Unit of work on one primary connection: commits when the block exits
+    normally, rolls back if it raises.
+
+    Reads inside the block (``tx.fetch_one``/``tx.fetch_all``) see the
+    transaction's own writes and may lock rows with ``FOR UPDATE``.
+
+    Raises:
+        DatabaseUnavailableError: If the connection is lost mid-transaction.
+        DatabaseError: If a statement or the commit fails (after rolling back).
+    """
+    with get_db_connection() as tx_connection:
+        try:
+            yield Transaction(tx_connection)
+            tx_connection.commit()
+        except BaseException as e:
+            try:
+                tx_connection.rollback()
+            except mariadb.Error as rollback_error:
+                logging.error("Rollback failed: %s", rollback_error)
+            if isinstance(e, mariadb.Error):
+                logging.error("Transaction failed: %s", e)
+                if _connection_lost(e):
+                    # Callers such as the write journal retry these instead of rejecting the work
+                    raise DatabaseUnavailableError(f"Lost the database connection: {e}") from e
+                raise DatabaseError(f"Transaction failed: {e}") from e
+            raise
+
+def get_db_stats():
+    """
+    Instrumentation for the data-access layer.
+
+    Returns:
+        dict: "single_flight": executed / shared (queries saved) / in_flight;
+        "reads": reads served by the primary and per-replica health/counters;
+        "statements": prepared statement cache hits / misses / evictions / hit_rate.
+    """
+    replicas = get_replicas()
+    return {
+        "single_flight": _single_flight.stats(),
+        "statements": _get_statement_cache().stats(),
+        "reads": {
+            "primary": _primary_reads,
+            "replicas": replicas.stats() if replicas is not None else {},
+        },
+    }
+
+def stream_rows(query, params=(), chunk_size=5000):
+    """
+    Yield ``(fields, rows)`` chunks of up to ``chunk_size`` rows from an
+    unbuffered cursor, so large exports never hold the full result in memory.
+    The connection stays checked out until the generator is exhausted or closed.
     """
     try:
-        with get_db_connection() as db_connection:  # Use descriptive variable
-            cursor = db_connection.cursor()
-            query = """
-                INSERT INTO file_attachments (work_order_id, file_name, file_path, file_type)
-                VALUES (%s, %s, %s, %s)
-            """
-            cursor.execute(query, (work_order_id, file_name, file_path, file_type))
-            db_connection.commit()
+        with read_connection() as stream_connection:
+            cursor = stream_connection.cursor(buffered=False)
+            cursor.execute(query, params)
+            fields = _column_names(cursor)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield fields, rows
+    except mariadb.Error as e:
+        logging.error("Database error during stream_rows: %s", e)
+        raise DatabaseError("Streaming query failed.") from e
+
+# Schema capabilities
+_schema = SchemaCatalog()
+
+def get_schema():
+    """
+    Return the schema catalog, reading information_schema on first use.
+
+    Query builders use it to choose column lists that exist in this database
+    instead of retrying with a smaller query after a failure.
+    """
+    if not _schema.loaded:
+        _schema.load(fetch_all, get_settings().db_name)
+    return _schema
+
+def select_list(table_name, fields=None):
+    """
+    Build the SELECT list for a projection on a table.
+
+    Args:
+        table_name (str): Table to select from.
+        fields: Projection name ("list", "detail"), a sequence of column
+            names, or None for the table's detail projection.
+
+    Returns:
+        str: Comma-separated column list ("*" only for tables nothing is known about).
+    """
+    columns = resolve_fields(table_name, fields, available=get_schema().columns(table_name))
+    return ", ".join(columns) if columns else "*"
+
+# Schema migrations
+# Changes to existing tables ship as scripts in migrations/ and are applied by
+# an administrator (python cli.py migrate); the application only detects
+# their effect through get_schema().
+def _ensure_migrations_table(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        applied_at DATETIME NOT NULL
+    )
+    """)
+
+def pending_migrations(directory=migrations.MIGRATIONS_DIR):
+    """Migrations in ``directory`` not yet applied to this database."""
+    with get_db_connection() as migration_connection:
+        cursor = migration_connection.cursor()
+        _ensure_migrations_table(cursor)
+        cursor.execute("SELECT version FROM schema_migrations")
+        applied = [row[0] for row in cursor.fetchall()]
+    return migrations.pending(directory, applied)
+
+def run_migrations(directory=migrations.MIGRATIONS_DIR, progress=None):
+    """
+    Apply pending migrations in version order, recording each in
+    schema_migrations once its statements have run. Needs ALTER/CREATE
+    privileges, so it is run by an administrator, never at application startup.
+
+    Returns:
+        list: The Migrations applied.
+    """
+    applied = []
+    with get_db_connection() as migration_connection:
+        cursor = migration_connection.cursor()
+        _ensure_migrations_table(cursor)
+        cursor.execute("SELECT version FROM schema_migrations")
+        done = [row[0] for row in cursor.fetchall()]
+        for migration in migrations.pending(directory, done):
+            try:
+                for statement in migrations.statements(migration):
+                    cursor.execute(statement)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, NOW())",
+                    (migration.version, migration.name),
+                )
+                migration_connection.commit()
+            except mariadb.Error as e:
+                logging.error("Migration %03d_%s failed: %s", migration.version, migration.name, e)
+                raise DatabaseError(f"Migration {migration.version:03d}_{migration.name} failed: {e}") from e
+            logging.info("Applied migration %03d_%s.", migration.version, migration.name)
+            applied.append(migration)
+            if progress:
+                progress(migration)
+    _schema.invalidate()
+    return applied
+
+# Write-behind journal
+_JOURNAL_OPS = {}
+_JOURNAL_WRITES = {}  # op -> tables it changes (for cache invalidation)
+_write_journal = None
+
+def journal_op(name, writes=()):
+    """
+    Register a function(cursor, payload) that applies one journaled write
+    and returns the new row id (or None). ``writes`` names the tables it changes.
+    """
+    def register(func):
+        _JOURNAL_OPS[name] = func
+        _JOURNAL_WRITES[name] = tuple(writes)
+        return func
+    return register
+
+def _journal_timestamp():
+    """Capture time for queued writes, so replay keeps the original timestamp."""
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+_journal_applied_ready = False
+
+def _require_write_journal_applied():
+    """
+    Replay needs write_journal_applied (migration 006) to stay idempotent.
+    Until it exists this raises DatabaseUnavailableError, so the journal
+    keeps its entries and retries. The catalog may predate the migration,
+    so information_schema is asked directly until the table shows up.
+    """
+    global _journal_applied_ready
+    if _journal_applied_ready:
+        return
+    if not get_schema().has_table("write_journal_applied") and fetch_one(
+        "SELECT 1 FROM information_schema.tables WHERE table_schema = %s AND table_name = %s",
+        (get_settings().db_name, "write_journal_applied"),
+    ) is None:
+        raise DatabaseUnavailableError(
+            "Queued writes wait for the write_journal_applied table; run: python cli.py migrate"
+        )
+    _journal_applied_ready = True
+
+def apply_journal_batch(entries):
+    """
+    Apply journaled writes in order on one connection with a single commit.
 
-    except mysql.connector.Error as err:
+    Args:
+        entries (list): (idempotency_key, op, payload) tuples, oldest first.
+
+    Returns:
+        dict: idempotency_key -> result id. Keys the server already recorded
+        in write_journal_applied are returned without being re-applied.
+    """
+    _require_write_journal_applied()
+    with transaction() as tx:
+        cursor = tx.cursor
+        keys = [key for key, _, _ in entries]
+        placeholders = ", ".join(["%s"] * len(keys))
+        cursor.execute(
+            "SELECT idempotency_key, result_id FROM write_journal_applied "
+            f"WHERE idempotency_key IN ({placeholders})",
+            keys,
+        )
+        results = dict(cursor.fetchall())
+
+        applied = []
+        written = set()
+        for key, op, payload in entries:
+            if key in results:
+                continue
+            result_id = _JOURNAL_OPS[op](cursor, payload)
+            results[key] = result_id
+            applied.append((key, result_id))
+            written.update(_JOURNAL_WRITES[op])
+        if applied:
+            cursor.executemany(
+                "INSERT INTO write_journal_applied (idempotency_key, result_id, applied_at) "
+                "VALUES (%s, %s, NOW())",
+                applied,
+            )
+    if written:
+        _tables_written(written)
+    return results
+
+def get_write_journal():
+    """Return the process-wide write journal, starting its replay worker."""
+    global _write_journal
+    if _write_journal is None:
+        _write_journal = WriteJournal(
+            get_settings().journal_path, apply_journal_batch,
+            transient_errors=(DatabaseUnavailableError,),
+        )
+        _write_journal.start()
+    return _write_journal
+
+# Shared-cache service (service.py)
+# Reads registered with service_op(reads=...) go to the service when this
+# process is in client mode (SERVICE_URL), falling back to the database if it
+# is down. Writes registered with service_op(writes=...) tell the service
+# which tables changed so no terminal reads a stale cached result.
+_SERVICE_OPS = {}  # name -> (function, tables read)
+_service_client = None
+_service_configured = False
+_REMOTE_ERRORS = {"DatabaseUnavailableError": DatabaseUnavailableError, "ValueError": ValueError}
+
+def configure_service(url):
+    """Send cacheable reads to the service at ``url`` (None: query the database directly)."""
+    global _service_client, _service_configured
+    _service_client = ServiceClient(url) if url else None
+    _service_configured = True
+
+def _get_service_client():
+    if not _service_configured:
+        configure_service(get_settings().service_url)
+    return _service_client
+
+def service_op(name, reads=(), writes=()):
+    """
+    Register a read the cache service may serve (``reads``: tables its
+    result depends on), or a write that changes the ``writes`` tables.
+    """
+    def register(func):
+        if reads:
+            _SERVICE_OPS[name] = (func, tuple(reads))
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            client = _get_service_client()
+            if client is not None and reads:
+                try:
+                    return client.call(name, args, kwargs)
+                except ServiceUnavailable:
+                    pass  # query the database directly
+                except ServiceCallError as e:
+                    raise _REMOTE_ERRORS.get(e.kind, DatabaseError)(str(e)) from e
+            result = func(*args, **kwargs)
+            if writes:
+                _tables_written(writes)
+            return result
+        return call
+    return register
+
+def _tables_written(tables):
+    client = _get_service_client()
+    if client is not None:
+        client.invalidate(tables)
+
+def service_operations():
+    """Reads the cache service may run: name -> (function, tables read)."""
+    return dict(_SERVICE_OPS)
+
+def insert_file_metadata(work_order_id, file_name, file_path, file_type, sha256=None, size=None):
+    """
+    Inserts metadata into the database for file attachments and returns
+    the new row id (None if the insert failed).
+    ``sha256``/``size`` are recorded when file_attachments has those columns.
+    """
+    columns = ["work_order_id", "file_name", "file_path", "file_type"]
+    values = [work_order_id, file_name, file_path, file_type]
+    if sha256 is not None and get_schema().has_column("file_attachments", "sha256"):
+        columns += ["sha256", "size"]
+        values += [sha256, size]
+    try:
+        query = f"""
+            INSERT INTO file_attachments ({", ".join(columns)})
+            VALUES ({", ".join(["%s"] * len(columns))})
+        """
+        return insert_row(query, values)
+
+    except (mariadb.Error, DatabaseError) as err:
         print(f"Error: {err}")
         logging.error("Failed to insert file metadata: %s", err)
     except Exception as e:
         logging.error("Unexpected error: %s", e)
         raise
 
-def get_notifications(twenty_four_hours_ago, excluded_days):
-    """Notification email"""
-    try:
-        # Database connection setup
-        conn = mysql.connector.connect(
-            host=os.getenv("DB_HOST"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_NAME")
-        )
-        cursor = conn.cursor()
+# Attachment store
+# Files are copied into a content-addressed store (see utils.attachment_store);
+# file_attachments.file_path then points into the store, and sha256/size
+# identify the content (once migration 003 has added those columns).
+_attachment_store = None
+_thumbnail_cache = None
+
+def get_attachment_store():
+    """The process-wide attachment store (ATTACHMENT_STORE directory)."""
+    global _attachment_store
+    if _attachment_store is None:
+        _attachment_store = AttachmentStore(get_settings().attachment_store)
+    return _attachment_store
+
+def get_thumbnail_cache():
+    """This terminal's preview cache (THUMBNAIL_CACHE directory)."""
+    global _thumbnail_cache
+    if _thumbnail_cache is None:
+        _thumbnail_cache = ThumbnailCache(get_settings().thumbnail_cache)
+    return _thumbnail_cache
+
+def store_attachments(work_order_id, paths, max_workers=4, progress=None):
+    """
+    Copy files into the attachment store and record them on a work order.
 
-        # Fetch notifications from the database
-        query = """
-            SELECT id, customer, status, technician
-            FROM work_orders
-            WHERE (
-                (status = 'Pending Follow-Up' AND created_at <= %s) OR
-                (status = 'Overdue' AND created_at <= %s AND DAYOFWEEK(created_at) NOT IN (%s, %s, %s))
-            )
-        """
-        cursor.execute(query, (twenty_four_hours_ago, twenty_four_hours_ago, *excluded_days))
-        notifications = cursor.fetchall()
-        return notifications
+    Hashing, storing and preview generation run on a thread pool; the
+    metadata rows for every stored file are then written with one
+    batch_insert.
 
-    except mysql.connector.Error as dberr:
-        logging.error("Database connection error: %s", dberr)
-        raise
-    except ValueError as val_err:
-        logging.error("Query execution failed: %s", val_err)
-        raise
-    except TypeError as type_err:
-        logging.error("Error fetching one record: %s", type_err)
-        raise
-    except AttributeError as attr_err:
-        logging.error("Error fetching all records: %s", attr_err)
-        raise
-    except Exception as e:
-        logging.error("Error during batch insert: %s", e)
+    Args:
+        progress (callable): Called as progress(done, total) after each file.
+
+    Returns:
+        tuple: (stored, failed) - lists of (path, StoredFile) and (path, error).
+    """
+    store, thumbnails = get_attachment_store(), get_thumbnail_cache()
+
+    def ingest(path):
+        stored = store.ingest(path)
+        thumbnails.get(stored.sha256, stored.path)
+        return stored
+
+    stored, failed = [], []
+    with ThreadPoolExecutor(max_workers, thread_name_prefix="attachment-ingest") as pool:
+        futures = {pool.submit(ingest, path): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                stored.append((path, future.result()))
+            except OSError as e:
+                logging.error("Could not store attachment %s: %s", path, e)
+                failed.append((path, e))
+            if progress:
+                progress(len(stored) + len(failed), len(paths))
+    if not stored:
+        return stored, failed
+
+    columns = ["work_order_id", "file_name", "file_path", "file_type"]
+    with_hash = get_schema().has_column("file_attachments", "sha256")  # migration 003
+    if with_hash:
+        columns += ["sha256", "size"]
+    rows = []
+    for path, result in stored:
+        file_name = os.path.basename(path)
+        row = [work_order_id, file_name, result.path,
+               file_name.rsplit(".", 1)[-1] if "." in file_name else ""]
+        if with_hash:
+            row += [result.sha256, result.size]
+        rows.append(tuple(row))
+    batch_insert(
+        f"INSERT INTO file_attachments ({', '.join(columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))})",
+        rows,
+    )
+    discard_work_order_aggregate(work_order_id)
+    return stored, failed
+
+def store_attachment(work_order_id, source_path):
+    """
+    Store one file on a work order (see store_attachments).
+
+    Returns:
+        StoredFile: hash, size, stored path and whether the content was
+        already in the store.
+    """
+    stored, failed = store_attachments(work_order_id, [source_path], max_workers=1)
+    if failed:
+        raise failed[0][1]
+    return stored[0][1]
+
+def get_notifications(twenty_four_hours_ago, excluded_days):
+    """
+    Notification email
+
+    ``excluded_days`` are Python weekdays (Mon=0); they are converted to
+    MySQL's DAYOFWEEK convention (Sun=1) before filtering.
+    """
+    # Older schemas carry a customer name column; newer ones only the id
+    customer_column = (
+        "customer" if get_schema().has_column("work_orders", "customer") else "customer_id"
+    )
+    query = f"""
+        SELECT id, {customer_column}, status, technician
+        FROM work_orders
+        WHERE (
+            (status = 'Pending Follow-Up' AND created_at <= %s) OR
+            (status = 'Overdue' AND created_at <= %s AND DAYOFWEEK(created_at) NOT IN (%s, %s, %s))
+        )
+    """
+    mysql_days = [mysql_dayofweek(day) for day in excluded_days]
+    try:
+        return fetch_all(query, (twenty_four_hours_ago, twenty_four_hours_ago, *mysql_days),
+                         row_factory=TUPLES)
+    except DatabaseError as dberr:
+        logging.error("Failed to fetch notifications: %s", dberr)
         raise
-    finally:
-        if conn.is_connected():
-            conn.close()
 
 # User Management
+@service_op("create_user", writes=("users",))
 def create_user(username, password, role):
     """
-    Create user in database
+    Create user in database; returns the new user's id.
     """
     query = """
     INSERT INTO users (username, password, role)
     VALUES (%s, %s, %s)
     """
-    execute_query(query, (username, password, role), commit=True)
+    return insert_row(query, (username, password, role))
 
 def authenticate_user(username, password):
     """
@@ -255,14 +958,27 @@ def get_all_users():
     query = "SELECT id, username, role FROM users"
     return fetch_all(query)
 
+def get_user_id(username):
+    row = fetch_one("SELECT id FROM users WHERE username = %s", (username,))
+    return row[0] if row else None
+
+@service_op("get_technicians", reads=("users",))
+def get_technicians():
+    """Usernames of every technician, for assignment pickers."""
+    rows = fetch_all("SELECT username FROM users WHERE role = 'technician' ORDER BY username")
+    return [row[0] for row in rows]
+
+@service_op("update_user_role", writes=("users",))
 def update_user_role(user_id, new_role):
     query = "UPDATE users SET role = %s WHERE id = %s"
     execute_query(query, (new_role, user_id), commit=True)
 
+@service_op("reset_user_password", writes=("users",))
 def reset_user_password(user_id, new_password):
     query = "UPDATE users SET password = %s WHERE id = %s"
     execute_query(query, (new_password, user_id), commit=True)
 
+@service_op("delete_user", writes=("users",))
 def delete_user(user_id):
     query = "DELETE FROM users WHERE id = %s"
     execute_query(query, (user_id,), commit=True)
@@ -277,23 +993,21 @@ class CustomerManager:
     @staticmethod
     def add_customer(data):
         """
-        Add customer to database.
+        Queue a new customer for the database; returns the journal key.
         """
         method_of_contact = (
             "Phone" if data["contact_phone"] else
             "Email" if data["contact_email"] else
             "N/A"
         )
-        query = """
-        INSERT INTO customers 
-        (first_name, last_name, street, city, state, zip_code, customer_type, student_id, method_of_contact, phone, email) 
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        execute_query(query, (
-            data["first_name"], data["last_name"], data["street"], data["city"],
-            data["state"], data["zip_code"], data["customer_type"], data["student_id"],
-            method_of_contact, data["phone"], data["email"]
-        ), commit=True)
+        return get_write_journal().submit("add_customer", {
+            "first_name": data["first_name"], "last_name": data["last_name"],
+            "street": data["street"], "city": data["city"], "state": data["state"],
+            "zip_code": data["zip_code"], "customer_type": data["customer_type"],
+            "student_id": data["student_id"], "method_of_contact": method_of_contact,
+            "phone": data["phone"], "email": data["email"],
+            "created_at": _journal_timestamp(),
+        })
 
     @staticmethod
     def load_customers():
@@ -307,19 +1021,25 @@ class CustomerManager:
         return fetch_all(query)
 
     @staticmethod
+    @service_op("delete_customer", writes=("customers",))
     def delete_customer(customer_id):
         """
-        Delete customer from database.
+        Delete customer from database, unless they have active work orders.
+        The customer row is locked first, so no work order can be opened for
+        them between the check and the delete.
         """
-        work_order_query = "SELECT COUNT(*) FROM work_orders WHERE customer_id = %s AND status != 'Closed'"
-        active_work_orders = fetch_one(work_order_query, (customer_id,))
-        if active_work_orders and active_work_orders[0] > 0:
-            raise ValueError("Cannot delete customer with active work orders.")
-
-        delete_query = "DELETE FROM customers WHERE id = %s"
-        execute_query(delete_query, (customer_id,), commit=True)
+        with transaction() as tx:
+            tx.execute("SELECT id FROM customers WHERE id = %s FOR UPDATE", (customer_id,))
+            active_work_orders = tx.fetch_one(
+                "SELECT COUNT(*) FROM work_orders WHERE customer_id = %s AND status != 'Closed'",
+                (customer_id,), row_factory=TUPLES,
+            )
+            if active_work_orders and active_work_orders[0] > 0:
+                raise ValueError("Cannot delete customer with active work orders.")
+            tx.execute("DELETE FROM customers WHERE id = %s", (customer_id,))
 
     @staticmethod
+    @service_op("update_customer", writes=("customers",))
     def update_customer(customer_id, data):
         """
         Update customer in database.
@@ -338,36 +1058,38 @@ class CustomerManager:
         ), commit=True)
 
     @staticmethod
-    def get_customer_details(customer_id):
+    @service_op("get_customer_details", reads=("customers",))
+    def get_customer_details(customer_id, fields="detail"):
         """
         Retireve customer details.
         """
-        query = "SELECT * FROM customers WHERE id = %s"
-        return fetch_one(query, (customer_id,))
+        query = f"SELECT {select_list('customers', fields)} FROM customers WHERE id = %s"
+        return fetch_one(query, (customer_id,), prepared=True)
 
     @staticmethod
     def get_customer_history(customer_id):
         """
         Retrieve customer shop historical from database.
         """
-        query = """
-        SELECT wo.id, wo.status, wo.priority, wo.notes, wo.created_at
-        FROM work_orders wo
-        WHERE wo.customer_id = %s
-        ORDER BY wo.created_at DESC
-        """
-        return fetch_all(query, (customer_id,))
+        branches = [
+            f"""
+            SELECT wo.id, wo.status, wo.priority, wo.notes, wo.created_at
+            FROM {table} wo
+            WHERE wo.customer_id = %s
+            """
+            for table in work_order_tables()
+        ]
+        query = " UNION ALL ".join(branches) + " ORDER BY created_at DESC"
+        return fetch_all(query, (customer_id,) * len(branches))
 
     @staticmethod
     def add_customer_note(customer_id, note):
         """
-        Add customer note to database.
+        Queue a customer note for the database; returns the journal key.
         """
-        query = """
-        INSERT INTO customer_notes (customer_id, note, created_at)
-        VALUES (%s, %s, NOW())
-        """
-        execute_query(query, (customer_id, note), commit=True)
+        return get_write_journal().submit("add_customer_note", {
+            "customer_id": customer_id, "note": note, "created_at": _journal_timestamp(),
+        })
 
     @staticmethod
     def get_customer_notes(customer_id):
@@ -375,12 +1097,14 @@ class CustomerManager:
         Retrieve customer notes from database.
         """
         query = "SELECT note, created_at FROM customer_notes WHERE customer_id = %s ORDER BY created_at DESC"
-        return fetch_all(query, (customer_id,))
+        return fetch_all(query, (customer_id,), prepared=True)
 
     @staticmethod
-    def search_customers(search_term, filter_field=None):
+    @service_op("search_customers", reads=("customers",))
+    def search_customers(search_term, filter_field=None, fields="list"):
         """
         Search customers and format address if queried.
+        Returns the ``fields`` projection (slim grid rows by default).
         """
         filter_field_map = {
             "First Name": "first_name",
@@ -397,9 +1121,10 @@ class CustomerManager:
             "Address": ["street", "city", "state", "zip_code"],
         }
 
+        columns = select_list("customers", fields)
         if filter_field == "All" or not filter_field:
-            query = """
-            SELECT * FROM customers
+            query = f"""
+            SELECT {columns} FROM customers
             WHERE first_name LIKE %s OR last_name LIKE %s OR street LIKE %s OR city LIKE %s
             OR state LIKE %s OR zip_code LIKE %s OR customer_type LIKE %s OR student_id LIKE %s
             OR phone LIKE %s OR email LIKE %s
@@ -412,67 +1137,107 @@ class CustomerManager:
                 raise ValueError(f"Invalid filter field: {filter_field}")
 
             if isinstance(column, list):  # Handle combined fields like "Address"
-                query = "SELECT * FROM customers WHERE " + " OR ".join(
+                query = f"SELECT {columns} FROM customers WHERE " + " OR ".join(
                     f"{col} LIKE %s" for col in column
                 )
                 return fetch_all(query, tuple(f"%{search_term}%" for _ in column))
             else:
-                query = f"SELECT * FROM customers WHERE {column} LIKE %s"
+                query = f"SELECT {columns} FROM customers WHERE {column} LIKE %s"
                 return fetch_all(query, (f"%{search_term}%",))
 
     @staticmethod
-    def export_customers_to_csv(file_path):
+    def export_customers_to_csv(file_path, chunk_size=5000, progress=None):
         """
-        Export customer data to a CSV file.
+        Export customer data to a CSV file, streaming ``chunk_size`` rows at a time.
+        Returns the number of customers written.
         """
-        query = """
-        SELECT id, first_name, last_name, street, city, state, zip_code, customer_type, student_id, method_of_contact, phone, email
-        FROM customers
-        """
-        customers = fetch_all(query)
+        query = f"SELECT {select_list('customers', 'detail')} FROM customers ORDER BY id"
+        written = 0
         with open(file_path, mode="w", newline="", encoding="utf-8") as file:
             writer = csv.writer(file)
             writer.writerow([
                 "ID", "First Name", "Last Name", "Street", "City", "State", "Zip Code", 
                 "Customer Type", "Student ID", "Method of Contact", "Phone", "Email"
             ])
-            for customer in customers:
-                writer.writerow(customer)
+            for _, customers in stream_rows(query, chunk_size=chunk_size):
+                writer.writerows(customers)
+                written += len(customers)
+                if progress:
+                    progress(written)
+        return written
 
     @staticmethod
-    def import_customers_from_csv(file_path):
+    def import_customers_from_csv(file_path, chunk_size=1000, progress=None):
         """
-        Import customer data from a CSV file into the database.
+        Import customer data from a CSV file into the database, one batch
+        insert per ``chunk_size`` rows. Returns the number of customers imported.
+        Each chunk commits on its own, so a failure keeps the chunks before it.
         """
         query = """
         INSERT INTO customers 
         (first_name, last_name, street, city, state, zip_code, customer_type, student_id, method_of_contact, phone, email)
         VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
+        imported = 0
         with open(file_path, mode="r", encoding="utf-8") as file:
             reader = csv.DictReader(file)
-            data = [
+            rows = (
                 (
                     row["First Name"], row["Last Name"], row["Street"], row["City"],
                     row["State"], row["Zip Code"], row["Customer Type"], row["Student ID"],
                     row["Method of Contact"], row["Phone"], row["Email"]
                 )
                 for row in reader
-            ]
-            batch_insert(query, data)
+            )
+            try:
+                while True:
+                    data = list(islice(rows, chunk_size))
+                    if not data:
+                        break
+                    batch_insert(query, data)
+                    imported += len(data)
+                    if progress:
+                        progress(imported)
+            finally:
+                if imported:  # committed chunks stay even if a later one fails
+                    _tables_written(("customers",))
+        return imported
 
     @staticmethod
-    def get_all_customers():
-        """
-        Fetch all customers from the database.
+    def get_all_customers(fields="list", row_factory=RECORDS):
         """
-        query = """
-        SELECT id, first_name, last_name, street, city, state, zip_code, customer_type, student_id, method_of_contact, phone, email
-        FROM customers
+        Fetch all customers from the database (grid projection by default).
+        Pass row_factory=COLUMNAR to hold a large list in compact columns.
         """
-        return fetch_all(query)
+        query = f"SELECT {select_list('customers', fields)} FROM customers"
+        return fetch_all(query, row_factory=row_factory)
+
+@journal_op("add_customer", writes=("customers",))
+def _apply_add_customer(cursor, data):
+    query = """
+    INSERT INTO customers 
+    (first_name, last_name, street, city, state, zip_code, customer_type, student_id,
+     method_of_contact, phone, email, created_at) 
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """
+    cursor.execute(query, (
+        data["first_name"], data["last_name"], data["street"], data["city"],
+        data["state"], data["zip_code"], data["customer_type"], data["student_id"],
+        data["method_of_contact"], data["phone"], data["email"], data["created_at"]
+    ))
+    return cursor.lastrowid
+
+@journal_op("add_customer_note", writes=("customers",))
+def _apply_add_customer_note(cursor, data):
+    query = """
+    INSERT INTO customer_notes (customer_id, note, created_at)
+    VALUES (%s, %s, %s)
+    """
+    cursor.execute(query, (data["customer_id"], data["note"], data["created_at"]))
+    return cursor.lastrowid
 
 # Work Order Management
+@service_op("search_work_orders", reads=("work_orders",))
 def search_work_orders(search_term=None, filters=None):
     """
     Search work orders based on term and filters.
@@ -502,52 +1267,411 @@ def search_work_orders(search_term=None, filters=None):
 
 def add_work_order(data):
     """
-    Add a new work order to the database.
+    Queue a new work order for the database; returns the journal key.
     """
+    return get_write_journal().submit("add_work_order", {
+        "customer_id": data["customer_id"], "status": data["status"],
+        "priority": data["priority"], "technician": data["technician"],
+        "notes": data["notes"], "created_at": _journal_timestamp(),
+    })
+
+@journal_op("add_work_order", writes=("work_orders",))
+def _apply_add_work_order(cursor, data):
     query = """
-    INSERT INTO work_orders (customer_id, status, priority, technician, notes) 
-    VALUES (%s, %s, %s, %s, %s)
+    INSERT INTO work_orders (customer_id, status, priority, technician, notes, created_at) 
+    VALUES (%s, %s, %s, %s, %s, %s)
     """
-    execute_query(query, (
+    cursor.execute(query, (
         data["customer_id"], data["status"], data["priority"],
-        data["technician"], data["notes"]
-    ), commit=True)
-
-def update_work_order(work_order_id, data):
+        data["technician"], data["notes"], data["created_at"]
+    ))
+    work_order_id = cursor.lastrowid
+    _adjust_work_order_counters(cursor, _work_order_counter_deltas(
+        1, data["status"], data["technician"], data["created_at"][:10]
+    ))
+    return work_order_id
+
+@service_op("update_work_order", writes=("work_orders",))
+def update_work_order(work_order_id, data, reservations=()):
     """
-    Update an existing work order.
+    Update an existing work order and its status/technician counters.
+    ``reservations`` ((part_id, quantity) pairs) are reserved in the same
+    transaction; InsufficientStockError rolls the whole save back.
     """
+    if reservations:
+        _require_parts_tables()
     query = """
     UPDATE work_orders 
     SET status = %s, priority = %s, technician = %s, notes = %s 
     WHERE id = %s
     """
-    execute_query(query, (
-        data["status"], data["priority"], data["technician"],
-        data["notes"], work_order_id
-    ), commit=True)
-
+    with transaction() as tx:
+        previous = tx.fetch_one(
+            "SELECT status, technician FROM work_orders WHERE id = %s FOR UPDATE",
+            (work_order_id,), row_factory=TUPLES,
+        )
+        tx.execute(query, (
+            data["status"], data["priority"], data["technician"],
+            data["notes"], work_order_id
+        ))
+        if previous:
+            old_status, old_technician = previous
+            _adjust_work_order_counters(tx.cursor, _merge_counter_deltas(
+                _work_order_counter_deltas(-1, old_status, old_technician),
+                _work_order_counter_deltas(1, data["status"], data["technician"]),
+            ))
+        reserved = {}
+        if reservations:
+            reserved = _reserve_parts(tx, work_order_id, reservations)
+    _parts_reserved(reserved)
+
+@service_op("delete_work_order", writes=("work_orders",))
 def delete_work_order(work_order_id):
     """
-    Delete a work order from the database.
+    Delete a work order from the database and its counters.
     """
-    query = "DELETE FROM work_orders WHERE id = %s"
-    execute_query(query, (work_order_id,), commit=True)
+    with transaction() as tx:
+        previous = tx.fetch_one(
+            "SELECT status, technician, DATE(created_at) FROM work_orders WHERE id = %s FOR UPDATE",
+            (work_order_id,), row_factory=TUPLES,
+        )
+        tx.execute("DELETE FROM work_orders WHERE id = %s", (work_order_id,))
+        if previous:
+            _adjust_work_order_counters(tx.cursor, _work_order_counter_deltas(-1, *previous))
 
-def get_active_work_orders():
+@service_op("bulk_update_work_orders", writes=("work_orders",))
+def _bulk_update_work_orders(work_order_ids, column, value, action, user_id=None, performed_by=None):
+    """
+    Set one column on many work orders with a single UPDATE, adjust the
+    counters and write one audit batch, all in one transaction.
+
+    Returns:
+        int: Number of work orders updated.
+    """
+    ids = list(dict.fromkeys(int(i) for i in work_order_ids))
+    if not ids:
+        return 0
+    placeholders = ", ".join(["%s"] * len(ids))
+    details = f"{column} -> {value}" + (f" by {performed_by}" if performed_by else "")
+    with transaction() as tx:
+        previous = tx.fetch_all(
+            f"SELECT id, status, technician FROM work_orders WHERE id IN ({placeholders}) FOR UPDATE",
+            ids, row_factory=TUPLES,
+        )
+        tx.execute(
+            f"UPDATE work_orders SET {column} = %s WHERE id IN ({placeholders})",
+            (value, *ids),
+        )
+        if column in ("status", "technician"):
+            deltas = []
+            for _, old_status, old_technician in previous:
+                new_status = value if column == "status" else old_status
+                new_technician = value if column == "technician" else old_technician
+                deltas.append(_work_order_counter_deltas(-1, old_status, old_technician))
+                deltas.append(_work_order_counter_deltas(1, new_status, new_technician))
+            _adjust_work_order_counters(tx.cursor, _merge_counter_deltas(*deltas))
+        tx.executemany(
+            "INSERT INTO audit_log (user_id, action, table_name, record_id, details, timestamp) "
+            "VALUES (%s, %s, 'work_orders', %s, %s, NOW())",
+            [(user_id, action, row[0], details) for row in previous],
+        )
+    return len(previous)
+
+def bulk_close_work_orders(work_order_ids, user_id=None, performed_by=None):
+    """Close many work orders in one set-based UPDATE."""
+    return _bulk_update_work_orders(
+        work_order_ids, "status", CLOSED_STATUS, "bulk_close", user_id, performed_by
+    )
+
+def bulk_reassign_work_orders(work_order_ids, technician, user_id=None, performed_by=None):
+    """Assign many work orders to one technician in one set-based UPDATE."""
+    return _bulk_update_work_orders(
+        work_order_ids, "technician", technician, "bulk_reassign", user_id, performed_by
+    )
+
+def bulk_set_work_order_priority(work_order_ids, priority, user_id=None, performed_by=None):
+    """Change the priority of many work orders in one set-based UPDATE."""
+    return _bulk_update_work_orders(
+        work_order_ids, "priority", priority, "bulk_priority", user_id, performed_by
+    )
+
+def get_open_work_orders_for_follow_up():
+    """Open work orders with what the follow-up scheduler needs (read once at startup)."""
+    query = """
+    SELECT id, customer_id, status, technician, created_at
+    FROM work_orders
+    WHERE status != 'Closed'
+    """
+    return fetch_all(query)
+
+@service_op("get_active_work_orders", reads=("work_orders",))
+def get_active_work_orders(fields="list"):
     """
     Active work order query.
     """
-    query = "SELECT * FROM work_orders WHERE status != 'Closed'"
+    query = f"SELECT {select_list('work_orders', fields)} FROM work_orders WHERE status != 'Closed'"
     return execute_query(query)
 
-def get_new_work_orders_since(timestamp):
+@service_op("get_assigned_open_work_orders", reads=("work_orders",))
+def get_assigned_open_work_orders(technician, fields="list"):
+    """
+    Open work orders assigned to ``technician``, newest first.
+    """
+    query = (
+        f"SELECT {select_list('work_orders', fields)} FROM work_orders "
+        "WHERE technician = %s AND status != %s ORDER BY created_at DESC"
+    )
+    return fetch_all(query, (technician, CLOSED_STATUS))
+
+def get_new_work_orders_since(timestamp, fields="list"):
     """
     Request new work orders from database.
     """
-    query = "SELECT * FROM work_orders WHERE created_at >= %s"
+    query = f"SELECT {select_list('work_orders', fields)} FROM work_orders WHERE created_at >= %s"
     return execute_query(query, (timestamp,))
 
+# Change feed support
+CHANGE_FEED_FIELDS = ("id", "customer_id", "status", "priority", "technician", "created_at")
+
+def _work_order_change_column():
+    return "updated_at" if get_schema().has_column("work_orders", "updated_at") else "created_at"
+
+def get_change_feed_start():
+    """
+    Starting point for the work order change feed.
+
+    Returns:
+        tuple: ((changed_at, id) of the newest change, ids of orders not closed).
+    """
+    column = _work_order_change_column()
+    if column == "created_at":
+        logging.warning("work_orders has no updated_at column (migration 001); "
+                        "the change feed will only see new work orders.")
+    row = fetch_one(f"SELECT {column}, id FROM work_orders ORDER BY {column} DESC, id DESC LIMIT 1")
+    mark = (row[0], row[1]) if row else (datetime.datetime(1970, 1, 1), 0)
+    open_ids = [r[0] for r in fetch_all("SELECT id FROM work_orders WHERE status != 'Closed'")]
+    return mark, open_ids
+
+def get_work_orders_changed_since(changed_at, last_id, limit=500, fields=CHANGE_FEED_FIELDS):
+    """
+    Work orders changed after the (changed_at, id) high-water mark, oldest
+    first. Each row also carries its change timestamp as "changed_at".
+    """
+    column = _work_order_change_column()
+    query = f"""
+    SELECT {select_list('work_orders', fields)}, {column} AS changed_at
+    FROM work_orders
+    WHERE {column} > %s OR ({column} = %s AND id > %s)
+    ORDER BY {column}, id
+    LIMIT %s
+    """
+    return fetch_all(query, (changed_at, changed_at, last_id, limit))
+
+# Archive of closed work orders
+# Closed orders older than a cutoff move from work_orders to
+# work_orders_archive in small batches, keeping the hot table small. Lookups
+# that must see history (customer history, scans, single-order loads) read
+# both tables through work_order_tables(). The archive table comes from
+# migration 007; migrations that change work_orders change it too.
+ARCHIVE_TABLE = "work_orders_archive"
+
+def work_order_tables():
+    """Hot table first, then the archive if this database has one."""
+    if get_schema().has_table(ARCHIVE_TABLE):
+        return ("work_orders", ARCHIVE_TABLE)
+    return ("work_orders",)
+
+def get_work_order(work_order_id, columns):
+    """
+    Fetch one work order by id from the hot table, falling back to the archive.
+    ``columns`` is a projection (see select_list).
+    """
+    for table in work_order_tables():
+        row = fetch_one(
+            f"SELECT {select_list('work_orders', columns)} FROM {table} WHERE id = %s",
+            (work_order_id,),
+        )
+        if row:
+            return row
+    return None
+
+@service_op("get_customer_work_orders", reads=("work_orders",))
+def get_customer_work_orders(customer_id, fields="list"):
+    """
+    A customer's work orders (hot table and archive), newest first.
+    """
+    columns = resolve_fields("work_orders", fields, available=get_schema().columns("work_orders"))
+    # A UNION can only be ordered by a selected column
+    sorted_by_projection = not columns or "created_at" in columns
+    select = ", ".join(columns) if columns else "*"
+    if not sorted_by_projection:
+        select += ", created_at AS sort_key"
+    branches = [f"SELECT {select} FROM {table} WHERE customer_id = %s" for table in work_order_tables()]
+    query = " UNION ALL ".join(branches) + (
+        " ORDER BY created_at DESC" if sorted_by_projection else " ORDER BY sort_key DESC"
+    )
+    return fetch_all(query, (customer_id,) * len(branches),
+                     row_factory=RECORDS if sorted_by_projection else _without_sort_key)
+
+def _without_sort_key(fields, rows):
+    """Records without the trailing sort_key column."""
+    return record_rows(fields[:-1], (row[:-1] for row in rows))
+
+def get_work_order_attachments(work_order_id):
+    """
+    Attachment metadata for a work order: file_name, file_type, uploaded_at,
+    sha256 and file_path. Columns this schema lacks come back as None.
+    """
+    schema = get_schema()
+    optional = ", ".join(
+        column if schema.has_column("file_attachments", column) else f"NULL AS {column}"
+        for column in ("uploaded_at", "sha256")
+    )
+    return fetch_all(
+        f"SELECT file_name, file_type, {optional}, file_path "
+        "FROM file_attachments WHERE work_order_id = %s",
+        (work_order_id,),
+    )
+
+# Work order aggregates: the order plus everything the Work Orders tab shows
+# with it, fetched concurrently and cached together.
+_aggregate_cache = AggregateCache()
+_aggregate_pool = None
+_aggregate_pool_lock = threading.Lock()
+
+def _run_concurrently(*calls):
+    """Run zero-argument callables on the shared loader pool; results in order."""
+    global _aggregate_pool
+    with _aggregate_pool_lock:
+        if _aggregate_pool is None:
+            _aggregate_pool = ThreadPoolExecutor(4, thread_name_prefix="aggregate-loader")
+    futures = [_aggregate_pool.submit(call) for call in calls]
+    return [future.result() for future in futures]
+
+def load_work_order_aggregate(work_order_id, columns="detail", use_cache=True):
+    """
+    Load a work order with its customer, the customer's other orders, the
+    customer's notes, the order's attachment metadata and its reserved parts.
+
+    The order, its attachments and its parts are fetched in parallel; once the order
+    names its customer, the three customer queries run in parallel.
+
+    Returns:
+        WorkOrderAggregate, or None if the work order does not exist.
+    """
+    key = (work_order_id, columns if isinstance(columns, str) else tuple(columns))
+    if use_cache:
+        cached = _aggregate_cache.get(key)
+        if cached is not None:
+            return cached
+
+    work_order, attachments, parts = _run_concurrently(
+        lambda: get_work_order(work_order_id, columns),
+        lambda: get_work_order_attachments(work_order_id),
+        lambda: get_work_order_parts(work_order_id),
+    )
+    if work_order is None:
+        return None
+
+    customer_id = work_order.get("customer_id")
+    customer, customer_orders, notes = None, [], []
+    if customer_id is not None:
+        customer, customer_orders, notes = _run_concurrently(
+            lambda: CustomerManager.get_customer_details(customer_id, fields="list"),
+            lambda: get_customer_work_orders(customer_id),
+            lambda: CustomerManager.get_customer_notes(customer_id),
+        )
+    aggregate = WorkOrderAggregate(work_order, customer, customer_orders, notes, attachments, parts)
+    _aggregate_cache.put(key, aggregate)
+    return aggregate
+
+def discard_work_order_aggregate(work_order_id):
+    """Forget the cached aggregate for a work order after it (or its customer) changes."""
+    _aggregate_cache.discard(work_order_id)
+
+@service_op("archive_closed_work_orders", writes=("work_orders",))
+def archive_closed_work_orders(older_than_days, batch_size=500):
+    """
+    Move one batch of closed work orders older than the cutoff to the archive.
+
+    Returns:
+        int: Number of work orders moved (0 when nothing is left to archive).
+    """
+    schema = get_schema()
+    if not schema.has_table(ARCHIVE_TABLE):
+        raise DatabaseError("The work order archive is not set up; run: python cli.py migrate")
+    archive_columns = set(schema.columns(ARCHIVE_TABLE))
+    columns = ", ".join(c for c in schema.columns("work_orders") if c in archive_columns)
+    age_column = _work_order_change_column()
+    with transaction() as tx:
+        ids = [row[0] for row in tx.fetch_all(f"""
+        SELECT id FROM work_orders
+        WHERE status = 'Closed' AND {age_column} < NOW() - INTERVAL %s DAY
+        ORDER BY id
+        LIMIT %s
+        FOR UPDATE
+        """, (older_than_days, batch_size), row_factory=TUPLES)]
+        if not ids:
+            return 0
+        placeholders = ", ".join(["%s"] * len(ids))
+        tx.execute(
+            f"INSERT INTO {ARCHIVE_TABLE} ({columns}) "
+            f"SELECT {columns} FROM work_orders WHERE id IN ({placeholders})",
+            ids,
+        )
+        tx.execute(f"DELETE FROM work_orders WHERE id IN ({placeholders})", ids)
+    logging.info("Archived %d closed work orders.", len(ids))
+    return len(ids)
+
+# Follow-up email deliveries
+# notification_deliveries (migration 005) records who has been emailed.
+# Without it nothing would stop every run emailing every customer again, so
+# sending refuses to start until the migration has run.
+def _require_notification_deliveries():
+    if not get_schema().has_table("notification_deliveries"):
+        raise DatabaseError("Follow-up emails are not set up; run: python cli.py migrate")
+
+def get_pending_notification_emails(created_before, max_attempts=3, limit=5000):
+    """
+    Open work orders created before ``created_before`` whose customer has an
+    email address and has not been sent a follow-up yet (failed sends are
+    retried up to ``max_attempts`` times).
+    """
+    _require_notification_deliveries()
+    query = """
+    SELECT wo.id AS work_order_id, wo.status, wo.technician, wo.created_at,
+           c.first_name, c.last_name, c.email
+    FROM work_orders wo
+    JOIN customers c ON c.id = wo.customer_id
+    LEFT JOIN notification_deliveries nd ON nd.work_order_id = wo.id
+    WHERE wo.status != 'Closed'
+      AND wo.created_at <= %s
+      AND c.email IS NOT NULL AND c.email != ''
+      AND (nd.work_order_id IS NULL OR (nd.status = 'failed' AND nd.attempts < %s))
+    ORDER BY wo.created_at
+    LIMIT %s
+    """
+    return fetch_all(query, (created_before, max_attempts, limit))
+
+def record_notification_deliveries(results):
+    """
+    Record a batch of delivery results in one batched statement.
+
+    Args:
+        results (list): (work_order_id, status, sent_at, error) tuples.
+    """
+    if not results:
+        return
+    _require_notification_deliveries()
+    query = """
+    INSERT INTO notification_deliveries (work_order_id, status, attempts, sent_at, error)
+    VALUES (%s, %s, 1, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        status = VALUES(status), attempts = attempts + 1,
+        sent_at = VALUES(sent_at), error = VALUES(error)
+    """
+    batch_insert(query, [tuple(result) for result in results])
+
 # Messaging
 def add_message(user_id, role, message):
     """
@@ -570,27 +1694,404 @@ def get_messages_for_user(user_id, role):
     """
     return execute_query(query, (role, user_id))
 
+# Analytics export
+# table -> (time column ordering the export, partition columns after month)
+ANALYTICS_TABLES = {
+    "work_orders": ("created_at", ("status",)),
+    "customers": ("created_at", ()),
+    "audit_log": ("timestamp", ()),
+}
+
+def _analytics_query(table, time_column, mark):
+    schema = get_schema()
+    if not schema.loaded:
+        raise DatabaseUnavailableError("Could not read the database schema (see app.log).")
+    sources = work_order_tables() if table == "work_orders" else (table,)
+    # Archived orders are history too; export the columns both tables have
+    shared = set.intersection(*(set(schema.columns(name)) for name in sources))
+    columns = [c for c in schema.columns(table) if c in shared]
+    if time_column not in columns or "id" not in columns:
+        raise DatabaseError(f"{table} has no {time_column}/id columns to export by.")
+    column_list = ", ".join(columns)
+    if table == "work_orders":
+        source = " UNION ALL ".join(f"SELECT {column_list} FROM {name}" for name in sources)
+        source = f"({source}) AS history"
+    else:
+        source = table
+    query = f"SELECT {column_list} FROM {source}"
+    params = ()
+    if mark is not None:
+        query += f" WHERE {time_column} > %s OR ({time_column} = %s AND id > %s)"
+        params = (mark[0], mark[0], mark[1])
+    return query + f" ORDER BY {time_column}, id", params
+
+def export_analytics(root, tables=None, incremental=True, chunk_size=5000, progress=None):
+    """
+    Export tables to partitioned Parquet under ``root`` for offline analysis.
+
+    Args:
+        tables: Names from ANALYTICS_TABLES (default: all of them).
+        incremental (bool): Only rows after each table's high-water mark.
+        progress (callable): (table, rows so far) after each chunk.
+
+    Returns:
+        dict: table -> rows written.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        DatabaseError: If a query fails (that table's mark is left unchanged).
+    """
+    exporter = ParquetExporter(root)
+    written = {}
+    for table in tables or ANALYTICS_TABLES:
+        time_column, partition_by = ANALYTICS_TABLES[table]
+        mark = exporter.high_water_mark(table) if incremental else None
+        query, params = _analytics_query(table, time_column, mark)
+        stream = stream_rows(query, params, chunk_size)
+        first = next(stream, None)
+        if first is None:
+            written[table] = 0
+            continue
+        fields = first[0]
+
+        def chunks(first_rows=first[1], stream=stream):
+            yield first_rows
+            for _, rows in stream:
+                yield rows
+
+        written[table] = exporter.export(
+            table, fields, chunks(), time_column, partition_by,
+            types={c: column_type(table, c) for c in fields},
+            incremental=incremental,
+            progress=(lambda count, table=table: progress(table, count)) if progress else None,
+        )
+        logging.info("Exported %d %s rows to %s.", written[table], table, root)
+    return written
+
+# Parts inventory
+# parts is the catalog (unique part_number, stock on hand); work_order_parts
+# records what each work order has reserved. Reservations decrement stock
+# with a guarded UPDATE, so concurrent terminals can never oversell.
+# Both tables come from migration 004.
+_parts_index = None
+_parts_index_lock = threading.Lock()
+
+PARTS_COLUMNS = "id, part_number, name, manufacturer, model, quantity_on_hand"
+
+def _require_parts_tables():
+    """Parts writes need migration 004; reads just see an empty catalog without it."""
+    if not get_schema().has_table("parts"):
+        raise DatabaseError("The parts inventory is not set up; run: python cli.py migrate")
+
+@service_op("add_part", writes=("parts",))
+def add_part(part_number, name, manufacturer=None, model=None, quantity=0):
+    """
+    Add a part to the catalog, or add ``quantity`` to its stock if the part
+    number already exists.
+    """
+    _require_parts_tables()
+    execute_query("""
+    INSERT INTO parts (part_number, name, manufacturer, model, quantity_on_hand)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE quantity_on_hand = quantity_on_hand + VALUES(quantity_on_hand)
+    """, (part_number, name, manufacturer, model, quantity), commit=True)
+    _invalidate_parts_index()
+
+def get_parts_catalog():
+    """Every part, in PartsIndex field order."""
+    if not get_schema().has_table("parts"):
+        return []
+    return fetch_all(f"SELECT {PARTS_COLUMNS} FROM parts ORDER BY part_number", row_factory=TUPLES)
+
+def search_parts(prefix, limit=50):
+    """Server-side part-number prefix search (uses the unique index)."""
+    if not get_schema().has_table("parts"):
+        return []
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return fetch_all(
+        f"SELECT {PARTS_COLUMNS} FROM parts WHERE part_number LIKE %s ORDER BY part_number LIMIT %s",
+        (escaped + "%", limit),
+    )
+
+def _invalidate_parts_index():
+    global _parts_index
+    with _parts_index_lock:
+        _parts_index = None  # rebuilt on next use
+
+def get_parts_index():
+    """The in-memory autocomplete index, loading the catalog on first use."""
+    global _parts_index
+    with _parts_index_lock:
+        if _parts_index is None:
+            _parts_index = PartsIndex.from_rows(get_parts_catalog())
+        return _parts_index
+
+def get_work_order_parts(work_order_id):
+    """Parts reserved on a work order: part_id, part_number, name, quantity, reserved_at."""
+    if not get_schema().has_table("work_order_parts"):
+        return []
+    return fetch_all("""
+    SELECT wop.part_id, p.part_number, p.name, wop.quantity, wop.reserved_at
+    FROM work_order_parts wop
+    JOIN parts p ON p.id = wop.part_id
+    WHERE wop.work_order_id = %s
+    ORDER BY wop.reserved_at
+    """, (work_order_id,))
+
+def _reserve_parts(tx, work_order_id, reservations):
+    """
+    Decrement stock and record reservations inside transaction ``tx``.
+    Raises InsufficientStockError (rolling ``tx`` back) if any part is short.
+    """
+    totals = {}
+    for part_id, quantity in reservations:
+        totals[int(part_id)] = totals.get(int(part_id), 0) + int(quantity)
+    shortages = []
+    # Fixed lock order (by part id) so concurrent reservations can't deadlock
+    for part_id in sorted(totals):
+        updated = tx.execute(
+            "UPDATE parts SET quantity_on_hand = quantity_on_hand - %s "
+            "WHERE id = %s AND quantity_on_hand >= %s",
+            (totals[part_id], part_id, totals[part_id]),
+        )
+        if updated != 1:
+            shortages.append((part_id, totals[part_id]))
+    if shortages:
+        _invalidate_parts_index()  # stock moved under us; reload true counts
+        raise InsufficientStockError(shortages)
+    tx.executemany(
+        "INSERT INTO work_order_parts (work_order_id, part_id, quantity) VALUES (%s, %s, %s)",
+        [(work_order_id, part_id, quantity) for part_id, quantity in totals.items()],
+    )
+    return totals
+
+@service_op("reserve_parts", writes=("parts",))
+def reserve_parts(work_order_id, reservations):
+    """
+    Reserve parts for a work order in one transaction.
+
+    Args:
+        reservations: (part_id, quantity) pairs.
+
+    Raises:
+        InsufficientStockError: If any part lacks stock (nothing is reserved).
+    """
+    _require_parts_tables()
+    with transaction() as tx:
+        totals = _reserve_parts(tx, work_order_id, reservations)
+    _parts_reserved(totals)
+    discard_work_order_aggregate(work_order_id)
+
+def _parts_reserved(totals):
+    """Mirror committed stock decrements into the autocomplete index."""
+    index = _parts_index
+    if index is not None:
+        for part_id, quantity in totals.items():
+            index.adjust_stock(part_id, -quantity)
+
+# Session bootstrap
+def prefetch_session(username, role):
+    """
+    Start loading what the main window shows first, concurrently over pooled
+    connections, as soon as ``username`` has logged in.
+
+    Returns:
+        SessionCache: "metrics", "assigned_work_orders", "messages",
+        "technicians" and "user_id" (plus the schema catalog, warmed as "schema").
+    """
+    def messages():
+        user_id = get_user_id(username)
+        return get_messages_for_user(user_id, role) if user_id is not None else []
+
+    return SessionCache({
+        "schema": get_schema,
+        "user_id": lambda: get_user_id(username),
+        "metrics": get_work_order_metrics,
+        "assigned_work_orders": lambda: get_assigned_open_work_orders(username),
+        "messages": messages,
+        "technicians": get_technicians,
+    })
+
+# Materialized work order counters
+# work_order_counters (migration 002) keeps one row per (dimension, bucket):
+# dimension is "status", "technician" or "day" (YYYY-MM-DD of created_at).
+# Work order write paths adjust it in the same transaction;
+# rebuild_work_order_counters() recomputes it from scratch as a reconciler.
+# Databases without the table are counted directly instead.
+# The rebuild also writes a ("meta", "seeded") marker row in its transaction.
+# Until the marker exists the counters aren't trusted, even if a write has
+# already added a bucket to the empty table.
+CLOSED_STATUS = "Closed"
+_SEEDED_MARKER = ("meta", "seeded")
+_counters_seeded = False
+_COUNTER_EXPRESSIONS = {
+    "status": "COALESCE(status, '')",
+    "technician": "COALESCE(technician, '')",
+    "day": "DATE(created_at)",
+}
+
+def _counters_available():
+    return get_schema().has_table("work_order_counters")
+
+def _all_work_orders_source():
+    # Archived orders stay counted: archiving moves rows, not history.
+    return " UNION ALL ".join(
+        f"SELECT status, technician, created_at FROM {table}" for table in work_order_tables()
+    )
+
+def _work_order_counter_deltas(sign, status, technician, created_day=None):
+    deltas = {("status", status or ""): sign, ("technician", technician or ""): sign}
+    if created_day is not None:
+        deltas[("day", str(created_day))] = sign
+    return deltas
+
+def _merge_counter_deltas(*deltas):
+    merged = {}
+    for delta in deltas:
+        for key, value in delta.items():
+            merged[key] = merged.get(key, 0) + value
+    return merged
+
+def _adjust_work_order_counters(cursor, deltas):
+    """Apply counter deltas on the caller's cursor (inside its transaction)."""
+    rows = [(dimension, bucket, delta) for (dimension, bucket), delta in deltas.items() if delta]
+    if rows and _counters_available():
+        cursor.executemany(
+            "INSERT INTO work_order_counters (dimension, bucket, total) VALUES (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE total = total + VALUES(total)",
+            rows,
+        )
+
+def rebuild_work_order_counters():
+    """
+    Recompute every counter from work_orders in one transaction. Run hourly
+    from one machine (python cli.py reconcile-counters) to correct drift, and
+    to seed an empty counters table.
+    """
+    if not _counters_available():
+        logging.info("work_order_counters not created yet (migration 002); nothing to rebuild.")
+        return
+    with transaction() as tx:
+        tx.execute("DELETE FROM work_order_counters")
+        source = _all_work_orders_source()
+        for dimension, expression in _COUNTER_EXPRESSIONS.items():
+            tx.execute(f"""
+            INSERT INTO work_order_counters (dimension, bucket, total)
+            SELECT '{dimension}', {expression}, COUNT(*)
+            FROM ({source}) AS all_orders
+            GROUP BY {expression}
+            """)
+        tx.execute(
+            "INSERT INTO work_order_counters (dimension, bucket, total) VALUES (%s, %s, 1)",
+            _SEEDED_MARKER,
+        )
+    logging.info("Work order counters rebuilt.")
+
+def _ensure_counters_seeded():
+    """Rebuild the counters once if they were never seeded (checked once per process)."""
+    global _counters_seeded
+    if _counters_seeded or not _counters_available():
+        return
+    marker = fetch_one(
+        "SELECT total FROM work_order_counters WHERE dimension = %s AND bucket = %s", _SEEDED_MARKER
+    )
+    if marker is None:
+        rebuild_work_order_counters()
+    _counters_seeded = True
+
+def get_work_order_counters(dimension):
+    """
+    Read one counter dimension ("status", "technician" or "day").
+
+    Returns:
+        dict: bucket -> count.
+    """
+    if not _counters_available():
+        expression = _COUNTER_EXPRESSIONS[dimension]
+        rows = fetch_all(f"""
+        SELECT {expression}, COUNT(*) FROM ({_all_work_orders_source()}) AS all_orders
+        GROUP BY {expression}
+        """, row_factory=TUPLES)
+        return {str(bucket): int(total) for bucket, total in rows}
+    rows = fetch_all(
+        "SELECT bucket, total FROM work_order_counters WHERE dimension = %s", (dimension,)
+    )
+    return {bucket: int(total) for bucket, total in rows}
+
 # Statistics for cool people
+@service_op("get_work_order_metrics", reads=("work_orders",))
 def get_work_order_metrics():
     """
-    Get work order statistics.
+    Get work order statistics from the materialized counters.
+
+    "Active" means every status except Closed, the same rule as
+    get_active_work_orders().
     """
-    query = """
-    SELECT 
-        COUNT(*) AS total_work_orders,
-        SUM(CASE WHEN status = 'Active' THEN 1 ELSE 0 END) AS active_work_orders,
-        SUM(CASE WHEN created_at >= NOW() - INTERVAL 1 DAY THEN 1 ELSE 0 END) AS new_in_last_24_hours
-    FROM work_orders
+    _ensure_counters_seeded()
+    by_status = get_work_order_counters("status")
+    result = fetch_one(
+        "SELECT COUNT(*) FROM work_orders WHERE created_at >= NOW() - INTERVAL 1 DAY"
+    )
+    return {
+        "total": sum(by_status.values()),
+        "active": sum(n for status, n in by_status.items() if status != CLOSED_STATUS),
+        "new_last_24_hours": result[0] if result else 0,
+    }
+
+# Technician reports
+# Turnaround runs from created_at to the order's last change while Completed
+# or Closed (updated_at when change tracking is on), so later edits to a
+# finished order stretch it; good enough for trends, not for billing.
+DONE_STATUSES = ("Completed", CLOSED_STATUS)
+_report_cache = ReportCache()
+
+def get_work_order_lifecycle(start, end):
     """
-    result = fetch_one(query)
-    if result:
-        return {
-            "total": result[0],
-            "active": result[1],
-            "new_last_24_hours": result[2]
-        }
-    return {"total": 0, "active": 0, "new_last_24_hours": 0}
+    Bulk lifecycle columns for reports.
+
+    Returns:
+        tuple: (finished, backlog) ColumnBatches. finished has technician,
+        created, finished (epoch seconds) for orders done in [start, end);
+        backlog has technician, created for every order still open.
+    """
+    schema = get_schema()
+    done = ", ".join(["%s"] * len(DONE_STATUSES))
+    finished_parts, params = [], []
+    for table in work_order_tables():
+        column = "updated_at" if schema.has_column(table, "updated_at") else "created_at"
+        finished_parts.append(f"""
+        SELECT COALESCE(technician, 'Unassigned') AS technician,
+               UNIX_TIMESTAMP(created_at) AS created, UNIX_TIMESTAMP({column}) AS finished
+        FROM {table}
+        WHERE status IN ({done}) AND {column} >= %s AND {column} < %s
+        """)
+        params += [*DONE_STATUSES, start, end]
+    finished = fetch_all(" UNION ALL ".join(finished_parts), tuple(params), row_factory=COLUMNAR)
+    # Archived orders are all closed, so the backlog is in the hot table only
+    backlog = fetch_all(f"""
+    SELECT COALESCE(technician, 'Unassigned') AS technician, UNIX_TIMESTAMP(created_at) AS created
+    FROM work_orders
+    WHERE status NOT IN ({done})
+    """, DONE_STATUSES, row_factory=COLUMNAR)
+    return finished, backlog
 
+def get_technician_report(start, end, use_cache=True):
+    """
+    Per-technician throughput and turnaround for orders finished in
+    [start, end), plus the age histogram of today's open orders.
+    Reports are cached per date range for a few minutes.
+    """
+    key = (start, end)
+    if use_cache:
+        cached = _report_cache.get(key)
+        if cached is not None:
+            return cached
+    finished, backlog = get_work_order_lifecycle(start, end)
+    report = build_report(start, end, finished, backlog)
+    _report_cache.put(key, report)
+    return report
+
+@service_op("get_customer_metrics", reads=("customers",))
 def get_customer_metrics():
     """
     Get customer statistics.
@@ -603,6 +2104,7 @@ def get_customer_metrics():
     """
     return fetch_one(query)
 
+@service_op("get_table_statistics", reads=("customers", "work_orders"))
 def get_table_statistics():
     """
     Retrieve general table statistics for dashboard display.
@@ -617,43 +2119,48 @@ def get_table_statistics():
 def fetch_user_data_by_role(
                             role, resource,
                             current_user_id=None,
-                            current_team_id=None
+                            current_team_id=None,
+                            fields=None
                             ):
     """
    Get user data metrics by role. 
     """
+    columns = select_list(resource, fields)
 
     if role == "technician":
         # Technicians see limited data
-        query = f"SELECT * FROM {resource} WHERE assigned_to = %s"
+        query = f"SELECT {columns} FROM {resource} WHERE assigned_to = %s"
         return fetch_all(query, (current_user_id,))
     elif role == "manager":
         # Managers see all their team's data
-        query = f"SELECT * FROM {resource} WHERE team_id = %s"
+        query = f"SELECT {columns} FROM {resource} WHERE team_id = %s"
         return fetch_all(query, (current_team_id,))
     elif role == "superuser":
         # Superusers see everything
-        query = f"SELECT * FROM {resource}"
+        query = f"SELECT {columns} FROM {resource}"
         return fetch_all(query)
     else:
         raise DatabaseError("Invalid role or resource access.")
 
 # Generic search
-def search_table(table_name, search_term, columns):
+def search_table(table_name, search_term, columns, fields=None):
     """
-    Search table generic.
+    Search table generic. ``columns`` are matched; ``fields`` are returned.
     """
-    like_clauses = " OR ".join([f"{col} LIKE %s" for col in columns])
-    query = f"SELECT * FROM {table_name} WHERE {like_clauses}"
-    params = [f"%{search_term}%"] * len(columns)
+    searchable = resolve_fields(table_name, columns, available=get_schema().columns(table_name))
+    if not searchable:
+        raise ValueError(f"No searchable columns for table {table_name}")
+    like_clauses = " OR ".join([f"{col} LIKE %s" for col in searchable])
+    query = f"SELECT {select_list(table_name, fields)} FROM {table_name} WHERE {like_clauses}"
+    params = [f"%{search_term}%"] * len(searchable)
     return fetch_all(query, params)
 
 # Pagination
-def fetch_with_pagination(table_name, offset=0, limit=10):
+def fetch_with_pagination(table_name, offset=0, limit=10, fields=None):
     """
     Table pagination for large data queries.
     """
-    query = f"SELECT * FROM {table_name} LIMIT %s OFFSET %s"
+    query = f"SELECT {select_list(table_name, fields)} FROM {table_name} LIMIT %s OFFSET %s"
     return fetch_all(query, (limit, offset))
 
 # Bulk operations
@@ -700,7 +2207,7 @@ def validate_foreign_key(table_name, column_name, value):
 
 if __name__ == "__main__":
     try:
-        with get_db_connection() as connection:
+        with get_db_connection(read_only=True) as connection:
             print("Successfully connected to the database!")
     except DatabaseError as e:
         print(f"Error: {e}")
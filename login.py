@@ -1,8 +1,10 @@
 # login.py
+import argparse
 import tkinter as tk
 from tkinter import messagebox
-from database import authenticate_user
+from database import authenticate_user, prefetch_session, configure_service
 from main import MainGUI
+from ui_helpers import StartupTimer
 
 class LoginWindow:
     def __init__(self, root):
@@ -25,14 +27,24 @@ class LoginWindow:
         password = self.password_entry.get()
         role = authenticate_user(username, password)
         if role:
+            startup = StartupTimer()  # login-to-usable-window report
+            # Load the first screens' data while the main window is built
+            session = prefetch_session(username, role)
             self.root.destroy()
             main_root = tk.Tk()
-            app = MainGUI(main_root, user_role=role, username=username)
+            app = MainGUI(main_root, user_role=role, username=username,
+                          startup_timer=startup, session=session)
             main_root.mainloop()
         else:
             messagebox.showerror("Login Failed", "Invalid username or password.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repair shop terminal.")
+    parser.add_argument("--service", metavar="URL",
+                        help="client mode: read through the shared-cache service (overrides SERVICE_URL)")
+    args = parser.parse_args()
+    if args.service:
+        configure_service(args.service)
     root = tk.Tk()
     app = LoginWindow(root)
     root.mainloop()
@@ -24,6 +24,8 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 # -------------------------------------------
 
+import logging
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 
@@ -31,29 +33,56 @@ from tabs.customer_tab import CustomerTab
 from tabs.workorder_tab import WorkOrderTab
 # NOTE: EmployeeTab import is deferred in init_tabs() for safety.
 
-from database import get_work_order_metrics
+from database import (
+    get_work_order_metrics, get_write_journal, get_schema,
+    get_change_feed_start, get_work_orders_changed_since,
+    get_open_work_orders_for_follow_up, get_replicas, check_replicas,
+)
+from ui_helpers import MainThreadQueue, LazyNotebook, StartupTimer
+from utils.change_feed import WorkOrderChangeFeed
+from utils.background import PeriodicJob
+from utils.deadlines import DeadlineScheduler
 from utils.scanning import parse_scan_payload
 from database import (
-    fetch_all,
     find_customer_by_barcode, find_customer_by_contact, find_customer_by_name,
     find_work_order_by_code_or_number,
 )
 
+# How often read replicas are health-checked (seconds)
+REPLICA_CHECK_INTERVAL = 15
+# How often the dashboard re-reads its metrics, so "new in last 24 hours"
+# drops orders as they age out (seconds)
+DASHBOARD_REFRESH_INTERVAL = 300
+
 
 class MainGUI:
     """Main GUI interface controller."""
-    def __init__(self, window, user_role="root", username="Admin"):
+    def __init__(self, window, user_role="root", username="Admin", startup_timer=None,
+                 session=None):
         self.root = window
         self.user_role = user_role
         self.username = username
+        # SessionCache prefetched at login (metrics, assigned orders, messages, technicians)
+        self.session = session
+        # Started at login when launched from there, so the report covers login-to-usable
+        self.startup = startup_timer or StartupTimer()
 
         self.root.title(f"Repair Shop Management - Logged in as {self.username} ({self.user_role})")
         self.root.geometry("1200x800")
 
-        # Dashboard
-        self.dashboard_frame = tk.Frame(self.root)
-        self.dashboard_frame.pack(side="top", fill="x")
-        self.load_dashboard()
+        # Results of background work reach Tk through this queue
+        self.ui_queue = MainThreadQueue(self.root)
+
+        # Dashboard (metrics arrive from a worker thread)
+        with self.startup.step("dashboard"):
+            self.dashboard_frame = tk.Frame(self.root)
+            self.dashboard_frame.pack(side="top", fill="x")
+            self.load_dashboard()
+
+            # Pending-sync indicator for writes still in the local journal
+            self.sync_status = tk.StringVar()
+            tk.Label(self.dashboard_frame, textvariable=self.sync_status).pack()
+            self.refresh_sync_status()
 
         # ----- Global Scan box (right side of the dashboard) -----
         scan_frame = tk.Frame(self.dashboard_frame)
@@ -69,38 +98,159 @@ class MainGUI:
         self.root.bind("<F9>", lambda e: self.global_scan_entry.focus_set())
         # ---------------------------------------------------------
 
-        # Notebook for Tabs
-        self.notebook = ttk.Notebook(self.root)
-        self.notebook.pack(fill="both", expand=True)
-        self.init_tabs()
+        # Background event sources; their callbacks reach Tk through ui_queue
+        self.change_feed = WorkOrderChangeFeed(get_change_feed_start, get_work_orders_changed_since)
+        self.deadlines = DeadlineScheduler(get_open_work_orders_for_follow_up)
+
+        # Notebook for Tabs; each tab is built the first time it is shown
+        with self.startup.step("tabs"):
+            self.notebook = ttk.Notebook(self.root)
+            self.notebook.pack(fill="both", expand=True)
+            self.tabs = LazyNotebook(self.notebook, timer=self.startup)
+            self.init_tabs()
+
+        # Push work order changes to the dashboard and Work Orders tab in place,
+        # and keep follow-up deadlines current without rescanning work_orders
+        with self.startup.step("background services"):
+            self.change_feed.subscribe(self.ui_queue.wrap(self.apply_work_order_changes))
+            self.change_feed.subscribe(self.ui_queue.wrap(
+                self._when_built(self.workorder_tab_frame, "apply_work_order_changes")
+            ))
+            self.change_feed.subscribe(self.deadlines.apply_changes)
+            self.deadlines.subscribe(self.ui_queue.wrap(
+                self._when_built(self.workorder_tab_frame, "on_follow_ups_due")
+            ))
+            self.change_feed.start()
+            self.deadlines.start()
+
+            # Take failed or lagging read replicas out of rotation (and back)
+            self.replica_health = None
+            if get_replicas() is not None:
+                self.replica_health = PeriodicJob(
+                    "replica-health", check_replicas, REPLICA_CHECK_INTERVAL, run_immediately=True
+                )
+                self.replica_health.start()
+
+        # Build the visible tab, then report once the window is idle (usable)
+        self.root.after_idle(self._finish_startup)
+
+    def _finish_startup(self):
+        self.tabs.ensure_current()
+        self.startup.report()
 
     def load_dashboard(self):
-        """Load dashboard metrics."""
-        try:
-            metrics = get_work_order_metrics()
-        except Exception as e:
-            messagebox.showerror("Dashboard", f"Failed to fetch metrics: {e}")
-            return
+        """Lay out the dashboard and load its metrics off the main thread."""
+        self.metrics = {"total": 0, "active": 0, "new_last_24_hours": 0}
+        self.metric_vars = {key: tk.StringVar() for key in self.metrics}
+        tk.Label(self.dashboard_frame, textvariable=self.metric_vars["total"]).pack()
+        tk.Label(self.dashboard_frame, textvariable=self.metric_vars["active"]).pack()
+        tk.Label(self.dashboard_frame, textvariable=self.metric_vars["new_last_24_hours"]).pack()
+        self._render_metrics()
+
+        self.messages_var = tk.StringVar()
+        tk.Label(self.dashboard_frame, textvariable=self.messages_var).pack()
+        if self.session is not None:
+            self.session.when_ready("messages", self.ui_queue.wrap(self._show_messages))
+        self.root.after(DASHBOARD_REFRESH_INTERVAL * 1000, self.refresh_metrics)
+
+        # Prefetched at login: show it now if it has already arrived
+        if self.session is not None and self.session.done("metrics"):
+            metrics = self.session.get("metrics")
+            if metrics is not None:
+                self._on_metrics_loaded(metrics, None)
+                return
+
+        def worker():
+            try:
+                metrics = self.session.get("metrics") if self.session is not None else None
+                if metrics is None:
+                    # Warm the schema catalog for the tabs while we're off the main thread
+                    get_schema()
+                    metrics = get_work_order_metrics()
+            except Exception as e:  # pylint: disable=broad-except
+                self.ui_queue.post(self._on_metrics_loaded, {}, e)
+            else:
+                self.ui_queue.post(self._on_metrics_loaded, metrics, None)
+
+        threading.Thread(target=worker, name="dashboard-load", daemon=True).start()
 
-        # If you later refresh, consider clearing children or reusing StringVars.
-        tk.Label(self.dashboard_frame, text=f"Total Work Orders: {metrics.get('total', 0)}").pack()
-        tk.Label(self.dashboard_frame, text=f"Active Work Orders: {metrics.get('active', 0)}").pack()
-        tk.Label(
-            self.dashboard_frame,
-            text=f"New in Last 24 Hours: {metrics.get('new_last_24_hours', 0)}"
-        ).pack()
+    def refresh_metrics(self):
+        """Re-read the metrics off the main thread; the change feed only ever adds to them."""
+        def worker():
+            try:
+                metrics = get_work_order_metrics()
+            except Exception as e:  # pylint: disable=broad-except
+                logging.warning("Dashboard refresh failed: %s", e)
+            else:
+                self.ui_queue.post(self._on_metrics_loaded, metrics, None)
+
+        threading.Thread(target=worker, name="dashboard-refresh", daemon=True).start()
+        self.root.after(DASHBOARD_REFRESH_INTERVAL * 1000, self.refresh_metrics)
+
+    def _show_messages(self, messages):
+        if not messages:
+            self.messages_var.set("No new messages")
+            return
+        latest = messages[0][0]
+        self.messages_var.set(f"Messages ({len(messages)}): {latest}")
+
+    def _on_metrics_loaded(self, metrics, error):
+        if error is not None:
+            messagebox.showerror("Dashboard", f"Failed to fetch metrics: {error}")
+        for key in self.metrics:
+            self.metrics[key] = metrics.get(key) or 0
+        self._render_metrics()
+
+    def _render_metrics(self):
+        self.metric_vars["total"].set(f"Total Work Orders: {self.metrics['total']}")
+        self.metric_vars["active"].set(f"Active Work Orders: {self.metrics['active']}")
+        self.metric_vars["new_last_24_hours"].set(
+            f"New in Last 24 Hours: {self.metrics['new_last_24_hours']}"
+        )
+
+    def apply_work_order_changes(self, events):
+        """
+        Adjust the dashboard counters from change-feed events (no re-query).
+        Orders only age out of "new in last 24 hours" on refresh_metrics().
+        """
+        for event in events:
+            if event.kind == "added":
+                self.metrics["total"] += 1
+                self.metrics["new_last_24_hours"] += 1
+            self.metrics["active"] += int(event.is_open) - int(event.was_open)
+        self._render_metrics()
+
+    def refresh_sync_status(self):
+        """Show how many writes are still waiting to reach the server."""
+        journal = get_write_journal()
+        pending, failed = journal.pending_count(), journal.failed_count()
+        if failed:
+            self.sync_status.set(f"Pending sync: {pending} ({failed} failed, see app.log)")
+        elif pending:
+            self.sync_status.set(f"Pending sync: {pending}")
+        else:
+            self.sync_status.set("All changes synced")
+        self.root.after(1000, self.refresh_sync_status)
 
     def init_tabs(self):
-        """Initialize GUI tabs based on user role."""
+        """Register GUI tabs based on user role; each is built on first selection."""
         # Customers
         self.customer_tab_frame = tk.Frame(self.notebook)
-        self.notebook.add(self.customer_tab_frame, text="Customers")
-        self.customer_tab = CustomerTab(self.customer_tab_frame, user_role=self.user_role)
+        self.tabs.add(
+            self.customer_tab_frame, "Customers",
+            lambda: CustomerTab(self.customer_tab_frame, user_role=self.user_role),
+        )
 
         # Work Orders
         self.workorder_tab_frame = tk.Frame(self.notebook)
-        self.notebook.add(self.workorder_tab_frame, text="Work Orders")
-        self.workorder_tab = WorkOrderTab(self.workorder_tab_frame, user_role=self.user_role)
+        self.tabs.add(
+            self.workorder_tab_frame, "Work Orders",
+            lambda: WorkOrderTab(
+                self.workorder_tab_frame, user_role=self.user_role,
+                deadlines=self.deadlines, ui_queue=self.ui_queue, username=self.username,
+                session=self.session, on_customer=self._show_work_order_customer,
+            ),
+        )
 
         # Employees (Only for superuser) — defer import for safety
         if self.user_role == "superuser":
@@ -112,8 +262,29 @@ class MainGUI:
                 )
             else:
                 self.employee_tab_frame = tk.Frame(self.notebook)
-                self.notebook.add(self.employee_tab_frame, text="Employees")
-                self.employee_tab = EmployeeTab(self.employee_tab_frame)
+                self.tabs.add(
+                    self.employee_tab_frame, "Employees",
+                    lambda: EmployeeTab(self.employee_tab_frame, ui_queue=self.ui_queue),
+                )
+
+    @property
+    def customer_tab(self):
+        return self.tabs.ensure(self.customer_tab_frame)
+
+    @property
+    def workorder_tab(self):
+        return self.tabs.ensure(self.workorder_tab_frame)
+
+    @property
+    def employee_tab(self):
+        return self.tabs.ensure(self.employee_tab_frame)
+
+    def _when_built(self, frame, method_name):
+        """Callback forwarding to a tab method, dropped while that tab is unbuilt."""
+        def forward(*args):
+            if self.tabs.is_built(frame):
+                getattr(self.tabs.ensure(frame), method_name)(*args)
+        return forward
 
     def handle_global_scan(self, _evt=None):
         raw = self.global_scan_entry.get().strip()
@@ -134,10 +305,8 @@ class MainGUI:
             code = data.get("wo") or raw
             row = find_work_order_by_code_or_number(code)
             if row:
-                wid, cid = row
-                self.show_work_order_by_id(wid)
-                if cid:
-                    self.show_customer_by_id(cid)
+                # Opening the order also loads its customer (see load_work_order_by_id)
+                self.show_work_order_by_id(row[0])
                 return
 
         # 2) Customer direct? (CUST- barcode)
@@ -169,8 +338,6 @@ class MainGUI:
 
             if wid:
                 self.show_work_order_by_id(wid)
-                if cid:
-                    self.show_customer_by_id(cid)
                 return
 
             if cid:
@@ -191,10 +358,7 @@ class MainGUI:
         # 4) Last-chance fallback
         r = find_work_order_by_code_or_number(raw)
         if r:
-            wid, cid = r
-            self.show_work_order_by_id(wid)
-            if cid:
-                self.show_customer_by_id(cid)
+            self.show_work_order_by_id(r[0])
             return
 
         r = find_customer_by_barcode(raw)
@@ -211,16 +375,13 @@ class MainGUI:
         else:
             messagebox.showinfo("Customer", f"Loaded Customer ID: {customer_id}")
 
-        # Optional: show that customer's work orders list on the Work Orders tab
-        try:
-            rows = fetch_all(
-                "SELECT id FROM work_orders WHERE customer_id=%s ORDER BY created_at DESC",
-                (customer_id,),
-            )
-            if rows and hasattr(self.workorder_tab, "show_work_order_list_for_customer"):
-                self.workorder_tab.show_work_order_list_for_customer(customer_id)
-        except Exception:
-            pass
+        # Also list that customer's work orders on the Work Orders tab
+        self.workorder_tab.show_work_order_list_for_customer(customer_id)
+
+    def _show_work_order_customer(self, customer):
+        """Mirror the customer of the work order just opened into the Customers tab, if it is built."""
+        if self.tabs.is_built(self.customer_tab_frame):
+            self.customer_tab.load_customer(customer[0], customer)
 
     def show_work_order_by_id(self, work_order_id: int):
         """Switch to Work Orders tab and load the WO (if the tab exposes a loader)."""
@@ -0,0 +1,7 @@
+-- Change feed: an auto-maintained updated_at on work_orders, indexed with id,
+-- so terminals see edits (not only inserts) past their high-water mark.
+-- Without it the feed falls back to created_at and only sees new orders.
+ALTER TABLE work_orders
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL
+        DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX IF NOT EXISTS idx_work_orders_updated (updated_at, id);
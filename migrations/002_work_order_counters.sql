@@ -0,0 +1,10 @@
+-- Materialized work order counters (dashboard metrics), plus the created_at
+-- index the 24-hour count uses. The application seeds the counters on first
+-- use; until this runs it counts work_orders directly.
+CREATE TABLE IF NOT EXISTS work_order_counters (
+    dimension VARCHAR(16) NOT NULL,
+    bucket VARCHAR(100) NOT NULL,
+    total BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, bucket)
+);
+CREATE INDEX IF NOT EXISTS idx_work_orders_created ON work_orders (created_at);
@@ -0,0 +1,7 @@
+-- Content hashes for the attachment store: sha256 and size per file, and an
+-- index to find attachments by content. Until this runs attachments are
+-- stored without them.
+ALTER TABLE file_attachments
+    ADD COLUMN IF NOT EXISTS sha256 CHAR(64) NULL,
+    ADD COLUMN IF NOT EXISTS size BIGINT NULL,
+    ADD INDEX IF NOT EXISTS idx_file_attachments_sha256 (sha256);
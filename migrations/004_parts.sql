@@ -0,0 +1,22 @@
+-- Parts inventory: the catalog (unique part number, stock on hand) and the
+-- parts reserved on each work order. Until this runs the Parts panel shows
+-- an empty catalog and parts can't be added or reserved.
+CREATE TABLE IF NOT EXISTS parts (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    part_number VARCHAR(64) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    manufacturer VARCHAR(128) NULL,
+    model VARCHAR(128) NULL,
+    quantity_on_hand INT NOT NULL DEFAULT 0,
+    UNIQUE KEY uq_parts_part_number (part_number),
+    KEY idx_parts_name (name)
+);
+CREATE TABLE IF NOT EXISTS work_order_parts (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    work_order_id INT NOT NULL,
+    part_id INT NOT NULL,
+    quantity INT NOT NULL,
+    reserved_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_work_order_parts_order (work_order_id),
+    KEY idx_work_order_parts_part (part_id)
+);
@@ -0,0 +1,11 @@
+-- Follow-up email delivery state, one row per work order, so each customer
+-- is emailed once and failed sends are retried a bounded number of times.
+-- Until this runs follow-up emails are not sent.
+CREATE TABLE IF NOT EXISTS notification_deliveries (
+    work_order_id INT PRIMARY KEY,
+    status VARCHAR(16) NOT NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    sent_at DATETIME NULL,
+    error TEXT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
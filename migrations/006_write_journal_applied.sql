@@ -0,0 +1,8 @@
+-- Idempotency keys of journaled writes the server has applied, so a replay
+-- after a crash or a lost commit acknowledgement is never applied twice.
+-- Until this runs terminals keep journaled writes queued locally.
+CREATE TABLE IF NOT EXISTS write_journal_applied (
+    idempotency_key CHAR(32) PRIMARY KEY,
+    result_id BIGINT NULL,
+    applied_at DATETIME NOT NULL
+);
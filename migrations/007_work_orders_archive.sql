@@ -0,0 +1,8 @@
+-- Archive for closed work orders (python cli.py archive), with the same
+-- structure as work_orders. A migration that changes work_orders must make
+-- the same change here, or archiving drops the new column's values.
+CREATE TABLE IF NOT EXISTS work_orders_archive LIKE work_orders;
+-- An archive created by an earlier release may predate migration 001.
+ALTER TABLE work_orders_archive
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL
+        DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;
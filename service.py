@@ -0,0 +1,265 @@
+"""
+service.py
+
+Optional shared-cache service for shop terminals.
+
+One process on the shop network runs the cacheable reads of database.py
+(those registered with service_op) on behalf of every terminal, so ten
+terminals refreshing the dashboard cost one query instead of ten:
+
+    - one connection pool, shared by all terminals;
+    - a result cache keyed by operation and arguments, with a TTL and
+      invalidation by table when a terminal reports a write;
+    - coalescing: identical requests arriving while the first is still
+      running wait for its result instead of querying again.
+
+Terminals opt in with SERVICE_URL=http://host:port (see database.service_op);
+without it, or while the service is down, they query MariaDB directly.
+
+Protocol (HTTP/1.1, JSON bodies, keep-alive):
+    POST /call        {"op": name, "args": [...], "kwargs": {...}} -> {"ok", "result"}
+    POST /invalidate  {"tags": [table, ...]}
+    POST /stats, GET /stats, GET /health
+
+Usage:
+    python service.py [--bind 127.0.0.1:8765] [--ttl SECONDS] [--workers N]
+
+Classes:
+    SharedCache - LRU result cache with TTL and per-table generations.
+    CacheService - Runs operations with caching and coalescing.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import wire
+
+MAX_BODY = 1024 * 1024
+_MISSING = object()  # cache miss; None is a valid cached result (e.g. no such customer)
+
+
+class SharedCache:
+    """
+    Results keyed by request, each tagged with the tables it read.
+
+    Every table has a generation number that a write bumps. A result is only
+    stored if none of its tables changed while it was being computed, so a
+    query racing a write can't leave a stale entry behind.
+    """
+
+    def __init__(self, ttl=30.0, max_entries=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (stored_at, tags, encoded result)
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def generations(self, tags):
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def get(self, key, default=None):
+        """The stored result, or ``default`` if there is none (results may be None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def put(self, key, tags, generations, result):
+        """Store ``result`` unless a write to ``tags`` happened since ``generations``."""
+        with self._lock:
+            if tuple(self._generations.get(tag, 0) for tag in tags) != generations:
+                return False
+            self._entries[key] = (time.monotonic(), tags, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, tags):
+        """Drop every result that read one of ``tags``; returns how many."""
+        tags = set(tags)
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            stale = [key for key, (_, entry_tags, _) in self._entries.items() if tags.intersection(entry_tags)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CacheService:
+    """
+    Args:
+        operations (dict): name -> (function, tables read), e.g.
+            database.service_operations().
+        workers (int): Threads running database calls (match the pool size).
+    """
+
+    def __init__(self, operations, workers=8, ttl=30.0, max_entries=1000):
+        self.operations = operations
+        self.cache = SharedCache(ttl, max_entries)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service-db")
+        self._inflight = {}  # key -> asyncio.Future of the encoded result
+        self.counters = {"calls": 0, "hits": 0, "coalesced": 0, "queries": 0, "errors": 0,
+                         "invalidations": 0}
+
+    async def call(self, op, args, kwargs):
+        """Encoded result of ``op`` for wire-encoded ``args``/``kwargs``."""
+        if op not in self.operations:
+            raise KeyError(f"Unknown operation: {op}")
+        func, tags = self.operations[op]
+        self.counters["calls"] += 1
+        key = op + json.dumps([args, kwargs], sort_keys=True, separators=(",", ":"))
+
+        cached = self.cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            self.counters["hits"] += 1
+            return cached
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generations = self.cache.generations(tags)
+        self.counters["queries"] += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._run, func, args, kwargs
+            )
+        except Exception as e:
+            self.counters["errors"] += 1
+            future.set_exception(e)
+            future.exception()  # retrieved: waiters re-raise it, nobody else needs to
+            raise
+        else:
+            self.cache.put(key, tags, generations, result)
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    @staticmethod
+    def _run(func, args, kwargs):
+        # Decode and encode on the worker thread too, off the event loop
+        return wire.encode(func(*wire.decode(args), **wire.decode(kwargs)))
+
+    def invalidate(self, tags):
+        self.counters["invalidations"] += 1
+        return self.cache.invalidate(tags)
+
+    def stats(self):
+        return dict(self.counters, cached=len(self.cache), inflight=len(self._inflight))
+
+    # --- HTTP ----------------------------------------------------------------
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, body = request
+                status, reply = await self._dispatch(method, path, body)
+                payload = json.dumps(reply, separators=(",", ":")).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n".encode("ascii")
+                    + payload
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as e:  # malformed request
+            logging.warning("Service: bad request: %s", e)
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        try:
+            if path == "/health":
+                return 200, {"ok": True}
+            if path == "/stats":
+                return 200, self.stats()
+            if method != "POST":
+                return 405, {"ok": False, "error": "POST required"}
+            data = json.loads(body or b"{}")
+            if path == "/call":
+                result = await self.call(data["op"], data.get("args", []), data.get("kwargs", {"$m": []}))
+                return 200, {"ok": True, "result": result}
+            if path == "/invalidate":
+                return 200, {"ok": True, "dropped": self.invalidate(data.get("tags", ()))}
+            return 404, {"ok": False, "error": f"No route {path}"}
+        except KeyError as e:
+            return 400, {"ok": False, "type": "KeyError", "error": str(e)}
+        except Exception as e:  # pylint: disable=broad-except
+            return 500, {"ok": False, "type": type(e).__name__, "error": str(e)}
+
+
+async def _read_request(reader):
+    """(method, path, body) of the next request, or None at end of stream."""
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, _ = line.decode("latin-1").split(" ", 2)
+    length = 0
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+    if length > MAX_BODY:
+        raise ValueError(f"body too large ({length} bytes)")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path.split("?", 1)[0], body
+
+
+async def serve(service, host, port):
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    logging.info("Cache service listening on %s:%s", host, port)
+    print(f"Cache service listening on {host}:{port}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    from config import get_settings  # pylint: disable=import-outside-toplevel
+    import database  # pylint: disable=import-outside-toplevel
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Shared-cache service for shop terminals.")
+    parser.add_argument("--bind", default=settings.service_bind, help="host:port (default %(default)s)")
+    parser.add_argument("--ttl", type=float, default=settings.service_cache_ttl)
+    parser.add_argument("--workers", type=int, default=max(1, settings.db_pool_size))
+    args = parser.parse_args(argv)
+    host, _, port = args.bind.rpartition(":")
+
+    database.configure_service(None)  # this process is the service: query directly
+    service = CacheService(database.service_operations(), workers=args.workers, ttl=args.ttl)
+    try:
+        asyncio.run(serve(service, host or "127.0.0.1", int(port)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,7 +10,6 @@ Classes:
 
 Dependencies:
     - tkinter for GUI components.
-    - mysql.connector and mariadb for database connectivity.
     - database module for database operations.
 
 Author: McClure, M.T.
@@ -19,9 +18,7 @@ Date: 12-2-24
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import mysql.connector
-import mariadb
-from database import (CustomerManager, get_audit_logs, validate_foreign_key, has_permission
+from database import (CustomerManager, DatabaseError, get_audit_logs, validate_foreign_key, has_permission
         )
 
 
@@ -221,7 +218,7 @@ class CustomerTab:
         try:
             customers = CustomerManager.get_all_customers()
             self._update_treeview(customers)
-        except (mariadb.Error, mysql.connector.Error) as db_error:
+        except DatabaseError as db_error:
             messagebox.showerror("Database Error",
                     f"Failed to load customers from the database: {db_error}")
         except ValueError as ve:
@@ -268,7 +265,7 @@ class CustomerTab:
         try:
             CustomerManager.add_customer(form_fields)
             if self.parent.winfo_exists():
-                messagebox.showinfo("Success", "Customer added successfully!")
+                messagebox.showinfo("Success", "Customer saved! It will appear once it syncs.")
             self.load_customers()
         except ValueError as ve:
             if self.parent.winfo_exists():
@@ -355,7 +352,7 @@ class CustomerTab:
 
         try:
             CustomerManager.add_customer_note(customer_id, note)
-            messagebox.showinfo("Success", "Note added successfully!")
+            messagebox.showinfo("Success", "Note saved! It will appear once it syncs.")
         except ValueError as ve:
             messagebox.showerror("Error", f"Failed to add note: {ve}")
 
@@ -400,7 +397,7 @@ class CustomerTab:
                     f"Missing or unexpected data structure: {ke}")
         except ValueError as ve:
             messagebox.showerror("Value Error", f"Data processing error: {ve}")
-        except (mariadb.Error, mysql.connector.Error) as db_error:
+        except DatabaseError as db_error:
             messagebox.showerror("Database Error",
                      f"Failed to retrieve customer history: {db_error}")
 
@@ -420,7 +417,7 @@ class CustomerTab:
 
         for log in logs:
             tk.Label(log_frame,
-    text=f"{log['timestamp']}:{log['action']} on Customer {log['customer_id']}").pack(anchor="w")
+    text=f"{log['timestamp']}:{log['action']} on {log['table_name']} {log['record_id']}").pack(anchor="w")
 
     def export_customers(self):
         """
@@ -458,24 +455,27 @@ class CustomerTab:
         except ValueError as ve:
             messagebox.showerror("Error", f"Failed to import customer data: {ve}")
 
+    def load_customer(self, customer_id, customer=None):
+        """
+        Show one customer in the grid and select it. ``customer`` is its
+        "list" row when the caller already has it (no query is made then).
+        """
+        if customer is None:
+            try:
+                customer = CustomerManager.get_customer_details(customer_id, fields="list")
+            except DatabaseError as db_error:
+                messagebox.showerror("Database Error", f"Failed to load customer: {db_error}")
+                return
+            if customer is None:
+                messagebox.showerror("Customer", f"Customer {customer_id} not found.")
+                return
+        self._update_treeview([customer])
+        item = self.tree.get_children()[0]
+        self.tree.selection_set(item)
+        self.tree.see(item)
+
     def _update_treeview(self, customers):
+        # Rows come from the "list" projection, which matches the tree's columns.
         self.tree.delete(*self.tree.get_children())
         for customer in customers:
-            print("Inserting customer:", customer)  # Debugging
-            self.tree.insert(
-                "", "end",
-                values=(
-                    customer[0],
-                    customer[1],
-                    customer[2],
-                    customer[3],
-                    customer[4],
-                    customer[5],
-                    customer[6],
-                    customer[7],
-                    customer[8],
-                    customer[9],
-                    customer[10],
-                    customer[11],
-                )
-            )
+            self.tree.insert("", "end", values=tuple(customer))
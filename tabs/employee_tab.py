@@ -1,14 +1,17 @@
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from database import (
     get_all_users, create_user, update_user_role,
     reset_user_password, delete_user
 )
+from ui_helpers import MainThreadQueue
 
 class EmployeeTab:
-    def __init__(self, parent):
+    def __init__(self, parent, ui_queue=None):
         self.parent = parent
         self.selected_user_id = None
+        self.ui_queue = ui_queue or MainThreadQueue(parent.winfo_toplevel())
 
         # Treeview
         self.tree = ttk.Treeview(parent, columns=("ID", "Username", "Role"), show="headings")
@@ -45,10 +48,25 @@ class EmployeeTab:
         self.refresh_tree()
 
     def refresh_tree(self):
+        """Reload the user list on a worker thread."""
+        def worker():
+            try:
+                users = get_all_users()
+            except Exception as e:  # pylint: disable=broad-except
+                self.ui_queue.post(self._on_users_loaded, [], e)
+            else:
+                self.ui_queue.post(self._on_users_loaded, users, None)
+
+        threading.Thread(target=worker, name="employee-load", daemon=True).start()
+
+    def _on_users_loaded(self, users, error):
+        if error is not None:
+            messagebox.showerror("Employees", f"Failed to load users: {error}")
+            return
         for row in self.tree.get_children():
             self.tree.delete(row)
-        for user in get_all_users():
-            self.tree.insert("", "end", values=user)
+        for user in users:
+            self.tree.insert("", "end", values=tuple(user))
 
     def on_row_select(self, event):
         selected = self.tree.selection()
@@ -11,7 +11,6 @@ Classes:
 
 Dependencies:
     - tkinter for GUI components.
-    - mysql.connector for database connectivity.
     - database module for executing database operations and handling notifications.
 
 Author: McClure, M.T.
@@ -20,20 +19,36 @@ Date: 2024-12-02
 
 import os
 import datetime
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
-import mysql.connector
-
 from database import (
-    insert_file_metadata,
+    CustomerManager,
+    get_write_journal,
+    store_attachments,
+    get_work_order_attachments,
+    get_thumbnail_cache,
     get_notifications,
     execute_query,
     DatabaseError,
     add_work_order as db_add_work_order,
-    fetch_one,
-    fetch_all,
+    update_work_order as db_update_work_order,
+    delete_work_order as db_delete_work_order,
+    bulk_close_work_orders,
+    bulk_reassign_work_orders,
+    bulk_set_work_order_priority,
+    get_schema,
+    get_customer_work_orders,
+    load_work_order_aggregate,
+    discard_work_order_aggregate,
+    add_part,
+    get_parts_index,
+    InsufficientStockError,
+    get_technician_report,
+    get_user_id,
 )
+from ui_helpers import MainThreadQueue, LazyNotebook
 
 # ---------------------------------------------------------------------------
 # Shared constants to avoid “Open” vs “Active” mismatches across the UI/DB.
@@ -44,49 +59,77 @@ PRIORITIES = ["Low", "Medium", "High", "Critical"]
 WORK_ORDER_TYPES = ["Troubleshoot", "Upgrade", "Maintenance"]
 DEVICE_TYPES = ["Laptop", "Tablet", "Desktop"]
 
+# Edge length (pixels) of attachment previews; matches the thumbnail cache
+THUMBNAIL_SIZE = 64
+
+# Columns every work_orders schema has, and the device/type columns newer
+# schemas add. The schema catalog decides which extended ones get selected.
+WORK_ORDER_BASE_COLUMNS = ["id", "customer_id", "technician", "status", "priority", "notes"]
+WORK_ORDER_EXTENDED_COLUMNS = ["work_order_type", "device_type", "manufacturer", "model", "serial_number"]
+
+# "Search By" choices: label -> (column, match). Choices backed by an
+# extended column are only offered when the schema has it.
+SEARCH_FILTERS = {
+    "Technician": ("technician", "like"),
+    "Priority": ("priority", "equals"),
+    "Date Range": ("created_at", "range"),
+    "Device Type": ("device_type", "equals"),
+    "Serial Number": ("serial_number", "like"),
+}
+
 
 class WorkOrderTab:
     """
     Generate Work Orders tab layout and GUIs.
     """
 
-    def __init__(self, parent_frame, user_role="technician"):
+    def __init__(self, parent_frame, user_role="technician", deadlines=None, ui_queue=None,
+                 username=None, session=None, on_customer=None):
         self.parent_frame = parent_frame
         self.user_role = user_role
-
-        # Create Notebook for Tabs within the work order section
+        self.username = username  # recorded in the audit log for bulk changes
+        self._audit_user_id = None  # users.id of ``username``, resolved on first bulk change
+        self.session = session    # SessionCache prefetched at login, if any
+        self.on_customer = on_customer  # called with the customer row of each opened order
+        self.deadlines = deadlines  # DeadlineScheduler feeding the workbench, if any
+        # Results of background work come back to the Tk thread through this queue
+        self.ui_queue = ui_queue or MainThreadQueue(parent_frame.winfo_toplevel())
+
+        # Create Notebook for Tabs within the work order section. Sub-tabs are
+        # built the first time they are shown (or when a loader needs them).
         self.notebook = ttk.Notebook(parent_frame)
         self.notebook.pack(fill="both", expand=True)
+        self.pages = LazyNotebook(self.notebook)
 
-        # Search Tab
         self.search_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.search_tab, text="Search")
-        self.setup_search_tab()
+        self.pages.add(self.search_tab, "Search", self.setup_search_tab)
 
-        # Work Order Details Tab
         self.details_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.details_tab, text="Work Order Details")
-        self.setup_details_tab()
+        self.pages.add(self.details_tab, "Work Order Details", self.setup_details_tab)
 
-        # Parts Tab
         self.parts_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.parts_tab, text="Parts")
-        self.setup_parts_tab()
+        self.pages.add(self.parts_tab, "Parts", self.setup_parts_tab)
 
-        # Attachments Tab
         self.attachments_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.attachments_tab, text="Attachments")
-        self.setup_attachments_tab()
+        self.pages.add(self.attachments_tab, "Attachments", self.setup_attachments_tab)
 
-        # Actions Tab
         self.actions_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.actions_tab, text="Actions")
-        self.setup_actions_tab()
+        self.pages.add(self.actions_tab, "Actions", self.setup_actions_tab)
 
-        # Manager Workbench Tab
         self.workbench_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.workbench_tab, text="Manager Workbench")
-        self.setup_workbench_tab()
+        self.pages.add(self.workbench_tab, "Manager Workbench", self.setup_workbench_tab)
+
+        self.pages.ensure_current()
+
+        # Attachments tab: (work order id, rows or None) to show, and what it shows now
+        self._attachments_wanted = None
+        self._attachments_for = None
+        # Parts tab: autocomplete index (loaded in the background) and the
+        # reservations to commit with the next save, part id -> quantity
+        self._parts_index = None
+        self._pending_parts = {}
+        self._reserved_parts = []
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_subtab_changed, add="+")
 
     # -----------------------------------------------------------------------
     # Search
@@ -98,9 +141,14 @@ class WorkOrderTab:
         self.status_filter.grid(row=0, column=1, padx=10, pady=10)
 
         ttk.Label(self.search_tab, text="Search By:").grid(row=0, column=2, padx=10, pady=10)
+        schema = get_schema()
         self.search_filter = ttk.Combobox(
             self.search_tab,
-            values=["Technician", "Priority", "Date Range"],
+            values=[
+                label for label, (column, _) in SEARCH_FILTERS.items()
+                if column not in WORK_ORDER_EXTENDED_COLUMNS
+                or schema.has_column("work_orders", column)
+            ],
             state="readonly",
         )
         self.search_filter.grid(row=0, column=3, padx=10, pady=10)
@@ -129,6 +177,18 @@ class WorkOrderTab:
         for c in range(6):
             self.search_tab.columnconfigure(c, weight=1)
 
+        # Start with the user's own open work orders (prefetched at login)
+        if self.session is not None:
+            self.session.when_ready(
+                "assigned_work_orders", self.ui_queue.wrap(self._show_assigned_work_orders)
+            )
+
+    def _show_assigned_work_orders(self, rows):
+        if not rows or self.search_results.get_children():
+            return  # nothing assigned, or the user already searched
+        for row in rows:
+            self.search_results.insert("", "end", iid=str(row[0]), values=tuple(row))
+
     def perform_search(self):
         """Perform a search based on the selected filters and populate the Treeview with results."""
         try:
@@ -143,23 +203,27 @@ class WorkOrderTab:
                 query += " AND status = %s"
                 params.append(status)
 
-            if search_by == "Technician" and search_value:
-                query += " AND technician LIKE %s"
-                params.append(f"%{search_value}%")
-            elif search_by == "Priority" and search_value:
-                query += " AND priority = %s"
-                params.append(search_value)
-            elif search_by == "Date Range" and "to" in search_value:
-                start_date, end_date = map(str.strip, search_value.split("to", 1))
-                query += " AND created_at BETWEEN %s AND %s"
-                params.extend([start_date, end_date])
+            column, match = SEARCH_FILTERS.get(search_by, (None, None))
+            if column and search_value:
+                if match == "like":
+                    query += f" AND {column} LIKE %s"
+                    params.append(f"%{search_value}%")
+                elif match == "equals":
+                    query += f" AND {column} = %s"
+                    params.append(search_value)
+                elif match == "range":
+                    if "to" not in search_value:
+                        raise ValueError("Enter a date range as 'YYYY-MM-DD to YYYY-MM-DD'.")
+                    start_date, end_date = map(str.strip, search_value.split("to", 1))
+                    query += f" AND {column} BETWEEN %s AND %s"
+                    params.extend([start_date, end_date])
 
             results = execute_query(query, tuple(params))
 
             # Clear and repopulate
             self.search_results.delete(*self.search_results.get_children())
             for row in results:
-                self.search_results.insert("", "end", values=row)
+                self.search_results.insert("", "end", iid=str(row[0]), values=row)
 
             messagebox.showinfo("Search", f"Found {len(results)} result(s).")
         except ValueError as ve:
@@ -188,8 +252,9 @@ class WorkOrderTab:
         row += 1
 
         ttk.Label(self.details_tab, text="Assigned Technician:").grid(row=row, column=0, padx=10, pady=10, sticky="e")
-        self.assigned_technician = ttk.Entry(self.details_tab)
+        self.assigned_technician = ttk.Combobox(self.details_tab)
         self.assigned_technician.grid(row=row, column=1, padx=10, pady=10, sticky="w")
+        self._offer_technicians(self.assigned_technician)
         row += 1
 
         ttk.Label(self.details_tab, text="Work Order Type:").grid(row=row, column=0, padx=10, pady=10, sticky="e")
@@ -226,6 +291,10 @@ class WorkOrderTab:
         ttk.Label(self.details_tab, text="Customer ID:").grid(row=row, column=0, padx=10, pady=10, sticky="e")
         self.customer_id_entry = ttk.Entry(self.details_tab)
         self.customer_id_entry.grid(row=row, column=1, padx=10, pady=10, sticky="w")
+        self.customer_summary = tk.StringVar()
+        ttk.Label(self.details_tab, textvariable=self.customer_summary).grid(
+            row=row, column=2, padx=10, pady=10, sticky="w"
+        )
         row += 1
 
         ttk.Label(self.details_tab, text="Status:").grid(row=row, column=0, padx=10, pady=10, sticky="e")
@@ -238,12 +307,29 @@ class WorkOrderTab:
         self.notes_text.grid(row=row, column=1, padx=10, pady=10, sticky="nsew")
         row += 1
 
+        ttk.Label(self.details_tab, text="Customer Notes:").grid(row=row, column=0, padx=10, pady=10, sticky="ne")
+        self.customer_notes_list = ttk.Treeview(
+            self.details_tab, columns=("Date", "Note"), show="headings", height=4
+        )
+        self.customer_notes_list.heading("Date", text="Date")
+        self.customer_notes_list.heading("Note", text="Note")
+        self.customer_notes_list.column("Date", width=140, stretch=False)
+        self.customer_notes_list.grid(row=row, column=1, columnspan=2, padx=10, pady=10, sticky="nsew")
+        row += 1
+
         # Layout stretch
         for r in range(row):
             self.details_tab.rowconfigure(r, weight=0)
-        self.details_tab.rowconfigure(row - 1, weight=1)  # notes area expands
+        self.details_tab.rowconfigure(row - 1, weight=1)  # customer notes area expands
         self.details_tab.columnconfigure(1, weight=1)
 
+    def _offer_technicians(self, combobox):
+        """Fill a technician picker from the login prefetch (free text still allowed)."""
+        if self.session is not None:
+            self.session.when_ready("technicians", self.ui_queue.wrap(
+                lambda names: combobox.configure(values=names or [])
+            ))
+
     def _quick_load_wo(self):
         try:
             wid = int(self.quick_wid_entry.get().strip())
@@ -256,6 +342,7 @@ class WorkOrderTab:
     # Parts
     # -----------------------------------------------------------------------
     def setup_parts_tab(self):
+        # Catalog entry: new parts (or more stock of an existing part number)
         ttk.Label(self.parts_tab, text="Part Name:").grid(row=0, column=0, padx=10, pady=10, sticky="e")
         self.part_name = ttk.Entry(self.parts_tab)
         self.part_name.grid(row=0, column=1, padx=10, pady=10, sticky="w")
@@ -276,6 +363,150 @@ class WorkOrderTab:
         self.part_quantity = ttk.Entry(self.parts_tab)
         self.part_quantity.grid(row=4, column=1, padx=10, pady=10, sticky="w")
 
+        ttk.Button(self.parts_tab, text="Add to Catalog", command=self.add_catalog_part).grid(
+            row=5, column=1, padx=10, pady=10, sticky="w"
+        )
+
+        # Lookup: filters the in-memory index on every keystroke
+        ttk.Label(self.parts_tab, text="Find Part:").grid(row=6, column=0, padx=10, pady=10, sticky="e")
+        self.part_search = ttk.Entry(self.parts_tab)
+        self.part_search.grid(row=6, column=1, padx=10, pady=10, sticky="ew")
+        self.part_search.bind("<KeyRelease>", self._on_part_search)
+
+        self.part_results = ttk.Treeview(
+            self.parts_tab, columns=("Part #", "Name", "Manufacturer", "On Hand"), show="headings", height=6
+        )
+        for column in ("Part #", "Name", "Manufacturer", "On Hand"):
+            self.part_results.heading(column, text=column)
+        self.part_results.grid(row=7, column=0, columnspan=3, padx=10, pady=5, sticky="nsew")
+
+        ttk.Label(self.parts_tab, text="Reserve Qty:").grid(row=8, column=0, padx=10, pady=10, sticky="e")
+        self.reserve_quantity = ttk.Spinbox(self.parts_tab, from_=1, to=999, width=6)
+        self.reserve_quantity.set(1)
+        self.reserve_quantity.grid(row=8, column=1, padx=10, pady=10, sticky="w")
+        ttk.Button(self.parts_tab, text="Add to Order", command=self.add_part_to_order).grid(
+            row=8, column=2, padx=10, pady=10
+        )
+
+        # Parts on the loaded work order: reserved ones, then pending until saved
+        self.order_parts = ttk.Treeview(
+            self.parts_tab, columns=("Part #", "Name", "Qty", "State"), show="headings", height=6
+        )
+        for column in ("Part #", "Name", "Qty", "State"):
+            self.order_parts.heading(column, text=column)
+        self.order_parts.grid(row=9, column=0, columnspan=3, padx=10, pady=5, sticky="nsew")
+        ttk.Button(self.parts_tab, text="Remove Pending", command=self.remove_pending_part).grid(
+            row=10, column=2, padx=10, pady=10
+        )
+
+        self.parts_tab.rowconfigure(7, weight=1)
+        self.parts_tab.rowconfigure(9, weight=1)
+        self.parts_tab.columnconfigure(1, weight=1)
+
+        self._render_order_parts()
+        self.load_parts_index()
+
+    def load_parts_index(self):
+        """Load the parts catalog into the autocomplete index on a worker thread."""
+        def worker():
+            try:
+                index = get_parts_index()
+            except Exception as e:  # pylint: disable=broad-except
+                self.ui_queue.post(messagebox.showerror, "Parts", f"Could not load the parts catalog: {e}")
+            else:
+                self.ui_queue.post(self._on_parts_index_loaded, index)
+
+        threading.Thread(target=worker, name="parts-index", daemon=True).start()
+
+    def _on_parts_index_loaded(self, index):
+        self._parts_index = index
+        self._on_part_search()
+
+    def _on_part_search(self, _event=None):
+        self.part_results.delete(*self.part_results.get_children())
+        if self._parts_index is None:
+            return
+        for part in self._parts_index.search(self.part_search.get()):
+            self.part_results.insert("", "end", iid=str(part.id), values=(
+                part.part_number, part.name, part.manufacturer or "", part.quantity_on_hand,
+            ))
+
+    def add_catalog_part(self):
+        """Add the catalog form's part (or its quantity to an existing part number)."""
+        part_number = self.part_serial_number.get().strip()
+        name = self.part_name.get().strip()
+        if not part_number or not name:
+            messagebox.showerror("Parts", "Part name and part number are required.")
+            return
+        try:
+            quantity = int(self.part_quantity.get().strip() or 0)
+        except ValueError:
+            messagebox.showerror("Parts", "Quantity must be a whole number.")
+            return
+        try:
+            add_part(
+                part_number, name,
+                self.part_manufacturer.get().strip() or None,
+                self.part_model.get().strip() or None,
+                quantity,
+            )
+        except DatabaseError as e:
+            messagebox.showerror("Database Error", f"Failed to add part: {e}")
+            return
+        for entry in (self.part_name, self.part_manufacturer, self.part_model,
+                      self.part_serial_number, self.part_quantity):
+            entry.delete(0, "end")
+        self.load_parts_index()
+
+    def add_part_to_order(self):
+        """Queue the selected part for reservation when the work order is next saved."""
+        if self._current_work_order_id() is None:
+            return
+        selection = self.part_results.selection()
+        if not selection:
+            messagebox.showwarning("Parts", "Select a part first.")
+            return
+        try:
+            quantity = int(self.reserve_quantity.get())
+        except ValueError:
+            quantity = 0
+        if quantity < 1:
+            messagebox.showerror("Parts", "Quantity must be at least 1.")
+            return
+        part_id = int(selection[0])
+        part = self._parts_index.get(part_id)
+        wanted = self._pending_parts.get(part_id, 0) + quantity
+        if part is not None and wanted > part.quantity_on_hand:
+            messagebox.showwarning("Parts", f"Only {part.quantity_on_hand} of {part.part_number} on hand.")
+            return
+        self._pending_parts[part_id] = wanted
+        self._render_order_parts()
+
+    def remove_pending_part(self):
+        for iid in self.order_parts.selection():
+            if iid.startswith("pending-"):
+                self._pending_parts.pop(int(iid[len("pending-"):]), None)
+        self._render_order_parts()
+
+    def _show_work_order_parts(self, reserved):
+        """A new work order was loaded: show its reservations and drop unsaved ones."""
+        self._reserved_parts = reserved
+        self._pending_parts = {}
+        if self.pages.is_built(self.parts_tab):
+            self._render_order_parts()
+
+    def _render_order_parts(self):
+        self.order_parts.delete(*self.order_parts.get_children())
+        for row in self._reserved_parts:
+            self.order_parts.insert("", "end", values=(
+                row["part_number"], row["name"], row["quantity"], "Reserved",
+            ))
+        for part_id, quantity in self._pending_parts.items():
+            part = self._parts_index.get(part_id) if self._parts_index is not None else None
+            self.order_parts.insert("", "end", iid=f"pending-{part_id}", values=(
+                part.part_number if part else part_id, part.name if part else "", quantity, "Pending",
+            ))
+
     # -----------------------------------------------------------------------
     # Manager Workbench
     # -----------------------------------------------------------------------
@@ -286,48 +517,211 @@ class WorkOrderTab:
             self.workbench_tab,
             columns=("ID", "Customer", "Status", "Technician"),
             show="headings",
+            selectmode="extended",
         )
         self.workbench_list.heading("ID", text="ID")
         self.workbench_list.heading("Customer", text="Customer")
         self.workbench_list.heading("Status", text="Status")
         self.workbench_list.heading("Technician", text="Technician")
-        self.workbench_list.grid(row=1, column=0, columnspan=3, padx=10, pady=10, sticky="nsew")
-
-        # Placeholder data
-        sample_data = [
-            (101, "Customer A", "Completed by Technician", "Technician A"),
-            (102, "Customer B", "Completed by Technician", "Technician B"),
-        ]
-        for item in sample_data:
-            self.workbench_list.insert("", "end", values=item)
+        self.workbench_list.grid(row=1, column=0, columnspan=4, padx=10, pady=10, sticky="nsew")
 
         self.review_button = ttk.Button(self.workbench_tab, text="Review Work Order", command=self.review_work_order)
         self.review_button.grid(row=2, column=0, padx=10, pady=10)
 
-        self.close_button = ttk.Button(self.workbench_tab, text="Close Work Order", command=self.close_work_order)
+        self.close_button = ttk.Button(self.workbench_tab, text="Close Selected", command=self.close_work_order)
         self.close_button.grid(row=2, column=1, padx=10, pady=10)
 
+        self.email_button = ttk.Button(
+            self.workbench_tab, text="Send Follow-Up Emails", command=self.send_follow_up_emails
+        )
+        self.email_button.grid(row=2, column=2, padx=10, pady=10)
+
+        ttk.Button(self.workbench_tab, text="Refresh", command=self.refresh_notifications).grid(
+            row=2, column=3, padx=10, pady=10
+        )
+
+        # Bulk actions on the selected rows
+        self.reassign_entry = ttk.Combobox(self.workbench_tab)
+        self.reassign_entry.grid(row=3, column=0, padx=10, pady=10, sticky="ew")
+        self._offer_technicians(self.reassign_entry)
+        ttk.Button(self.workbench_tab, text="Reassign Selected", command=self.reassign_work_orders).grid(
+            row=3, column=1, padx=10, pady=10
+        )
+        self.bulk_priority = ttk.Combobox(self.workbench_tab, values=PRIORITIES, state="readonly")
+        self.bulk_priority.grid(row=3, column=2, padx=10, pady=10, sticky="ew")
+        ttk.Button(self.workbench_tab, text="Set Priority", command=self.set_work_order_priority).grid(
+            row=3, column=3, padx=10, pady=10
+        )
+
+        self.setup_report_view()
+
         # stretch
         self.workbench_tab.rowconfigure(1, weight=1)
-        self.workbench_tab.columnconfigure(0, weight=1)
-        self.workbench_tab.columnconfigure(1, weight=1)
+        self.workbench_tab.rowconfigure(4, weight=1)
+        for c in range(4):
+            self.workbench_tab.columnconfigure(c, weight=1)
+
+        self.load_workbench()
+
+    def setup_report_view(self):
+        """Technician throughput/turnaround report under the workbench list."""
+        frame = ttk.LabelFrame(self.workbench_tab, text="Technician Report")
+        frame.grid(row=4, column=0, columnspan=4, padx=10, pady=10, sticky="nsew")
+
+        today = datetime.date.today()
+        ttk.Label(frame, text="From (YYYY-MM-DD):").grid(row=0, column=0, padx=5, pady=5, sticky="e")
+        self.report_from = ttk.Entry(frame, width=12)
+        self.report_from.insert(0, (today - datetime.timedelta(days=30)).isoformat())
+        self.report_from.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(frame, text="To:").grid(row=0, column=2, padx=5, pady=5, sticky="e")
+        self.report_to = ttk.Entry(frame, width=12)
+        self.report_to.insert(0, today.isoformat())
+        self.report_to.grid(row=0, column=3, padx=5, pady=5, sticky="w")
+        ttk.Button(frame, text="Run Report", command=self.run_technician_report).grid(
+            row=0, column=4, padx=5, pady=5
+        )
 
-    def refresh_notifications(self):
+        self.report_list = ttk.Treeview(
+            frame, columns=("Technician", "Completed", "Median h", "P90 h"), show="headings", height=6
+        )
+        for column in ("Technician", "Completed", "Median h", "P90 h"):
+            self.report_list.heading(column, text=column)
+        self.report_list.grid(row=1, column=0, columnspan=5, padx=5, pady=5, sticky="nsew")
+        self.report_backlog = tk.StringVar()
+        ttk.Label(frame, textvariable=self.report_backlog).grid(
+            row=2, column=0, columnspan=5, padx=5, pady=5, sticky="w"
+        )
+        frame.rowconfigure(1, weight=1)
+        frame.columnconfigure(4, weight=1)
+
+    def run_technician_report(self):
+        """Compute the report for the entered dates (inclusive) on a worker thread."""
         try:
-            self.workbench_list.delete(*self.workbench_list.get_children())
+            start = datetime.datetime.strptime(self.report_from.get().strip(), "%Y-%m-%d")
+            end = datetime.datetime.strptime(self.report_to.get().strip(), "%Y-%m-%d")
+        except ValueError:
+            messagebox.showerror("Technician Report", "Enter dates as YYYY-MM-DD.")
+            return
+        end += datetime.timedelta(days=1)
+        self.report_backlog.set("Running report...")
 
+        def worker():
+            try:
+                report = get_technician_report(start, end)
+            except Exception as e:  # pylint: disable=broad-except
+                self.ui_queue.post(self._on_report_loaded, None, e)
+            else:
+                self.ui_queue.post(self._on_report_loaded, report, None)
+
+        threading.Thread(target=worker, name="technician-report", daemon=True).start()
+
+    def _on_report_loaded(self, report, error):
+        self.report_list.delete(*self.report_list.get_children())
+        if error is not None:
+            self.report_backlog.set("")
+            messagebox.showerror("Technician Report", f"Report failed: {error}")
+            return
+        for row in report.technicians:
+            self.report_list.insert("", "end", values=(
+                row.technician, row.completed, f"{row.median_hours:.1f}", f"{row.p90_hours:.1f}",
+            ))
+        bins = ", ".join(f"{label}: {count}" for label, count in report.backlog)
+        self.report_backlog.set(f"Open orders: {report.open_orders} ({bins})")
+
+    def load_workbench(self):
+        """Fill the workbench from the notifications query on a worker thread."""
+        def worker():
             twenty_four_hours_ago = datetime.datetime.now() - datetime.timedelta(hours=24)
-            excluded_days = [4, 5, 6]  # Fri, Sat, Sun (Mon=0)
+            excluded_days = [4, 5, 6]  # Fri, Sat, Sun (Python weekdays, Mon=0)
+            try:
+                notifications = get_notifications(twenty_four_hours_ago, excluded_days)
+            except Exception as e:  # pylint: disable=broad-except
+                self.ui_queue.post(self._on_workbench_loaded, [], e)
+            else:
+                self.ui_queue.post(self._on_workbench_loaded, notifications, None)
+
+        threading.Thread(target=worker, name="workbench-load", daemon=True).start()
+
+    def _on_workbench_loaded(self, notifications, error):
+        if error is not None:
+            messagebox.showerror("Database Error", f"Could not load the workbench: {error}")
+        for notification in notifications:
+            iid = str(notification[0])
+            if self.workbench_list.exists(iid):
+                self.workbench_list.item(iid, values=tuple(notification))
+            else:
+                self.workbench_list.insert("", "end", iid=iid, values=tuple(notification))
+        # Follow-ups the scheduler has already fired join the query results.
+        if self.deadlines is not None:
+            self.on_follow_ups_due(self.deadlines.due_items())
+
+    def refresh_notifications(self):
+        """Reload the workbench from the notifications query and fired follow-ups."""
+        self.workbench_list.delete(*self.workbench_list.get_children())
+        self.load_workbench()
+
+    def on_follow_ups_due(self, follow_ups):
+        """Deadline scheduler subscriber: add newly due work orders to the workbench."""
+        if not self.pages.is_built(self.workbench_tab):
+            return  # picked up from due_items() when the workbench is built
+        for follow_up in follow_ups:
+            order = follow_up.work_order
+            values = (order["id"], order["customer_id"], order["status"], order["technician"])
+            iid = str(order["id"])
+            if self.workbench_list.exists(iid):
+                self.workbench_list.item(iid, values=values)
+            else:
+                self.workbench_list.insert("", "end", iid=iid, values=values)
+
+    def apply_work_order_changes(self, events):
+        """Update open search results and the workbench in place from change-feed events."""
+        has_search = self.pages.is_built(self.search_tab)
+        has_workbench = self.pages.is_built(self.workbench_tab)
+        for event in events:
+            order = event.work_order
+            iid = str(order["id"])
+            discard_work_order_aggregate(order["id"])
+            if has_search and self.search_results.exists(iid):
+                self.search_results.item(iid, values=(
+                    order["id"], order["customer_id"], order["status"], order["technician"],
+                ))
+            if has_workbench and self.workbench_list.exists(iid):
+                if event.kind == "closed":
+                    self.workbench_list.delete(iid)
+                else:
+                    values = list(self.workbench_list.item(iid, "values"))
+                    values[2], values[3] = order["status"], order["technician"]
+                    self.workbench_list.item(iid, values=values)
+
+    def send_follow_up_emails(self):
+        """Email every customer whose follow-up is due, without blocking the UI."""
+        if not messagebox.askyesno("Follow-Up Emails", "Email all customers with a due follow-up now?"):
+            return
+        self.email_button.config(state="disabled")
+
+        def worker():
+            try:
+                # smtplib/ssl load only when someone actually sends email
+                from utils.notify_email import send_due_notifications
+                results = send_due_notifications()
+            except Exception as e:  # pylint: disable=broad-except
+                self.ui_queue.post(self._on_follow_up_emails_sent, None, e)
+            else:
+                self.ui_queue.post(self._on_follow_up_emails_sent, results, None)
 
-            notifications = get_notifications(twenty_four_hours_ago, excluded_days)
-            for notification in notifications:
-                self.workbench_list.insert("", "end", values=notification)
+        threading.Thread(target=worker, name="follow-up-emails", daemon=True).start()
 
-            messagebox.showinfo("Refresh", "Notifications refreshed.")
-        except mysql.connector.Error:
-            messagebox.showerror("Database Error", "An error occurred while accessing the database.")
-        except TimeoutError as e:
-            messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+    def _on_follow_up_emails_sent(self, results, error):
+        self.email_button.config(state="normal")
+        if error is not None:
+            messagebox.showerror("Follow-Up Emails", f"Sending failed: {error}")
+            return
+        sent = sum(1 for result in results if result.status == "sent")
+        deferred = sum(1 for result in results if result.status == "deferred")
+        summary = f"{sent} sent, {len(results) - sent - deferred} failed (see app.log)."
+        if deferred:
+            summary += f"\n{deferred} deferred: the mail server is unreachable; they go out next time."
+        messagebox.showinfo("Follow-Up Emails", summary)
 
     def review_work_order(self):
         sel = self.workbench_list.selection()
@@ -336,45 +730,149 @@ class WorkOrderTab:
         else:
             messagebox.showwarning("Warning", "Please select a work order to review.")
 
+    def _selected_work_order_ids(self):
+        return [int(self.workbench_list.item(iid, "values")[0]) for iid in self.workbench_list.selection()]
+
+    def _bulk_update(self, title, func, *args):
+        """Apply one bulk change to the selected work orders; returns their ids on success."""
+        ids = self._selected_work_order_ids()
+        if not ids:
+            messagebox.showwarning("Warning", "Please select one or more work orders.")
+            return None
+        try:
+            count = func(ids, *args, user_id=self._user_id(), performed_by=self.username)
+        except DatabaseError as e:
+            messagebox.showerror(title, f"Update failed: {e}")
+            return None
+        messagebox.showinfo(title, f"{count} work order(s) updated.")
+        return ids
+
+    def _user_id(self):
+        """The logged-in user's id for audit rows: prefetched at login, else looked up once."""
+        if self._audit_user_id is None and self.username:
+            if self.session is not None:
+                self._audit_user_id = self.session.get("user_id")
+            if self._audit_user_id is None:
+                self._audit_user_id = get_user_id(self.username)
+        return self._audit_user_id
+
     def close_work_order(self):
-        sel = self.workbench_list.selection()
-        if sel:
-            work_order_id = self.workbench_list.item(sel[0], "values")[0]
-            messagebox.showinfo(
-                "Close Work Order",
-                f"Work Order {work_order_id} closed. Customer contact alert set for 24 hours.",
-            )
-        else:
-            messagebox.showwarning("Warning", "Please select a work order to close.")
+        """Close every selected work order in one statement."""
+        ids = self._bulk_update("Close Work Orders", bulk_close_work_orders)
+        for work_order_id in ids or ():
+            if self.workbench_list.exists(str(work_order_id)):
+                self.workbench_list.delete(str(work_order_id))
+
+    def reassign_work_orders(self):
+        """Assign every selected work order to the technician entered."""
+        technician = self.reassign_entry.get().strip()
+        if not technician:
+            messagebox.showwarning("Warning", "Enter the technician to assign.")
+            return
+        ids = self._bulk_update("Reassign Work Orders", bulk_reassign_work_orders, technician)
+        for work_order_id in ids or ():
+            iid = str(work_order_id)
+            if self.workbench_list.exists(iid):
+                values = list(self.workbench_list.item(iid, "values"))
+                values[3] = technician
+                self.workbench_list.item(iid, values=values)
+
+    def set_work_order_priority(self):
+        """Set the chosen priority on every selected work order."""
+        priority = self.bulk_priority.get()
+        if not priority:
+            messagebox.showwarning("Warning", "Choose a priority.")
+            return
+        self._bulk_update("Set Priority", bulk_set_work_order_priority, priority)
 
     # -----------------------------------------------------------------------
     # Attachments
     # -----------------------------------------------------------------------
     def setup_attachments_tab(self):
-        self.upload_button = ttk.Button(self.attachments_tab, text="Upload File", command=self.upload_file)
-        self.upload_button.grid(row=0, column=0, padx=10, pady=10)
+        self.upload_button = ttk.Button(self.attachments_tab, text="Upload Files", command=self.upload_file)
+        self.upload_button.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+        self.upload_status = tk.StringVar()
+        ttk.Label(self.attachments_tab, textvariable=self.upload_status).grid(
+            row=0, column=1, padx=10, pady=10, sticky="w"
+        )
 
+        # Previews sit in the tree column; rows are tall enough to show them
+        ttk.Style(self.attachments_tab).configure(
+            "Attachments.Treeview", rowheight=THUMBNAIL_SIZE + 8
+        )
         self.attachments_list = ttk.Treeview(
             self.attachments_tab,
             columns=("File Name", "File Type", "Uploaded At"),
-            show="headings",
+            show="tree headings",
+            style="Attachments.Treeview",
         )
+        self.attachments_list.heading("#0", text="Preview")
+        self.attachments_list.column("#0", width=THUMBNAIL_SIZE + 24, stretch=False)
         self.attachments_list.heading("File Name", text="File Name")
         self.attachments_list.heading("File Type", text="File Type")
         self.attachments_list.heading("Uploaded At", text="Uploaded At")
         self.attachments_list.grid(row=1, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
+        self._previews = {}  # preview path -> PhotoImage, kept alive while shown
 
         self.attachments_tab.rowconfigure(1, weight=1)
         self.attachments_tab.columnconfigure(0, weight=1)
 
-    def upload_file(self):
-        file_path = filedialog.askopenfilename()
-        if not file_path:
+    def _on_subtab_changed(self, _event=None):
+        # Attachments load only when their tab is actually shown
+        if self.notebook.select() == str(self.attachments_tab):
+            wanted = self._attachments_wanted
+            if wanted is not None and wanted[0] != self._attachments_for:
+                self.show_attachments(*wanted)
+
+    def show_attachments(self, work_order_id, rows=None):
+        """
+        Fill the Attachments tab for a work order. ``rows`` are its
+        file_attachments rows if already loaded; previews come from the
+        thumbnail cache, resolved off the main thread.
+        """
+        self.pages.ensure(self.attachments_tab)
+        self._attachments_for = work_order_id
+
+        def worker():
+            try:
+                data = rows if rows is not None else get_work_order_attachments(work_order_id)
+                thumbnails = get_thumbnail_cache()
+                previews = [thumbnails.get(row["sha256"], row["file_path"]) for row in data]
+            except Exception as e:  # pylint: disable=broad-except
+                self.ui_queue.post(self._on_attachments_loaded, work_order_id, [], [], e)
+            else:
+                self.ui_queue.post(self._on_attachments_loaded, work_order_id, data, previews, None)
+
+        threading.Thread(target=worker, name="attachments-load", daemon=True).start()
+
+    def _on_attachments_loaded(self, work_order_id, rows, previews, error):
+        if work_order_id != self._attachments_for:
+            return  # another work order was opened meanwhile
+        if error is not None:
+            self._attachments_for = None
+            messagebox.showerror("Attachments", f"Failed to load attachments: {error}")
             return
+        self.attachments_list.delete(*self.attachments_list.get_children())
+        self._previews.clear()
+        for row, preview in zip(rows, previews):
+            image = ""
+            if preview:
+                try:
+                    image = self._previews.get(preview) or tk.PhotoImage(file=preview)
+                    self._previews[preview] = image
+                except tk.TclError:
+                    image = ""
+            self.attachments_list.insert("", "end", image=image, values=(
+                row["file_name"], row["file_type"], row["uploaded_at"] or "",
+            ))
 
-        file_name = os.path.basename(file_path)
-        file_type = file_name.split(".")[-1] if "." in file_name else ""
+    def upload_file(self):
+        """Attach one or more files to the loaded work order without blocking the UI."""
+        file_paths = filedialog.askopenfilenames()
+        if not file_paths:
+            return
 
+        self.pages.ensure(self.details_tab)
         work_order_id_text = self.work_order_number.get().strip()
         if not work_order_id_text:
             messagebox.showerror("Error", "Work Order ID is required to attach files.")
@@ -385,12 +883,46 @@ class WorkOrderTab:
             messagebox.showerror("Error", "Work Order ID must be numeric.")
             return
 
-        insert_file_metadata(work_order_id, file_name, file_path, file_type)
-        messagebox.showinfo("Success", f"File '{file_name}' uploaded successfully!")
+        self.upload_button.config(state="disabled")
+        self.upload_status.set(f"Uploading 0/{len(file_paths)}...")
+        progress = self.ui_queue.wrap(self._on_upload_progress)
 
-        # Optional: show in list with current timestamp
-        now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.attachments_list.insert("", "end", values=(file_name, file_type, now_str))
+        def worker():
+            try:
+                stored, failed = store_attachments(work_order_id, file_paths, progress=progress)
+            except Exception as e:  # pylint: disable=broad-except
+                self.ui_queue.post(self._on_files_uploaded, work_order_id, [], [], e)
+            else:
+                self.ui_queue.post(self._on_files_uploaded, work_order_id, stored, failed, None)
+
+        threading.Thread(target=worker, name="attachments-upload", daemon=True).start()
+
+    def _on_upload_progress(self, done, total):
+        self.upload_status.set(f"Uploading {done}/{total}...")
+
+    def _on_files_uploaded(self, work_order_id, stored, failed, error):
+        self.upload_button.config(state="normal")
+        self.upload_status.set("")
+        if error is not None:
+            messagebox.showerror("Upload", f"Upload failed: {error}")
+            return
+
+        deduplicated = sum(1 for _, result in stored if result.deduplicated)
+        message = f"{len(stored)} file(s) attached"
+        if deduplicated:
+            message += f" ({deduplicated} already in the store, linked rather than copied)"
+        message += "."
+        if failed:
+            message += "\n\nFailed:\n" + "\n".join(
+                f"{os.path.basename(path)}: {e}" for path, e in failed
+            )
+            messagebox.showwarning("Upload", message)
+        else:
+            messagebox.showinfo("Upload", message)
+
+        # Reload from file_attachments; the new previews are already cached
+        self._attachments_wanted = (work_order_id, None)
+        self.show_attachments(work_order_id)
 
     # -----------------------------------------------------------------------
     # Actions
@@ -430,40 +962,77 @@ class WorkOrderTab:
             messagebox.showerror("Validation Error", str(ve))
 
     def add_work_order(self, data):
-        """Add a new work order, then load it into the form."""
+        """Queue a new work order, then load it into the form once it has synced."""
         try:
-            db_add_work_order(data)
-            # NOTE: LAST_INSERT_ID() is connection-specific. Ensure the same connection is used.
-            row = fetch_one("SELECT LAST_INSERT_ID()")
-            new_id = row[0] if row else None
-            messagebox.showinfo("Add Work Order", f"Work order added successfully. ID: {new_id or 'Unknown'}")
-            if new_id:
-                self.load_work_order_by_id(new_id)
+            key = db_add_work_order(data)
         except DatabaseError as e:
             messagebox.showerror("Database Error", f"Failed to add work order: {e}")
+            return
+        messagebox.showinfo("Add Work Order", "Work order saved. It will load here once it syncs.")
+        self._load_when_synced(key)
+
+    def _load_when_synced(self, journal_key, attempts=120):
+        """Poll the write journal (without blocking the UI) for the new work order ID."""
+        new_id = get_write_journal().result_id(journal_key)
+        if new_id:
+            self.load_work_order_by_id(new_id)
+        elif attempts > 0:
+            self.parent_frame.after(500, self._load_when_synced, journal_key, attempts - 1)
+
+    def _current_work_order_id(self):
+        """ID of the work order loaded in the Details tab, or None."""
+        self.pages.ensure(self.details_tab)
+        try:
+            return int(self.work_order_number.get().strip())
+        except ValueError:
+            messagebox.showerror("Work Order", "Load a work order first.")
+            return None
+
+    def handle_edit_current(self):
+        """Save the Details form over the loaded work order."""
+        work_order_id = self._current_work_order_id()
+        if work_order_id is None:
+            return
+        try:
+            data = self.collect_work_order_data()
+            self.validate_work_order_data(data)
+        except ValueError as ve:
+            messagebox.showerror("Validation Error", str(ve))
+            return
+        if self.edit_work_order(work_order_id, data, list(self._pending_parts.items())):
+            self._pending_parts = {}
+            self.load_work_order_by_id(work_order_id)  # show the new reservations
+
+    def handle_delete_current(self):
+        """Delete the loaded work order after confirmation."""
+        work_order_id = self._current_work_order_id()
+        if work_order_id is None:
+            return
+        if messagebox.askyesno("Delete Work Order", f"Delete work order {work_order_id}?"):
+            self.delete_work_order(work_order_id)
 
-    def edit_work_order(self, work_order_id, data):
-        """Edit an existing work order and notify the user."""
+    def edit_work_order(self, work_order_id, data, reservations=()):
+        """
+        Edit an existing work order (reserving any pending parts in the same
+        transaction) and notify the user. Returns True on success.
+        """
         try:
-            query = """
-                UPDATE work_orders
-                SET status = %s, priority = %s, technician = %s, notes = %s
-                WHERE id = %s
-            """
-            execute_query(
-                query,
-                (data["status"], data["priority"], data["technician"], data["notes"], work_order_id),
-                commit=True,
-            )
+            db_update_work_order(work_order_id, data, reservations)
+            discard_work_order_aggregate(work_order_id)
             messagebox.showinfo("Edit Work Order", "Work order updated successfully.")
+            return True
+        except InsufficientStockError as e:
+            messagebox.showerror("Parts", f"Work order not saved. {e}")
+            self.load_parts_index()  # someone else took the stock; refresh counts
         except DatabaseError as e:
             messagebox.showerror("Database Error", f"Failed to edit work order: {e}")
+        return False
 
     def delete_work_order(self, work_order_id):
         """Delete a work order from the database and notify the user."""
         try:
-            query = "DELETE FROM work_orders WHERE id = %s"
-            execute_query(query, (work_order_id,), commit=True)
+            db_delete_work_order(work_order_id)
+            discard_work_order_aggregate(work_order_id)
             messagebox.showinfo("Delete Work Order", "Work order deleted successfully.")
         except DatabaseError as e:
             messagebox.showerror("Database Error", f"Failed to delete work order: {e}")
@@ -471,8 +1040,9 @@ class WorkOrderTab:
     # --- Notes helpers ------------------------------------------------------
     def handle_save_note(self):
         """Read current form values and save a customer note."""
-        customer_id = self.customer_id_entry.get().strip() if hasattr(self, "customer_id_entry") else ""
-        note = self.notes_text.get("1.0", "end-1c").strip() if hasattr(self, "notes_text") else ""
+        self.pages.ensure(self.details_tab)
+        customer_id = self.customer_id_entry.get().strip()
+        note = self.notes_text.get("1.0", "end-1c").strip()
         if not customer_id:
             messagebox.showerror("Save Note", "Customer ID is required.")
             return
@@ -486,15 +1056,19 @@ class WorkOrderTab:
             return
         self._save_note_to_db(cid_int, note)
 
+    def _discard_current_aggregate(self):
+        """Drop the cached aggregate of the order shown in Details, if any."""
+        try:
+            discard_work_order_aggregate(int(self.work_order_number.get().strip()))
+        except ValueError:
+            pass
+
     def _save_note_to_db(self, customer_id, note):
-        """Persist a note to the DB."""
+        """Queue a note for the DB through the write journal."""
         try:
-            query = """
-                INSERT INTO customer_notes (customer_id, note, created_at)
-                VALUES (%s, %s, NOW())
-            """
-            execute_query(query, (customer_id, note), commit=True)
-            messagebox.showinfo("Save Note", "Note saved successfully.")
+            CustomerManager.add_customer_note(customer_id, note)
+            self._discard_current_aggregate()
+            messagebox.showinfo("Save Note", "Note saved. It will sync in the background.")
         except DatabaseError as e:
             messagebox.showerror("Database Error", f"Failed to save note: {e}")
 
@@ -503,6 +1077,7 @@ class WorkOrderTab:
     # -----------------------------------------------------------------------
     def collect_work_order_data(self):
         """Collect work order details from the input fields in the tab."""
+        self.pages.ensure(self.details_tab)
         try:
             return {
                 "customer_id": self.customer_id_entry.get().strip(),
@@ -529,161 +1104,111 @@ class WorkOrderTab:
 
     def load_work_order_by_id(self, work_order_id: int):
         """
-        Populate all Details fields for a given Work Order ID.
-        Tries extended columns first; falls back to minimal set if missing.
+        Open a work order: the order, its customer, the customer's other
+        orders, notes and attachments load together off the main thread and
+        fill every sub-tab at once. Extended columns are selected only if the
+        schema catalog reports them; the catalog is consulted in the worker
+        too, since a cold one queries information_schema.
         """
-        def _populate_from_tuple(t, extended=False):
-            if extended:
-                (wid, customer_id, tech, status, priority, notes,
-                 wotype, dev_type, manu, mdl, serial) = t
+        def worker():
+            columns = None
+            try:
+                columns = get_schema().pick_columns(
+                    "work_orders", WORK_ORDER_BASE_COLUMNS, WORK_ORDER_EXTENDED_COLUMNS
+                )
+                aggregate = load_work_order_aggregate(work_order_id, columns)
+            except Exception as e:  # pylint: disable=broad-except
+                self.ui_queue.post(self._on_aggregate_loaded, work_order_id, columns, None, e)
             else:
-                (wid, customer_id, tech, status, priority, notes) = t
-                wotype = dev_type = manu = mdl = serial = None
-
-            # Work order number (readonly)
-            self.work_order_number.config(state="normal")
-            self.work_order_number.delete(0, "end")
-            self.work_order_number.insert(0, str(wid))
-            self.work_order_number.config(state="readonly")
-
-            # Core fields
-            self.customer_id_entry.delete(0, "end")
-            self.customer_id_entry.insert(0, str(customer_id) if customer_id is not None else "")
-
-            self.assigned_technician.delete(0, "end")
-            self.assigned_technician.insert(0, tech or "")
+                self.ui_queue.post(self._on_aggregate_loaded, work_order_id, columns, aggregate, None)
 
-            self.status_combobox.set(status or "")
-            self.priority.set(priority or "")
+        threading.Thread(target=worker, name="work-order-load", daemon=True).start()
 
-            self.notes_text.delete("1.0", "end")
-            self.notes_text.insert("1.0", notes or "")
-
-            # Extended (best-effort)
-            try:
-                if hasattr(self, "work_order_type"):
-                    self.work_order_type.set(wotype or "")
-            except Exception:
-                pass
-            try:
-                if hasattr(self, "device_type"):
-                    self.device_type.set(dev_type or "")
-            except Exception:
-                pass
-            try:
-                self.manufacturer.delete(0, "end")
-                self.manufacturer.insert(0, manu or "")
-            except Exception:
-                pass
-            try:
-                self.model.delete(0, "end")
-                self.model.insert(0, mdl or "")
-            except Exception:
-                pass
-            try:
-                self.serial_number.delete(0, "end")
-                self.serial_number.insert(0, serial or "")
-            except Exception:
-                pass
-
-            self.notebook.select(self.details_tab)
+    def _on_aggregate_loaded(self, work_order_id, columns, aggregate, error):
+        if error is not None:
+            messagebox.showerror("Work Order", f"Failed to load work order {work_order_id}: {error}")
+            return
+        if aggregate is None:
+            messagebox.showerror("Work Order", f"Work order {work_order_id} not found.")
+            return
 
-        try:
-            # Try extended columns first
-            row = fetch_one(
-                """
-                SELECT id, customer_id, technician, status, priority, notes,
-                       work_order_type, device_type, manufacturer, model, serial_number
-                FROM work_orders
-                WHERE id = %s
-                """,
-                (work_order_id,),
+        # The customer's orders (this one included) in the Search results
+        self.pages.ensure(self.search_tab)
+        self.search_results.delete(*self.search_results.get_children())
+        for order in aggregate.customer_orders:
+            self.search_results.insert("", "end", iid=str(order[0]), values=tuple(order))
+
+        # Attachments render when their tab is shown (or now, if it is showing)
+        self._attachments_wanted = (work_order_id, aggregate.attachments)
+        self._on_subtab_changed()
+        self._show_work_order_parts(aggregate.parts)
+
+        self.pages.ensure(self.details_tab)
+        customer = aggregate.customer
+        if customer is not None:
+            self.customer_summary.set(
+                f"{customer['first_name']} {customer['last_name']}  "
+                f"{customer['phone'] or ''}  {customer['email'] or ''}".strip()
             )
-            if row:
-                _populate_from_tuple(row, extended=True)
-                return
-            messagebox.showerror("Work Order", f"Work order {work_order_id} not found.")
-        except Exception:
-            # Fallback to minimal set
-            try:
-                row = fetch_one(
-                    """
-                    SELECT id, customer_id, technician, status, priority, notes
-                    FROM work_orders
-                    WHERE id = %s
-                    """,
-                    (work_order_id,),
-                )
-                if row:
-                    _populate_from_tuple(row, extended=False)
-                    return
-                messagebox.showerror("Work Order", f"Work order {work_order_id} not found.")
-            except Exception as e:
-                messagebox.showerror("Work Order", f"Failed to load work order {work_order_id}: {e}")
+        else:
+            self.customer_summary.set("")
+        self.customer_notes_list.delete(*self.customer_notes_list.get_children())
+        for note in aggregate.notes:
+            self.customer_notes_list.insert("", "end", values=(note["created_at"], note["note"]))
+
+        self._populate_details(dict(zip(columns, aggregate.work_order)))
+        if customer is not None and self.on_customer is not None:
+            self.on_customer(customer)
+
+    def _populate_details(self, values):
+        """Fill the Details widgets from a column -> value mapping."""
+        self.pages.ensure(self.details_tab)
+        # Work order number (readonly)
+        self.work_order_number.config(state="normal")
+        self.work_order_number.delete(0, "end")
+        self.work_order_number.insert(0, str(values["id"]))
+        self.work_order_number.config(state="readonly")
+
+        # Core fields
+        customer_id = values.get("customer_id")
+        self.customer_id_entry.delete(0, "end")
+        self.customer_id_entry.insert(0, str(customer_id) if customer_id is not None else "")
+
+        self.assigned_technician.delete(0, "end")
+        self.assigned_technician.insert(0, values.get("technician") or "")
+
+        self.status_combobox.set(values.get("status") or "")
+        self.priority.set(values.get("priority") or "")
+
+        self.notes_text.delete("1.0", "end")
+        self.notes_text.insert("1.0", values.get("notes") or "")
+
+        # Extended (blank when the schema doesn't have them)
+        self.work_order_type.set(values.get("work_order_type") or "")
+        self.device_type.set(values.get("device_type") or "")
+        for entry, column in (
+            (self.manufacturer, "manufacturer"),
+            (self.model, "model"),
+            (self.serial_number, "serial_number"),
+        ):
+            entry.delete(0, "end")
+            entry.insert(0, values.get(column) or "")
+
+        self.notebook.select(self.details_tab)
 
     def show_work_order_list_for_customer(self, customer_id: int):
         """Populate the Search tab with this customer's work orders and switch to it."""
         try:
-            rows = fetch_all(
-                """
-                SELECT id, customer_id, status, technician
-                FROM work_orders
-                WHERE customer_id = %s
-                ORDER BY created_at DESC
-                """,
-                (customer_id,),
-            )
-            if hasattr(self, "search_results"):
-                self.search_results.delete(*self.search_results.get_children())
-                for r in rows:
-                    self.search_results.insert("", "end", values=r)
+            rows = get_customer_work_orders(customer_id)
+            self.pages.ensure(self.search_tab)
+            self.search_results.delete(*self.search_results.get_children())
+            for r in rows:
+                self.search_results.insert("", "end", iid=str(r[0]), values=tuple(r))
 
-            if hasattr(self, "notebook") and hasattr(self, "search_tab"):
-                self.notebook.select(self.search_tab)
+            self.notebook.select(self.search_tab)
         except Exception as e:
             messagebox.showerror("Work Orders", f"Failed to load list for customer {customer_id}: {e}")
 
     def load_work_order(self, work_order_id: int):
-        """Load a single work order into the Details tab. Fills the widgets that exist."""
-        try:
-            row = fetch_one(
-                """
-                SELECT id, technician, status, priority, notes
-                FROM work_orders
-                WHERE id = %s
-                """,
-                (work_order_id,),
-            )
-            if not row:
-                messagebox.showerror("Work Order", f"Work order {work_order_id} not found.")
-                return
-
-            wid, tech, status, priority, notes = row
-
-            if hasattr(self, "work_order_number"):
-                self.work_order_number.config(state="normal")
-                self.work_order_number.delete(0, "end")
-                self.work_order_number.insert(0, str(wid))
-                self.work_order_number.config(state="readonly")
-
-            if hasattr(self, "assigned_technician"):
-                self.assigned_technician.delete(0, "end")
-                self.assigned_technician.insert(0, tech or "")
-
-            if hasattr(self, "priority"):
-                try:
-                    self.priority.set(priority or "")
-                except Exception:
-                    pass
-
-            if hasattr(self, "notes_text"):
-                try:
-                    self.notes_text.delete("1.0", "end")
-                    self.notes_text.insert("1.0", notes or "")
-                except Exception:
-                    pass
-
-            if hasattr(self, "notebook") and hasattr(self, "details_tab"):
-                self.notebook.select(self.details_tab)
-        except Exception as e:
-            messagebox.showerror("Work Order", f"Failed to load work order {work_order_id}: {e}")
+        """Load a single work order into the Details tab (scan / global lookup entry point)."""
+        self.load_work_order_by_id(work_order_id)
@@ -0,0 +1,166 @@
+"""Shared fixtures: a stand-in MariaDB driver so database.py runs without a server."""
+
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeDriverError(Exception):
+    def __init__(self, message="", errno=None):
+        super().__init__(message)
+        self.errno = errno
+
+
+class FakeInterfaceError(FakeDriverError):
+    pass
+
+
+class FakeOperationalError(FakeDriverError):
+    pass
+
+
+class FakeProgrammingError(FakeDriverError):
+    pass
+
+
+class FakeIntegrityError(FakeDriverError):
+    pass
+
+
+@pytest.fixture
+def fake_driver(monkeypatch):
+    """Replace database.mariadb with exception classes shaped like the real driver's."""
+    import database
+
+    driver = types.SimpleNamespace(
+        Error=FakeDriverError, InterfaceError=FakeInterfaceError,
+        OperationalError=FakeOperationalError, ProgrammingError=FakeProgrammingError,
+        IntegrityError=FakeIntegrityError, PoolError=FakeDriverError,
+    )
+    monkeypatch.setattr(database, "mariadb", driver)
+    return driver
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = None
+        self.rowcount = 0
+        self.lastrowid = None
+        self._rows = []
+
+    def execute(self, query, params=()):
+        self.connection.run(self, " ".join(query.split()), params)
+
+    def executemany(self, query, data):
+        for params in data:
+            self.execute(query, params)
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """
+    Records statements; ``handler(sql, params)`` returns rows (tuples, or
+    dicts to name the columns) or raises, for each one. Statements only
+    count as committed once commit() is called.
+    """
+
+    def __init__(self, handler=None):
+        self.handler = handler or (lambda sql, params: [])
+        self.pending = []
+        self.committed = []
+        self.rollbacks = 0
+        self.closed = False
+        self._next_id = 100
+
+    def run(self, cursor, sql, params):
+        rows = list(self.handler(sql, params) or [])
+        self.pending.append((sql, tuple(params)))
+        if rows and isinstance(rows[0], dict):  # named columns
+            cursor.description = [(name,) for name in rows[0]]
+            rows = [tuple(row.values()) for row in rows]
+        else:
+            cursor.description = [("c%d" % i,) for i in range(len(rows[0]))] if rows else None
+        cursor._rows = rows
+        cursor.rowcount = 1
+        if sql.startswith("INSERT"):
+            self._next_id += 1
+            cursor.lastrowid = self._next_id
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_db(monkeypatch, fake_driver):
+    """
+    Point database.py at FakeConnections. Call the fixture with a handler to
+    use; it returns the list of connections handed out so far.
+    """
+    import database
+
+    connections = []
+    state = {"handler": None}
+
+    def connect(host=None, port=None):
+        connection = FakeConnection(state["handler"])
+        connections.append(connection)
+        return connection
+
+    monkeypatch.setattr(database, "_connect", connect)
+    monkeypatch.setattr(database, "_get_service_client", lambda: None)
+    monkeypatch.setattr(database, "get_replicas", lambda: None)
+
+    def use(handler=None):
+        state["handler"] = handler
+        return connections
+
+    return use
+
+
+@pytest.fixture(autouse=True)
+def fresh_schema(monkeypatch):
+    """Each test starts with an unloaded schema catalog (it is module state in database.py)."""
+    import database
+    from utils.schema import SchemaCatalog
+
+    monkeypatch.setattr(database, "_schema", SchemaCatalog())
+
+
+@pytest.fixture
+def schema(monkeypatch):
+    """Call with {table: [columns]} to give database.py that schema catalog."""
+    import database
+    from utils.schema import SchemaCatalog
+
+    def use(tables):
+        catalog = SchemaCatalog()
+        catalog.load(lambda query, params: [(t, c) for t, cols in tables.items() for c in cols], "shop")
+        monkeypatch.setattr(database, "_schema", catalog)
+        return catalog
+
+    return use
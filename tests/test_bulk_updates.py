@@ -0,0 +1,51 @@
+"""Bulk work order changes are audited with the acting user's id."""
+
+import types
+
+import database
+from tabs import workorder_tab
+from tabs.workorder_tab import WorkOrderTab
+
+
+def bulk_tab(monkeypatch, username="sam", session=None):
+    """A WorkOrderTab stand-in with just what _bulk_update needs (no Tk window)."""
+    monkeypatch.setattr(workorder_tab.messagebox, "showinfo", lambda *args: None)
+    monkeypatch.setattr(workorder_tab.messagebox, "showerror", lambda *args: None)
+    tab = types.SimpleNamespace(username=username, session=session, _audit_user_id=None)
+    tab._selected_work_order_ids = lambda: [7, 8]
+    tab._user_id = types.MethodType(WorkOrderTab._user_id, tab)
+    return tab
+
+
+def audit_rows(connections):
+    return [params for c in connections for sql, params in c.committed if sql.startswith("INSERT INTO audit_log")]
+
+
+def test_bulk_close_audit_rows_carry_the_user_id(fake_db, monkeypatch):
+    def handler(sql, params):
+        if sql.startswith("SELECT id FROM users"):
+            return [(42,)]
+        if sql.startswith("SELECT id, status, technician FROM work_orders"):
+            return [(7, "Open", "sam"), (8, "On Hold", "kim")]
+        return []
+
+    connections = fake_db(handler)
+    tab = bulk_tab(monkeypatch)
+
+    ids = WorkOrderTab._bulk_update(tab, "Close Work Orders", database.bulk_close_work_orders)
+
+    assert ids == [7, 8]
+    rows = audit_rows(connections)
+    assert [(row[0], row[1], row[2]) for row in rows] == [(42, "bulk_close", 7), (42, "bulk_close", 8)]
+    assert rows[0][3].endswith("by sam")
+
+
+def test_user_id_comes_from_the_login_prefetch_and_is_looked_up_once(monkeypatch):
+    lookups = []
+    monkeypatch.setattr(workorder_tab, "get_user_id", lambda username: lookups.append(username) or 9)
+    prefetched = bulk_tab(monkeypatch, session=types.SimpleNamespace(get=lambda name: 42))
+    looked_up = bulk_tab(monkeypatch)
+
+    assert prefetched._user_id() == 42
+    assert looked_up._user_id() == 9 and looked_up._user_id() == 9
+    assert lookups == ["sam"]
@@ -0,0 +1,77 @@
+"""The work order change feed: same-second late commits and duplicate suppression."""
+
+import datetime
+
+from utils.change_feed import WorkOrderChangeFeed
+from utils.rows import record_rows
+
+FIELDS = ("id", "status", "created_at", "changed_at")
+T0 = datetime.datetime(2026, 3, 1, 9, 0, 0)
+T1 = T0 + datetime.timedelta(seconds=1)
+
+
+class FakeTable:
+    """work_orders as the change feed queries it: ordered by (changed_at, id)."""
+
+    def __init__(self, *rows):
+        self.rows = {}
+        for row in rows:
+            self.put(*row)
+
+    def put(self, order_id, status, created_at, changed_at):
+        self.rows[order_id] = (order_id, status, created_at, changed_at)
+
+    def start(self):
+        newest = max(self.rows.values(), key=lambda row: (row[3], row[0]))
+        return (newest[3], newest[0]), [row[0] for row in self.rows.values() if row[1] != "Closed"]
+
+    def changes(self, changed_at, last_id, limit):
+        rows = sorted((row for row in self.rows.values() if (row[3], row[0]) > (changed_at, last_id)),
+                      key=lambda row: (row[3], row[0]))
+        return record_rows(FIELDS, rows[:limit])
+
+
+def started_feed(table, batch_size=500):
+    feed = WorkOrderChangeFeed(table.start, table.changes, batch_size=batch_size)
+    published = []
+    feed.subscribe(published.extend)
+    feed.begin()
+    return feed, published
+
+
+def test_a_late_commit_in_the_mark_second_with_a_lower_id_is_delivered():
+    table = FakeTable((5, "Open", T0, T0), (9, "Open", T0, T0))
+    feed, published = started_feed(table)
+    assert feed.poll_once() == 0
+
+    table.put(7, "Open", T0, T0)  # committed after the feed read id 9 at T0
+    assert feed.poll_once() == 1
+    assert [(event.kind, event.work_order["id"]) for event in published] == [("added", 7)]
+
+
+def test_rows_in_the_mark_second_are_not_repeated_unless_they_change():
+    table = FakeTable((5, "Open", T0, T0))
+    feed, published = started_feed(table)
+
+    table.put(6, "Open", T1, T1)
+    table.put(8, "Open", T1, T1)
+    assert feed.poll_once() == 2
+    assert feed.poll_once() == 0
+
+    table.put(6, "Closed", T1, T1)
+    assert feed.poll_once() == 1
+    assert [(event.kind, event.work_order["id"]) for event in published] == [
+        ("added", 6), ("added", 8), ("closed", 6),
+    ]
+    assert feed.high_water_mark == (T1, 6)
+
+
+def test_a_mark_second_busier_than_one_batch_is_paged_through():
+    table = FakeTable((1, "Open", T0, T0))
+    feed, published = started_feed(table, batch_size=2)
+
+    for order_id in range(2, 7):
+        table.put(order_id, "Open", T1, T1)
+    assert feed.poll_once() == 5
+    assert feed.poll_once() == 0
+    assert [event.work_order["id"] for event in published] == [2, 3, 4, 5, 6]
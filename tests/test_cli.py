@@ -0,0 +1,39 @@
+"""cli.py exit statuses for bad input files."""
+
+import csv
+
+import cli
+
+
+def test_import_with_a_renamed_header_names_the_missing_column(fake_db, tmp_path, capsys):
+    fake_db()
+    path = tmp_path / "customers.csv"
+    path.write_text("First Name,Surname\nAnn,Lee\n")
+
+    status = cli.main(["import-customers", str(path)])
+
+    assert status == cli.EXIT_FAILED
+    assert "missing column 'Last Name'" in capsys.readouterr().err
+
+
+def test_import_of_an_unreadable_csv_fails_cleanly(fake_db, tmp_path, capsys):
+    fake_db()
+    path = tmp_path / "customers.csv"
+    path.write_text("First Name\n" + "A" * 100 + "\n")
+    limit = csv.field_size_limit(10)
+    try:
+        status = cli.main(["import-customers", str(path)])
+    finally:
+        csv.field_size_limit(limit)
+
+    assert status == cli.EXIT_FAILED
+    assert "field larger than field limit" in capsys.readouterr().err
+
+
+def test_reconcile_counters_rebuilds_once(monkeypatch, capsys):
+    calls = []
+    monkeypatch.setattr(cli, "rebuild_work_order_counters", lambda: calls.append(1))
+
+    assert cli.main(["reconcile-counters"]) == cli.EXIT_OK
+    assert calls == [1]
+    assert "rebuilt" in capsys.readouterr().out
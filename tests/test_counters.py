@@ -0,0 +1,62 @@
+"""Materialized work order counters: deltas and seeding."""
+
+import database
+from database import _merge_counter_deltas, _work_order_counter_deltas
+
+WORK_ORDERS = ["id", "customer_id", "status", "priority", "technician", "notes", "created_at"]
+COUNTERS = ["dimension", "bucket", "total"]
+
+
+def test_new_order_deltas_cover_every_dimension():
+    assert _work_order_counter_deltas(1, "Open", "Sam", "2026-03-02") == {
+        ("status", "Open"): 1, ("technician", "Sam"): 1, ("day", "2026-03-02"): 1,
+    }
+
+
+def test_missing_values_count_in_the_empty_bucket():
+    assert _work_order_counter_deltas(-1, None, None) == {("status", ""): -1, ("technician", ""): -1}
+
+
+def test_status_change_moves_one_order_between_buckets():
+    merged = _merge_counter_deltas(
+        _work_order_counter_deltas(-1, "Open", "Sam"),
+        _work_order_counter_deltas(1, "Closed", "Sam"),
+    )
+    assert merged == {("status", "Open"): -1, ("status", "Closed"): 1, ("technician", "Sam"): 0}
+
+
+def test_zero_deltas_are_not_written(fake_db, schema):
+    schema({"work_orders": WORK_ORDERS, "work_order_counters": COUNTERS})
+    connections = fake_db()
+    with database.transaction() as tx:
+        database._adjust_work_order_counters(tx.cursor, {("technician", "Sam"): 0, ("status", "Open"): 2})
+    written = [params for sql, params in connections[0].committed if "work_order_counters" in sql]
+    assert written == [("status", "Open", 2)]
+
+
+def test_partial_counters_without_marker_are_rebuilt(fake_db, schema, monkeypatch):
+    """A write that reached the empty table first must not make its lone bucket the total."""
+    monkeypatch.setattr(database, "_counters_seeded", False)
+    schema({"work_orders": WORK_ORDERS, "work_order_counters": COUNTERS})
+    state = {"seeded": False}
+
+    def handler(sql, params):
+        if sql.startswith("SELECT total FROM work_order_counters"):
+            return [(1,)] if state["seeded"] else []
+        if sql.startswith("INSERT INTO work_order_counters (dimension, bucket, total) VALUES"):
+            state["seeded"] = state["seeded"] or params == ("meta", "seeded")
+        if sql.startswith("SELECT bucket, total FROM work_order_counters"):
+            return [("Open", 7), ("Closed", 5)] if state["seeded"] else [("Open", 1)]
+        if "INTERVAL 1 DAY" in sql:
+            return [(0,)]
+        return []
+
+    connections = fake_db(handler)
+    assert database.get_work_order_metrics()["total"] == 12
+    rebuild = [sql for c in connections for sql, _ in c.committed]
+    assert "DELETE FROM work_order_counters" in rebuild
+
+    before = len(connections)
+    database.get_work_order_metrics()
+    later = [sql for c in connections[before:] for sql, _ in c.committed + c.pending]
+    assert not any(sql.startswith(("SELECT total FROM work_order_counters", "DELETE")) for sql in later)
@@ -0,0 +1,238 @@
+"""Write-behind journal: replay survives lost connections and never double-applies."""
+
+import threading
+import time
+
+import pytest
+
+import database
+from database import DatabaseUnavailableError
+from utils.journal import WriteJournal
+from conftest import FakeConnection, FakeOperationalError, FakeProgrammingError
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def journal_factory(tmp_path):
+    journals = []
+
+    def make(apply_batch, **kwargs):
+        kwargs.setdefault("retry_delay", 0.01)
+        kwargs.setdefault("max_retry_delay", 0.02)
+        journal = WriteJournal(str(tmp_path / "journal.sqlite3"), apply_batch, **kwargs)
+        journals.append(journal)
+        return journal
+
+    yield make
+    for journal in journals:
+        journal.stop()
+
+
+def customer_payload(name):
+    return {
+        "first_name": name, "last_name": "Tester", "street": "", "city": "", "state": "",
+        "zip_code": "", "customer_type": "Student", "student_id": "", "method_of_contact": "Phone",
+        "phone": "555", "email": "", "created_at": "2026-01-01 09:00:00",
+    }
+
+
+def test_transaction_maps_lost_connection_to_unavailable(fake_db):
+    def handler(sql, params):
+        if sql.startswith("INSERT INTO b"):
+            raise FakeOperationalError("Lost connection to server during query", errno=2013)
+
+    connections = fake_db(handler)
+    with pytest.raises(DatabaseUnavailableError):
+        with database.transaction() as tx:
+            tx.insert("INSERT INTO a VALUES (1)")
+            tx.insert("INSERT INTO b VALUES (2)")
+    assert connections[-1].committed == []
+    assert connections[-1].rollbacks == 1
+
+
+def test_transaction_keeps_rejections_as_database_error(fake_db):
+    def handler(sql, params):
+        raise FakeProgrammingError("You have an error in your SQL syntax", errno=1064)
+
+    fake_db(handler)
+    with pytest.raises(database.DatabaseError) as raised:
+        with database.transaction() as tx:
+            tx.execute("SELEC 1")
+    assert not isinstance(raised.value, DatabaseUnavailableError)
+
+
+def test_replay_survives_connection_lost_mid_batch(fake_db, journal_factory, monkeypatch):
+    """A connection dropping partway through replay must defer, not dead-letter, the batch."""
+    monkeypatch.setattr(database, "_journal_applied_ready", True)
+    drops = {"left": 8}
+
+    def handler(sql, params):
+        if sql.startswith("INSERT INTO customers") and params[0] == "second" and drops["left"]:
+            drops["left"] -= 1
+            raise FakeOperationalError("MySQL server has gone away", errno=2006)
+        return []
+
+    connections = fake_db(handler)
+    journal = journal_factory(database.apply_journal_batch, transient_errors=(DatabaseUnavailableError,))
+    keys = [journal.submit("add_customer", customer_payload(name)) for name in ("first", "second", "third")]
+    journal.start()
+
+    assert wait_until(lambda: journal.pending_count() == 0)
+    assert journal.failed_count() == 0
+    assert all(journal.result_id(key) for key in keys)
+    inserted = [params[0] for connection in connections for sql, params in connection.committed
+                if sql.startswith("INSERT INTO customers")]
+    assert inserted == ["first", "second", "third"]
+
+
+def test_transient_errors_keep_entries_queued(journal_factory):
+    calls = []
+    gate = threading.Event()
+
+    def apply_batch(entries):
+        calls.append([key for key, _, _ in entries])
+        if len(calls) < 6:
+            raise DatabaseUnavailableError("Failed to connect to the database.")
+        gate.set()
+        return {key: index for index, (key, _, _) in enumerate(entries, 1)}
+
+    journal = journal_factory(apply_batch, transient_errors=(DatabaseUnavailableError,))
+    keys = [journal.submit("add_customer_note", {"n": i}) for i in range(3)]
+    journal.start()
+
+    assert gate.wait(5)
+    assert wait_until(lambda: journal.pending_count() == 0)
+    assert journal.failed_count() == 0
+    # Deferred batches are retried whole, never split into single entries
+    assert all(batch == keys for batch in calls)
+
+
+def test_replay_waits_for_the_applied_keys_migration(fake_db, schema, journal_factory, monkeypatch):
+    """Without write_journal_applied, writes stay queued (no DDL, no unguarded replay)."""
+    monkeypatch.setattr(database, "_journal_applied_ready", False)
+    schema({"customers": ["id"]})
+    connections = fake_db()
+    journal = journal_factory(database.apply_journal_batch, transient_errors=(DatabaseUnavailableError,))
+    journal.submit("add_customer", customer_payload("waiting"))
+    journal.start()
+
+    assert wait_until(lambda: len(connections) >= 2)
+    assert journal.pending_count() == 1 and journal.failed_count() == 0
+    statements = [sql for c in connections for sql, _ in c.pending + c.committed]
+    assert not any(sql.startswith(("CREATE", "ALTER", "INSERT")) for sql in statements)
+
+
+def test_replay_sees_a_migration_run_after_the_catalog_loaded(fake_db, schema, monkeypatch):
+    monkeypatch.setattr(database, "_journal_applied_ready", False)
+    schema({"customers": ["id"]})
+
+    def handler(sql, params):
+        if "information_schema.tables" in sql:
+            return [(1,)]
+        return []
+
+    connections = fake_db(handler)
+    results = database.apply_journal_batch([("k1", "add_customer", customer_payload("late"))])
+
+    assert results["k1"]
+    assert any(sql.startswith("INSERT INTO customers") for c in connections for sql, _ in c.committed)
+
+
+def applied_keys_server(connections):
+    """Handler answering write_journal_applied lookups from what has been committed."""
+    def handler(sql, params):
+        if sql.startswith("SELECT idempotency_key"):
+            applied = {}
+            for connection in connections:
+                for statement, values in connection.committed:
+                    if statement.startswith("INSERT INTO write_journal_applied"):
+                        applied[values[0]] = values[1]
+            return [(key, applied[key]) for key in params if key in applied]
+        return []
+    return handler
+
+
+def test_replay_skips_keys_the_server_already_applied(fake_db, monkeypatch):
+    monkeypatch.setattr(database, "_journal_applied_ready", True)
+    connections = fake_db()
+    connections.append(FakeConnection())
+    connections[-1].committed.append(
+        ("INSERT INTO write_journal_applied (idempotency_key, result_id, applied_at) VALUES (%s, %s, NOW())",
+         ("k1", 41)))
+    fake_db(applied_keys_server(connections))
+
+    results = database.apply_journal_batch([
+        ("k1", "add_customer", customer_payload("already")),
+        ("k2", "add_customer", customer_payload("new")),
+    ])
+
+    assert results["k1"] == 41 and results["k2"]
+    inserted = [params[0] for connection in connections for sql, params in connection.committed
+                if sql.startswith("INSERT INTO customers")]
+    assert inserted == ["new"]
+
+
+def test_replay_after_a_lost_commit_acknowledgement_does_not_duplicate(fake_db, monkeypatch):
+    """The server committed but the client never heard back: the retry must be a no-op."""
+    monkeypatch.setattr(database, "_journal_applied_ready", True)
+    connections = fake_db()
+    fake_db(applied_keys_server(connections))
+    commit = FakeConnection.commit
+    lost = {"left": 1}
+
+    def commit_then_drop(self):
+        commit(self)
+        if lost["left"]:
+            lost["left"] -= 1
+            raise FakeOperationalError("Lost connection to server during query", errno=2013)
+
+    monkeypatch.setattr(FakeConnection, "commit", commit_then_drop)
+    entries = [("k1", "add_customer", customer_payload("once"))]
+
+    with pytest.raises(DatabaseUnavailableError):
+        database.apply_journal_batch(entries)
+    first_id = [params[1] for connection in connections for sql, params in connection.committed
+                if sql.startswith("INSERT INTO write_journal_applied")][0]
+
+    assert database.apply_journal_batch(entries) == {"k1": first_id}
+    inserted = [params[0] for connection in connections for sql, params in connection.committed
+                if sql.startswith("INSERT INTO customers")]
+    assert inserted == ["once"]
+
+
+def test_journal_keeps_result_ids_for_applied_keys(journal_factory):
+    journal = journal_factory(lambda entries: {key: 500 + i for i, (key, _, _) in enumerate(entries)})
+    keys = [journal.submit("add_customer", customer_payload(name)) for name in ("a", "b")]
+    assert journal.result_id(keys[0]) is None
+    journal.start()
+
+    assert wait_until(lambda: journal.pending_count() == 0)
+    assert [journal.result_id(key) for key in keys] == [500, 501]
+
+
+def test_rejected_entry_is_dead_lettered_without_blocking_the_queue(journal_factory):
+    applied = []
+
+    def apply_batch(entries):
+        if any(payload["n"] == 1 for _, _, payload in entries):
+            raise database.DatabaseError("Duplicate entry")
+        applied.extend(payload["n"] for _, _, payload in entries)
+        return {key: payload["n"] for key, _, payload in entries}
+
+    # Long backoff: the test would time out if the rejection were retried with it
+    journal = journal_factory(apply_batch, retry_delay=30, max_retry_delay=30)
+    keys = [journal.submit("add_customer_note", {"n": n}) for n in range(4)]
+    journal.start()
+
+    assert wait_until(lambda: journal.pending_count() == 0, timeout=3)
+    assert journal.failed_count() == 1
+    assert applied == [0, 2, 3]
+    assert journal.result_id(keys[1]) is None and journal.result_id(keys[3]) == 3
@@ -0,0 +1,144 @@
+"""Schema migrations: scripts apply once, in order, and the app never runs DDL on hot tables."""
+
+import pytest
+
+import database
+from utils import migrations
+
+WORK_ORDERS = ["id", "customer_id", "status", "priority", "technician", "notes", "created_at"]
+
+
+def write(directory, name, text):
+    (directory / name).write_text(text, encoding="utf-8")
+
+
+def test_shipped_migrations_parse():
+    found = migrations.discover()
+    assert [m.version for m in found] == sorted({m.version for m in found})
+    for migration in found:
+        statements = migrations.statements(migration)
+        assert statements
+        assert not any(s.endswith(";") or s.startswith("--") for s in statements)
+
+
+def test_statements_split_on_line_end_semicolons(tmp_path):
+    write(tmp_path, "001_first.sql", "-- comment; not a statement\nCREATE TABLE a (x INT);\n"
+                                     "ALTER TABLE a\n    ADD COLUMN y INT;\n")
+    (migration,) = migrations.discover(str(tmp_path))
+    assert migrations.statements(migration) == [
+        "CREATE TABLE a (x INT)", "ALTER TABLE a\n    ADD COLUMN y INT",
+    ]
+
+
+def test_duplicate_versions_are_rejected(tmp_path):
+    write(tmp_path, "001_a.sql", "SELECT 1;")
+    write(tmp_path, "1_b.sql", "SELECT 2;")
+    with pytest.raises(ValueError):
+        migrations.discover(str(tmp_path))
+
+
+def test_run_migrations_applies_pending_in_order_and_records_them(tmp_path, fake_db):
+    write(tmp_path, "001_one.sql", "CREATE TABLE one (x INT);")
+    write(tmp_path, "002_two.sql", "ALTER TABLE one ADD COLUMN y INT;\nCREATE INDEX i ON one (y);")
+    write(tmp_path, "003_three.sql", "CREATE TABLE three (x INT);")
+
+    def handler(sql, params):
+        if sql == "SELECT version FROM schema_migrations":
+            return [(1,)]
+        return []
+
+    connections = fake_db(handler)
+    applied = database.run_migrations(str(tmp_path))
+
+    assert [m.version for m in applied] == [2, 3]
+    assert len(connections) == 1
+    statements = [sql for sql, _ in connections[0].committed]
+    assert "CREATE TABLE one (x INT)" not in statements
+    run = [s for s in statements if not s.startswith(("CREATE TABLE IF NOT EXISTS schema_migrations", "SELECT"))]
+    assert run == [
+        "ALTER TABLE one ADD COLUMN y INT", "CREATE INDEX i ON one (y)",
+        "INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, NOW())",
+        "CREATE TABLE three (x INT)",
+        "INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, NOW())",
+    ]
+
+
+def test_change_feed_start_does_not_alter_work_orders(fake_db, schema):
+    schema({"work_orders": WORK_ORDERS})
+    connections = fake_db(lambda sql, params: [])
+
+    database.get_change_feed_start()
+
+    statements = [sql for c in connections for sql, _ in c.pending + c.committed]
+    assert statements
+    assert not any(sql.startswith(("ALTER", "CREATE")) for sql in statements)
+    assert all("updated_at" not in sql for sql in statements)
+
+
+def test_counters_fall_back_to_counting_without_the_table(fake_db, schema):
+    schema({"work_orders": WORK_ORDERS})
+
+    def handler(sql, params):
+        if "GROUP BY COALESCE(status, '')" in sql:
+            return [("Open", 3), ("Closed", 2)]
+        if "INTERVAL 1 DAY" in sql:
+            return [(1,)]
+        return []
+
+    connections = fake_db(handler)
+    assert database.get_work_order_metrics() == {"total": 5, "active": 3, "new_last_24_hours": 1}
+    with database.transaction() as tx:
+        database._adjust_work_order_counters(tx.cursor, {("status", "Open"): 1})
+    statements = [sql for c in connections for sql, _ in c.committed + c.pending]
+    assert not any("work_order_counters" in sql for sql in statements)
+    assert not any(sql.startswith(("CREATE", "ALTER")) for sql in statements)
+
+
+def test_attachments_without_hash_columns_are_stored_without_ddl(fake_db, schema, tmp_path, monkeypatch):
+    from utils.attachment_store import AttachmentStore
+    from utils.thumbnails import ThumbnailCache
+
+    schema({"file_attachments": ["id", "work_order_id", "file_name", "file_path", "file_type"]})
+    monkeypatch.setattr(database, "_attachment_store", AttachmentStore(str(tmp_path / "store")))
+    monkeypatch.setattr(database, "_thumbnail_cache", ThumbnailCache(str(tmp_path / "thumbs")))
+    source = tmp_path / "invoice.txt"
+    source.write_text("parts and labour", encoding="utf-8")
+    connections = fake_db()
+
+    stored, failed = database.store_attachments(7, [str(source)])
+
+    assert len(stored) == 1 and not failed
+    statements = [(sql, params) for c in connections for sql, params in c.committed]
+    assert not any(sql.startswith(("ALTER", "CREATE")) for sql, _ in statements)
+    (insert,) = [(sql, params) for sql, params in statements if sql.startswith("INSERT INTO file_attachments")]
+    assert "sha256" not in insert[0]
+    assert insert[1][:2] == (7, "invoice.txt")
+
+
+def test_parts_without_the_migration_read_empty_and_refuse_writes(fake_db, schema):
+    schema({"work_orders": ["id", "status"]})
+    connections = fake_db()
+
+    assert database.get_parts_catalog() == []
+    assert database.search_parts("BAT") == []
+    with pytest.raises(database.DatabaseError, match="migrate"):
+        database.add_part("BAT-1", "Battery")
+    with pytest.raises(database.DatabaseError, match="migrate"):
+        database.reserve_parts(7, [(1, 1)])
+    assert not any(c.committed for c in connections)
+
+
+def test_archiving_without_the_archive_migration_runs_no_ddl(fake_db, schema):
+    schema({"work_orders": WORK_ORDERS})
+    connections = fake_db()
+
+    with pytest.raises(database.DatabaseError, match="migrate"):
+        database.archive_closed_work_orders(180)
+    assert not any(c.committed for c in connections)
+
+
+def test_archive_migration_follows_work_orders_changes():
+    (archive,) = [m for m in migrations.discover() if m.name == "work_orders_archive"]
+    statements = migrations.statements(archive)
+    assert statements[0] == "CREATE TABLE IF NOT EXISTS work_orders_archive LIKE work_orders"
+    assert any("ADD COLUMN IF NOT EXISTS updated_at" in s for s in statements[1:])
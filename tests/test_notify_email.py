@@ -0,0 +1,187 @@
+"""Follow-up email dispatch against a stand-in SMTP server."""
+
+import datetime
+import smtplib
+
+import pytest
+
+import database
+from utils import notify_email
+from utils.notify_email import NotificationDispatcher, send_due_notifications
+
+
+class FakeSMTPServer:
+    """
+    Stand-in for the mail server: ``smtp_factory`` opens sessions on it.
+    ``replies`` maps a recipient to the exceptions its next sends raise, in order.
+    """
+
+    def __init__(self, refuse_connections=False, login_code=None):
+        self.refuse_connections = refuse_connections
+        self.login_code = login_code
+        self.sessions = []
+        self.delivered = []
+        self.replies = {}
+
+    def factory(self, host, port, timeout=None):
+        if self.refuse_connections:
+            raise ConnectionRefusedError(111, "Connection refused")
+        session = FakeSMTP(self)
+        self.sessions.append(session)
+        return session
+
+
+class FakeSMTP:
+    def __init__(self, server):
+        self.server = server
+        self.closed = False
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        if self.server.login_code:
+            raise smtplib.SMTPAuthenticationError(self.server.login_code, b"Authentication failed")
+
+    def send_message(self, message):
+        assert not self.closed
+        pending = self.server.replies.get(message["To"])
+        if pending:
+            raise pending.pop(0)
+        self.server.delivered.append(message["To"])
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(notify_email.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def notifications(count):
+    return [
+        {"work_order_id": i, "email": f"customer{i}@example.com", "first_name": f"C{i}",
+         "status": "Pending Follow-Up", "technician": "Sam"}
+        for i in range(1, count + 1)
+    ]
+
+
+def dispatcher(server, **kwargs):
+    kwargs.setdefault("rate_per_second", 0)
+    return NotificationDispatcher("localhost", 2525, "shop@example.com",
+                                  smtp_factory=server.factory, **kwargs)
+
+
+def test_one_connection_is_reused_for_the_whole_run(no_sleep):
+    server = FakeSMTPServer()
+    results = dispatcher(server, batch_size=2).dispatch(notifications(5))
+    assert [r.status for r in results] == ["sent"] * 5
+    assert len(server.sessions) == 1
+    assert len(server.delivered) == 5
+    assert server.sessions[0].closed
+
+
+def test_4xx_reply_reconnects_and_retries(no_sleep):
+    server = FakeSMTPServer()
+    server.replies["customer2@example.com"] = [smtplib.SMTPResponseException(451, b"Try again later")]
+    results = dispatcher(server).dispatch(notifications(3))
+    assert [r.status for r in results] == ["sent"] * 3
+    assert len(server.sessions) == 2
+    assert server.delivered.count("customer2@example.com") == 1
+    assert no_sleep == [1.0]
+
+
+def test_5xx_reply_fails_only_that_message(no_sleep):
+    server = FakeSMTPServer()
+    server.replies["customer2@example.com"] = [smtplib.SMTPResponseException(550, b"No such user")]
+    results = dispatcher(server).dispatch(notifications(3))
+    assert [r.status for r in results] == ["sent", "failed", "sent"]
+    assert "550" in results[1].error
+    assert len(server.sessions) == 1
+    assert no_sleep == []
+
+
+def test_unreachable_server_defers_the_rest_of_the_run(no_sleep):
+    server = FakeSMTPServer(refuse_connections=True)
+    recorded = []
+    results = dispatcher(server, max_retries=3).dispatch(notifications(1000), recorded.extend)
+    assert len(results) == 1000
+    assert {r.status for r in results} == {"deferred"}
+    assert recorded == []
+    # One backoff sequence for the whole run, not one per message
+    assert no_sleep == [1.0, 2.0, 4.0]
+
+
+def test_rejected_login_defers_without_retrying(no_sleep):
+    server = FakeSMTPServer(login_code=535)
+    results = dispatcher(server, username="shop", password="wrong").dispatch(notifications(4))
+    assert {r.status for r in results} == {"deferred"}
+    assert len(server.sessions) == 1
+    assert server.sessions[0].closed
+    assert no_sleep == []
+
+
+def test_outage_mid_run_records_what_was_sent(no_sleep):
+    server = FakeSMTPServer()
+    disconnected = smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+
+    def factory(host, port, timeout=None):
+        if len(server.sessions) >= 1:
+            raise ConnectionRefusedError(111, "Connection refused")
+        return FakeSMTPServer.factory(server, host, port, timeout)
+
+    server.replies["customer3@example.com"] = [disconnected]
+    recorded = []
+    mailer = NotificationDispatcher("localhost", 2525, "shop@example.com", rate_per_second=0,
+                                    smtp_factory=factory)
+    results = mailer.dispatch(notifications(5), recorded.extend)
+    assert [r.status for r in results] == ["sent", "sent", "deferred", "deferred", "deferred"]
+    assert [r.work_order_id for r in recorded] == [1, 2]
+
+
+def test_delivery_rows_are_recorded_in_batches(fake_db, schema, no_sleep):
+    schema({"work_orders": ["id"], "customers": ["id"], "notification_deliveries": ["work_order_id"]})
+    created = datetime.datetime(2026, 1, 5, 9, 0)
+    pending = [
+        {"work_order_id": i, "status": "Pending Follow-Up", "technician": "Sam", "created_at": created,
+         "email": f"customer{i}@example.com", "first_name": f"C{i}", "last_name": "X"}
+        for i in (11, 12, 13)
+    ]
+
+    def handler(sql, params):
+        if sql.startswith("SELECT wo.id AS work_order_id"):
+            return pending
+        return []
+
+    connections = fake_db(handler)
+    server = FakeSMTPServer()
+    server.replies["customer12@example.com"] = [smtplib.SMTPResponseException(550, b"No such user")]
+
+    results = send_due_notifications(dispatcher(server, batch_size=2), now=datetime.datetime(2026, 1, 20))
+
+    assert [(r.work_order_id, r.status) for r in results] == [(11, "sent"), (12, "failed"), (13, "sent")]
+    batches = [
+        [params for sql, params in connection.committed if sql.startswith("INSERT INTO notification_deliveries")]
+        for connection in connections
+    ]
+    batches = [batch for batch in batches if batch]
+    assert [[row[:2] for row in batch] for batch in batches] == [[(11, "sent"), (12, "failed")], [(13, "sent")]]
+    assert batches[0][1][3] and "550" in batches[0][1][3]
+
+
+def test_nothing_is_sent_without_the_deliveries_migration(fake_db, schema):
+    schema({"work_orders": ["id"], "customers": ["id"]})
+    connections = fake_db()
+    server = FakeSMTPServer()
+
+    with pytest.raises(database.DatabaseError, match="migrate"):
+        send_due_notifications(dispatcher(server), now=datetime.datetime(2026, 1, 20))
+
+    assert not server.sessions and not server.delivered
+    assert not any(sql.startswith("CREATE") for c in connections for sql, _ in c.committed)
@@ -0,0 +1,34 @@
+"""Prefix search over the parts catalog."""
+
+from utils.parts_index import Part, PartsIndex
+
+
+def catalog():
+    return PartsIndex([
+        Part(1, "BAT-100", "Laptop battery", "Acme", "X1", 4),
+        Part(2, "BAT-1000", "Phone battery", "Acme", "P2", 0),
+        Part(3, "SCR-15", "Laptop screen", "Vista", "X1", 2),
+        Part(4, "ZZ-9", "Zebra cable", None, None, 1),
+    ])
+
+
+def test_prefix_matches_part_numbers_and_name_words():
+    index = catalog()
+    assert [part.id for part in index.search("bat")] == [1, 2]
+    assert [part.id for part in index.search("laptop")] == [1, 3]
+    assert [part.id for part in index.search("zebra")] == [4]  # last key in the index
+    assert index.search("zzz") == []
+
+
+def test_every_term_must_match_and_exact_part_number_ranks_first():
+    index = catalog()
+    assert [part.id for part in index.search("laptop bat")] == [1]
+    assert [part.id for part in index.search("bat-1000")] == [2]
+    assert [part.id for part in index.search("BAT-100")] == [1, 2]
+
+
+def test_stock_adjustment_and_limit():
+    index = catalog()
+    index.adjust_stock(1, -3)
+    assert index.get(1).quantity_on_hand == 1
+    assert len(index.search("bat", limit=1)) == 1
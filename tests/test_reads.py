@@ -0,0 +1,80 @@
+"""Read helpers: they must not open the read-your-writes window, and rows keep their field names."""
+
+import datetime
+
+import database
+
+
+def test_get_notifications_is_a_read(fake_db, schema, monkeypatch):
+    schema({"work_orders": ["id", "customer_id", "status", "technician", "created_at"]})
+    writes = []
+    monkeypatch.setattr(database, "_note_write", lambda: writes.append(1))
+    fake_db(lambda sql, params: [(7, 3, "Overdue", "Sam")])
+
+    rows = database.get_notifications(datetime.datetime(2026, 1, 5), [5, 6, 0])
+
+    assert rows == [(7, 3, "Overdue", "Sam")]
+    assert type(rows[0]) is tuple
+    assert writes == []
+
+
+def test_writes_still_open_the_window(fake_db, monkeypatch):
+    writes = []
+    monkeypatch.setattr(database, "_note_write", lambda: writes.append(1))
+    fake_db()
+
+    database.execute_query("UPDATE work_orders SET status = %s", ("Closed",), commit=True)
+
+    assert writes == [1]
+
+
+WORK_ORDER_COLUMNS = ["id", "customer_id", "status", "technician", "created_at"]
+
+
+def test_customer_work_orders_keep_named_fields(fake_db, schema):
+    schema({"work_orders": WORK_ORDER_COLUMNS, "work_orders_archive": WORK_ORDER_COLUMNS})
+    seen = []
+
+    def handler(sql, params):
+        seen.append(sql)
+        return [{"id": 2, "customer_id": 3, "status": "Open", "technician": "Sam",
+                 "sort_key": datetime.datetime(2026, 2, 1)}]
+
+    fake_db(handler)
+    rows = database.get_customer_work_orders(3)
+
+    assert seen[0].endswith("ORDER BY sort_key DESC")
+    assert rows == [(2, 3, "Open", "Sam")]
+    assert rows[0]["technician"] == "Sam"
+    assert rows[0]._fields == ("id", "customer_id", "status", "technician")
+
+
+def test_customer_work_orders_sort_by_projected_created_at(fake_db, schema):
+    schema({"work_orders": WORK_ORDER_COLUMNS})
+    seen = []
+
+    def handler(sql, params):
+        seen.append(sql)
+        return [{"id": 2, "created_at": datetime.datetime(2026, 2, 1)}]
+
+    fake_db(handler)
+    rows = database.get_customer_work_orders(3, fields=("id", "created_at"))
+
+    assert "sort_key" not in seen[0] and seen[0].endswith("ORDER BY created_at DESC")
+    assert rows[0]["created_at"] == datetime.datetime(2026, 2, 1)
+
+
+def test_search_table_binds_one_param_per_searched_column(fake_db, schema):
+    schema({"customers": ["id", "first_name", "last_name", "email", "phone"]})
+    seen = []
+
+    def handler(sql, params):
+        seen.append((sql, params))
+        return []
+
+    fake_db(handler)
+    database.search_table("customers", "ann", "list")
+
+    sql, params = seen[0]
+    assert sql.count("LIKE %s") == len(params) == 5
+    assert set(params) == {"%ann%"}
@@ -0,0 +1,149 @@
+"""The shared-cache service, run for real on localhost, and write invalidation."""
+
+import asyncio
+import datetime
+import threading
+from decimal import Decimal
+
+import pytest
+
+import database
+from service import CacheService, SharedCache
+from utils.service_client import ServiceClient, ServiceCallError
+
+
+@pytest.fixture
+def running_service():
+    """Start a CacheService for the given operations on 127.0.0.1; yields (service, client)."""
+    started = {}
+
+    def start(operations):
+        service = CacheService(operations, workers=2, ttl=60.0)
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        async def open_server():
+            server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+            started["port"] = server.sockets[0].getsockname()[1]
+            ready.set()
+            return server
+
+        def run():
+            asyncio.set_event_loop(loop)
+            started["server"] = loop.run_until_complete(open_server())
+            loop.run_forever()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        assert ready.wait(5)
+        client = ServiceClient(f"http://127.0.0.1:{started['port']}", retry_interval=0)
+        started.update(service=service, client=client, loop=loop, thread=thread)
+        return service, client
+
+    async def shutdown():
+        started["server"].close()
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    yield start
+    if "loop" in started:
+        loop = started["loop"]
+        connection = getattr(started["client"]._local, "connection", None)
+        if connection is not None:
+            connection.close()
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        started["thread"].join(5)
+        loop.close()
+        started["service"].executor.shutdown(wait=True)
+
+
+def test_results_are_cached_until_their_table_is_written(running_service):
+    calls = []
+
+    def customer_balance(customer_id):
+        calls.append(customer_id)
+        return {"id": customer_id, "balance": Decimal("12.50"), "seen": datetime.date(2026, 3, 1)}
+
+    service, client = running_service({"customer_balance": (customer_balance, ("customers",))})
+
+    first = client.call("customer_balance", (7,))
+    assert first == {"id": 7, "balance": Decimal("12.50"), "seen": datetime.date(2026, 3, 1)}
+    assert client.call("customer_balance", (7,)) == first
+    assert calls == [7]
+
+    client.invalidate(("work_orders",))
+    client.call("customer_balance", (7,))
+    assert calls == [7]
+
+    client.invalidate(("customers",))
+    client.call("customer_balance", (7,))
+    assert calls == [7, 7]
+    assert service.stats()["hits"] == 2
+
+
+def test_none_results_are_cached(running_service):
+    calls = []
+
+    def find_customer(barcode):
+        calls.append(barcode)
+        return None
+
+    _, client = running_service({"find_customer": (find_customer, ("customers",))})
+
+    assert client.call("find_customer", ("X1",)) is None
+    assert client.call("find_customer", ("X1",)) is None
+    assert calls == ["X1"]
+
+
+def test_remote_errors_come_back_by_kind(running_service):
+    def broken():
+        raise ValueError("bad filter")
+
+    _, client = running_service({"broken": (broken, ())})
+
+    with pytest.raises(ServiceCallError) as raised:
+        client.call("broken")
+    assert raised.value.kind == "ValueError"
+
+
+def test_shared_cache_ignores_results_raced_by_a_write():
+    cache = SharedCache()
+    generations = cache.generations(("customers",))
+    cache.invalidate(("customers",))
+    assert not cache.put("key", ("customers",), generations, "stale")
+    assert cache.get("key", "miss") == "miss"
+
+
+class RecordingClient:
+    def __init__(self):
+        self.invalidated = []
+
+    def invalidate(self, tags):
+        self.invalidated.append(tuple(tags))
+
+
+def test_csv_import_invalidates_customers_even_when_a_chunk_fails(fake_db, monkeypatch, tmp_path):
+    client = RecordingClient()
+    monkeypatch.setattr(database, "_get_service_client", lambda: client)
+    inserted = []
+
+    def handler(sql, params):
+        if sql.startswith("INSERT") and params[0] == "Bad":
+            raise database.mariadb.IntegrityError("duplicate", 1062)
+        inserted.append(params)
+
+    fake_db(handler)
+    header = ("First Name,Last Name,Street,City,State,Zip Code,Customer Type,"
+              "Student ID,Method of Contact,Phone,Email\n")
+    path = tmp_path / "customers.csv"
+    path.write_text(header + "Ann,Lee,1 Main,Town,ST,11111,Staff,,Email,555,a@x\n"
+                    + "Bad,Row,1 Main,Town,ST,11111,Staff,,Email,555,b@x\n")
+
+    with pytest.raises(database.DatabaseError):
+        database.CustomerManager.import_customers_from_csv(str(path), chunk_size=1)
+
+    assert inserted and client.invalidated == [("customers",)]
@@ -0,0 +1,105 @@
+"""Prepared statement cache and its interaction with pooled connection resets."""
+
+import pytest
+
+import database
+from config import get_settings
+from conftest import FakeConnection
+from utils.statements import StatementCache
+
+
+class Cursor:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class Connection:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_statements_are_reused_per_connection_and_evicted_lru():
+    cache = StatementCache(2, lambda connection: Cursor())
+    connection = Connection()
+    first = cache.cursor(connection, "SELECT 1")
+    assert cache.cursor(connection, "SELECT 1") is first
+    assert cache.cursor(Connection(), "SELECT 1") is not first
+    cache.cursor(connection, "SELECT 2")
+    cache.cursor(connection, "SELECT 3")
+    assert first.closed
+    assert cache.stats()["evictions"] == 1
+
+
+class PooledConnection(FakeConnection):
+    def __init__(self):
+        super().__init__(lambda sql, params: [(1,)])
+        self.prepared_cursors = 0
+
+    def cursor(self, **kwargs):
+        if kwargs.get("prepared"):
+            self.prepared_cursors += 1
+        return super().cursor(**kwargs)
+
+
+class FakePool:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.connection = PooledConnection()
+
+    def get_connection(self):
+        return self.connection
+
+
+@pytest.fixture
+def pooled(monkeypatch, fake_driver):
+    pools = []
+
+    def make_pool(**kwargs):
+        pools.append(FakePool(**kwargs))
+        return pools[-1]
+
+    fake_driver.ConnectionPool = make_pool
+    monkeypatch.setattr(database, "_pools", {})
+    monkeypatch.setattr(database, "_statement_cache", None)
+    monkeypatch.setattr(database, "get_replicas", lambda: None)
+    monkeypatch.setattr(database, "_get_service_client", lambda: None)
+
+    def configure(reset):
+        settings = get_settings()._replace(db_pool_size=2, db_pool_reset=reset, db_statement_cache=8)
+        monkeypatch.setattr(database, "get_settings", lambda: settings)
+        return pools
+    return configure
+
+
+def test_second_identical_fetch_reuses_the_prepared_statement(pooled):
+    pools = pooled(reset=False)
+    query = "SELECT id FROM customers WHERE barcode=%s"
+
+    database.fetch_one(query, ("A1",), prepared=True)
+    database.fetch_one(query, ("A1",), prepared=True)
+
+    connection = pools[0].connection
+    assert pools[0].kwargs["pool_reset_connection"] is False
+    assert connection.prepared_cursors == 1
+    assert database.get_db_stats()["statements"]["hits"] == 1
+    assert connection.rollbacks == 2  # each checkout drops any transaction left open
+
+
+def test_reset_pools_run_prepared_lookups_as_plain_queries(pooled):
+    pools = pooled(reset=True)
+    query = "SELECT id FROM customers WHERE barcode=%s"
+
+    assert database.fetch_one(query, ("A1",), prepared=True) == (1,)
+    database.fetch_one(query, ("A1",), prepared=True)
+
+    connection = pools[0].connection
+    assert pools[0].kwargs["pool_reset_connection"] is True
+    assert connection.prepared_cursors == 0
+    assert database.get_db_stats()["statements"]["misses"] == 0
+    assert connection.rollbacks == 0
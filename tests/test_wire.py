@@ -0,0 +1,54 @@
+"""Results keep their Python shape across the service wire."""
+
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from utils import wire
+from utils.rows import record_rows
+
+
+def test_records_round_trip_with_field_access():
+    rows = record_rows(("id", "total", "created_at"), [
+        (1, Decimal("19.99"), datetime.datetime(2026, 3, 1, 9, 30)),
+        (2, None, datetime.datetime(2026, 3, 2, 17, 5, 1, 250)),
+    ])
+
+    decoded = wire.loads(wire.dumps(rows))
+
+    assert decoded == rows
+    assert decoded[0]["total"] == Decimal("19.99")
+    assert decoded[1]._fields == ("id", "total", "created_at")
+    assert wire.loads(wire.dumps(rows[0]))["created_at"] == datetime.datetime(2026, 3, 1, 9, 30)
+
+
+def test_scalars_and_containers_round_trip():
+    value = {
+        "day": datetime.date(2026, 2, 28),
+        "turnaround": datetime.timedelta(days=2, seconds=5),
+        "pair": (1, "a"),
+        ("status", "Open"): [3, 2.5, True, None],
+        7: "int key",
+    }
+
+    decoded = wire.loads(wire.dumps(value))
+
+    assert decoded == value
+    assert type(decoded["pair"]) is tuple
+
+
+def test_mixed_record_shapes_round_trip_separately():
+    rows = record_rows(("id",), [(1,)]) + record_rows(("id", "name"), [(2, "b")])
+
+    decoded = wire.loads(wire.dumps(rows))
+
+    assert decoded == rows
+    assert [row._fields for row in decoded] == [("id",), ("id", "name")]
+
+
+def test_unknown_types_are_rejected():
+    with pytest.raises(TypeError):
+        wire.dumps({1, 2})
+    with pytest.raises(ValueError):
+        wire.decode({"$nope": 1})
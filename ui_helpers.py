@@ -1 +1,123 @@
-# UI helper tab
\ No newline at end of file
+"""
+ui_helpers.py
+
+Helpers shared by the Tk front end.
+
+Classes:
+    MainThreadQueue - Runs callables posted from worker threads on the Tk main loop.
+    LazyNotebook - Builds notebook pages the first time they are selected.
+    StartupTimer - Times startup steps and logs them as one report.
+"""
+
+import logging
+import queue
+import time
+from contextlib import contextmanager
+
+
+class MainThreadQueue:
+    """
+    Tk widgets may only be touched from the main thread. Background workers
+    post callables here; the queue drains them from ``root.after``.
+    """
+
+    def __init__(self, root, interval_ms=100):
+        self.root = root
+        self.interval_ms = interval_ms
+        self._queue = queue.SimpleQueue()
+        self.root.after(self.interval_ms, self._pump)
+
+    def post(self, func, *args):
+        """Schedule ``func(*args)`` on the main thread (safe from any thread)."""
+        self._queue.put((func, args))
+
+    def wrap(self, func):
+        """Return a thread-safe callable that forwards its arguments to ``func``."""
+        return lambda *args: self.post(func, *args)
+
+    def _pump(self):
+        while True:
+            try:
+                func, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception as e:  # pylint: disable=broad-except
+                logging.error("UI callback failed: %s", e)
+        if self.root.winfo_exists():
+            self.root.after(self.interval_ms, self._pump)
+
+
+class LazyNotebook:
+    """
+    Defer building notebook pages until they are first shown.
+
+    ``add(frame, text, builder)`` registers a page; ``builder()`` fills
+    ``frame`` when the page is first selected (or ``ensure`` is called) and
+    its return value is what ``ensure`` hands back from then on.
+    """
+
+    def __init__(self, notebook, timer=None):
+        self.notebook = notebook
+        self.timer = timer
+        self._pages = {}  # frame path -> (text, builder)
+        self._built = {}  # frame path -> builder result
+        notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed, add="+")
+
+    def add(self, frame, text, builder):
+        self.notebook.add(frame, text=text)
+        self._pages[str(frame)] = (text, builder)
+
+    def is_built(self, frame):
+        return str(frame) in self._built
+
+    def ensure(self, frame):
+        """Build ``frame``'s page now if it has not been built yet."""
+        key = str(frame)
+        if key not in self._built:
+            text, builder = self._pages[key]
+            started = time.perf_counter()
+            self._built[key] = builder()
+            elapsed = time.perf_counter() - started
+            if self.timer is not None:
+                self.timer.record(f"tab: {text}", elapsed)
+            logging.info("Built tab %r in %.0f ms.", text, elapsed * 1000)
+        return self._built[key]
+
+    def ensure_current(self):
+        """Build whichever page is selected right now."""
+        current = self.notebook.select()
+        if current and current in self._pages:
+            self.ensure(current)
+
+    def _on_tab_changed(self, _event=None):
+        self.ensure_current()
+
+
+class StartupTimer:
+    """Time named startup steps and log them, with the total, as one report."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps = []
+
+    def record(self, name, seconds):
+        self.steps.append((name, seconds))
+
+    @contextmanager
+    def step(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def report(self, label="Startup"):
+        """Log how long each step took and the time since the timer started."""
+        total = time.perf_counter() - self.started
+        lines = [f"{label}: {total * 1000:.0f} ms until usable"]
+        lines.extend(f"  {name:<28} {seconds * 1000:8.1f} ms" for name, seconds in self.steps)
+        text = "\n".join(lines)
+        logging.info(text)
+        return text
@@ -0,0 +1,65 @@
+"""
+utils/aggregates.py
+
+Work order aggregates.
+
+Opening a work order needs more than the order row: its customer, the
+customer's other orders, the customer's notes, the attachment list and the reserved parts. The
+aggregate bundles them so they are loaded together and cached as one unit.
+
+Classes:
+    WorkOrderAggregate - One work order and its related rows.
+    AggregateCache - Small LRU of recently opened aggregates with a time-to-live.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+WorkOrderAggregate = namedtuple(
+    "WorkOrderAggregate",
+    ["work_order", "customer", "customer_orders", "notes", "attachments", "parts"],
+)
+
+
+class AggregateCache:
+    """
+    LRU cache of aggregates keyed by ``(work_order_id, columns)``.
+
+    Entries expire after ``ttl`` seconds; ``discard(work_order_id)`` drops
+    every entry for an order when it (or its customer's data) changes.
+    """
+
+    def __init__(self, max_entries=32, ttl=60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (stored_at, aggregate)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, aggregate = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return aggregate
+
+    def put(self, key, aggregate):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), aggregate)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, work_order_id):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == work_order_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,219 @@
+"""
+utils/analytics_export.py
+
+Columnar (Parquet) export of shop history for analysts.
+
+Rows arrive in chunks from a streaming cursor, are turned into Arrow record
+batches and written to Hive-style partitioned Parquet files:
+
+    <root>/<table>/month=2024-11/status=Closed/part-<run>.parquet
+
+so tools such as DuckDB, pandas or Spark can read years of history without
+touching the production database. Each run writes new files only; an
+incremental run exports rows after the table's (time, id) high-water mark,
+recorded in ``<root>/_export_state.json`` once the run's files are closed.
+
+Partition values are taken at export time: a work order exported while
+Open stays under status=Open until a full (non-incremental) export, which
+rebuilds the table's directory and swaps it in when complete.
+
+pyarrow is optional for the application and imported on first use.
+
+Classes:
+    ParquetExporter - Writes streamed rows as partitioned Parquet.
+"""
+
+import datetime
+import json
+import os
+import shutil
+import time
+import uuid
+from urllib.parse import quote
+
+STATE_FILE = "_export_state.json"
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+_arrow = None
+
+
+def _pyarrow():
+    """(pyarrow, pyarrow.parquet); raises ImportError with an install hint."""
+    global _arrow
+    if _arrow is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Parquet export needs pyarrow (pip install pyarrow).") from e
+        _arrow = (pyarrow, pyarrow.parquet)
+    return _arrow
+
+
+def _arrow_type(pa, python_type):
+    return {
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        bool: pa.bool_(),
+        datetime.datetime: pa.timestamp("us"),
+        datetime.date: pa.date32(),
+    }.get(python_type)
+
+
+class ParquetExporter:
+    """
+    Partitioned Parquet writer with a per-table high-water mark.
+
+    Args:
+        root (str): Output directory.
+        row_group_rows (int): Rows buffered per partition before a row group
+            is written; bounds memory to roughly open partitions x this.
+    """
+
+    def __init__(self, root, row_group_rows=50000):
+        self.root = os.path.abspath(root)
+        self.row_group_rows = row_group_rows
+        self.state_path = os.path.join(self.root, STATE_FILE)
+
+    # --- High-water marks --------------------------------------------------
+    def _load_state(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as state_file:
+                return json.load(state_file)
+        except FileNotFoundError:
+            return {}
+
+    def high_water_mark(self, table):
+        """(time, id) of the last exported row of ``table``, or None."""
+        mark = self._load_state().get(table)
+        if mark is None:
+            return None
+        return datetime.datetime.fromisoformat(mark["time"]), mark["id"]
+
+    def _save_mark(self, table, mark):
+        state = self._load_state()
+        state[table] = {"time": mark[0].isoformat(), "id": mark[1]}
+        os.makedirs(self.root, exist_ok=True)
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as state_file:
+            json.dump(state, state_file, indent=2, sort_keys=True)
+        os.replace(temp_path, self.state_path)
+
+    # --- Export ------------------------------------------------------------
+    def export(self, table, fields, chunks, time_column, partition_by=(), types=None,
+               incremental=True, progress=None):
+        """
+        Write ``chunks`` (lists of row tuples in ``fields`` order, sorted by
+        ``time_column`` then id) for ``table``.
+
+        Args:
+            partition_by: Columns partitioned on after the month, e.g. ("status",).
+                They become directory names and are left out of the files.
+            types (dict): column -> Python type, for a stable Arrow schema;
+                untyped columns are inferred.
+            incremental (bool): Append new files under the existing table
+                directory. False rebuilds the directory from scratch.
+            progress (callable): Called with the running row count per chunk.
+
+        Returns:
+            int: Rows written.
+        """
+        pa, pq = _pyarrow()
+        fields = list(fields)
+        time_index = fields.index(time_column)
+        id_index = fields.index("id")
+        partition_indexes = [fields.index(column) for column in partition_by]
+        data_indexes = [i for i in range(len(fields)) if i not in partition_indexes]
+        types = types or {}
+        # Arrow type per data column; untyped ones are fixed by their first
+        # non-null values so every file of the run shares one schema.
+        arrow_types = [_arrow_type(pa, types.get(fields[i])) for i in data_indexes]
+        names = [fields[i] for i in data_indexes]
+
+        table_dir = os.path.join(self.root, table)
+        run_id = time.strftime("%Y%m%dT%H%M%S", time.gmtime()) + f"-{uuid.uuid4().hex[:8]}"
+        target_dir = table_dir if incremental else f"{table_dir}.rebuild-{run_id}"
+
+        writers = {}   # partition dir -> ParquetWriter
+        buffers = {}   # partition dir -> [row tuples]
+        current_month = None
+        written = 0
+        mark = None
+
+        def flush(key):
+            rows = buffers.pop(key, None)
+            if not rows:
+                return
+            arrays = []
+            for position, values in enumerate(zip(*rows)):
+                arrow_type = arrow_types[position]
+                if arrow_type is None:
+                    array = pa.array(values)
+                    if pa.types.is_null(array.type):
+                        array = array.cast(pa.string())
+                    arrow_types[position] = array.type
+                else:
+                    array = pa.array(values, type=arrow_type)
+                arrays.append(array)
+            batch = pa.RecordBatch.from_arrays(arrays, names=names)
+            writer = writers.get(key)
+            if writer is None:
+                os.makedirs(key, exist_ok=True)
+                writer = pq.ParquetWriter(
+                    os.path.join(key, f"part-{run_id}.parquet"), batch.schema, compression="zstd"
+                )
+                writers[key] = writer
+            writer.write_batch(batch)
+
+        def close(keys):
+            for key in keys:
+                flush(key)
+                writer = writers.pop(key, None)
+                if writer is not None:
+                    writer.close()
+
+        try:
+            for rows in chunks:
+                for row in rows:
+                    stamp = row[time_index]
+                    month = stamp.strftime("%Y-%m") if stamp is not None else NULL_PARTITION
+                    if month != current_month:
+                        # Input is time-ordered: earlier months are complete
+                        close([key for key in list(writers) + list(buffers)
+                               if f"{os.sep}month={current_month}" in key])
+                        current_month = month
+                    parts = [f"month={month}"] + [
+                        f"{column}={NULL_PARTITION if row[i] is None else quote(str(row[i]), safe='')}"
+                        for column, i in zip(partition_by, partition_indexes)
+                    ]
+                    key = os.path.join(target_dir, *parts)
+                    buffer = buffers.setdefault(key, [])
+                    buffer.append(tuple(row[i] for i in data_indexes))
+                    if len(buffer) >= self.row_group_rows:
+                        flush(key)
+                if rows:
+                    written += len(rows)
+                    last = rows[-1]
+                    mark = (last[time_index], last[id_index])
+                    if progress:
+                        progress(written)
+            close(list(set(writers) | set(buffers)))
+        except BaseException:
+            for writer in writers.values():
+                writer.close()
+            if not incremental:
+                shutil.rmtree(target_dir, ignore_errors=True)
+            raise
+
+        if not incremental:
+            # Swap the rebuilt directory in only once it is complete
+            old_dir = f"{table_dir}.old-{run_id}"
+            if os.path.exists(table_dir):
+                os.replace(table_dir, old_dir)
+            if os.path.exists(target_dir):
+                os.replace(target_dir, table_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+        if mark is not None and mark[0] is not None:
+            self._save_mark(table, mark)
+        return written
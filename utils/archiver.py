@@ -0,0 +1,47 @@
+"""
+utils/archiver.py
+
+Throttled background archiving of closed work orders.
+
+Classes:
+    ArchiveJob - Moves closed work orders to the archive in paced batches.
+"""
+
+import logging
+
+from utils.background import PeriodicJob
+
+
+class ArchiveJob(PeriodicJob):
+    """
+    Every ``interval`` seconds, move closed work orders older than
+    ``older_than_days`` to the archive, ``batch_size`` rows per transaction
+    with ``pause`` seconds between batches so the hot table's writers are
+    never blocked for long.
+
+    Args:
+        archive_batch (callable): (older_than_days, batch_size) -> rows moved,
+            e.g. database.archive_closed_work_orders.
+    """
+
+    def __init__(self, archive_batch, older_than_days, batch_size=500, pause=2.0,
+                 interval=86400, run_immediately=False):
+        super().__init__("work-order-archiver", self.run_once, interval, run_immediately)
+        self.archive_batch = archive_batch
+        self.older_than_days = older_than_days
+        self.batch_size = batch_size
+        self.batch_pause = pause
+
+    def run_once(self, progress=None):
+        """Archive until nothing old enough is left; returns the number moved."""
+        total = 0
+        while not self.stopping:
+            moved = self.archive_batch(self.older_than_days, self.batch_size)
+            total += moved
+            if progress:
+                progress(total)
+            if moved < self.batch_size or self.pause(self.batch_pause):
+                break
+        if total:
+            logging.info("Archive run moved %d work orders.", total)
+        return total
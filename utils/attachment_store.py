@@ -0,0 +1,122 @@
+"""
+utils/attachment_store.py
+
+Content-addressed attachment store.
+
+Uploaded files are copied into ``<root>/<aa>/<bb>/<sha256>`` so attachments
+survive the original being moved and can be shared by every terminal that
+mounts the store. Identical uploads (the same invoice attached to many
+orders) are stored once.
+
+Ingest never loads a whole file into memory. When the filesystem supports
+reflinks (copy-on-write clones, e.g. Btrfs or XFS) the file is cloned and
+the clone is hashed; otherwise it is streamed in chunks, hashing and writing
+in the same pass. Either way the hash describes exactly the bytes stored.
+Hardlinks are not used: a link shares the user's original inode, so editing
+the original in place would silently change the stored attachment.
+
+Classes:
+    StoredFile - Result of one ingest.
+    AttachmentStore - Stores and locates files by SHA-256.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl request number for FICLONE (Linux): clone the source file's extents
+FICLONE = 0x40049409
+
+# path: where the content lives in the store; deduplicated: it was already there
+StoredFile = namedtuple("StoredFile", ["sha256", "size", "path", "deduplicated"])
+
+
+class AttachmentStore:
+    """Files stored once per SHA-256 under ``root``."""
+
+    def __init__(self, root, chunk_size=1024 * 1024):
+        self.root = os.path.abspath(root)
+        self.chunk_size = chunk_size
+        self._tmp = os.path.join(self.root, "tmp")
+        self._reflink = fcntl is not None  # turned off after the first unsupported attempt
+
+    def path_for(self, sha256):
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def exists(self, sha256):
+        return os.path.exists(self.path_for(sha256))
+
+    def ingest(self, source_path):
+        """Copy ``source_path`` into the store; returns a StoredFile."""
+        os.makedirs(self._tmp, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self._tmp, prefix="ingest-")
+        try:
+            with os.fdopen(fd, "wb") as temp, open(source_path, "rb") as source:
+                if self._clone(source, temp):
+                    digest, size = self._hash_file(temp_path)
+                else:
+                    digest, size = self._copy_and_hash(source, temp)
+                temp.flush()
+                os.fsync(temp.fileno())
+
+            final_path = self.path_for(digest)
+            if os.path.exists(final_path):
+                os.unlink(temp_path)
+                return StoredFile(digest, size, final_path, True)
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.chmod(temp_path, 0o444)  # stored content never changes
+            os.replace(temp_path, final_path)
+            return StoredFile(digest, size, final_path, False)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def _clone(self, source, target):
+        """Reflink ``source`` into ``target``; False if the filesystem can't."""
+        if not self._reflink:
+            return False
+        try:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+            return True
+        except OSError as e:
+            # EXDEV (other filesystem), EOPNOTSUPP/EINVAL (no reflink support)
+            logging.info("Reflink unavailable (%s); streaming attachments instead.", e)
+            self._reflink = False
+            return False
+
+    def _copy_and_hash(self, source, target):
+        digest = hashlib.sha256()
+        size = 0
+        while True:
+            chunk = source.read(self.chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            target.write(chunk)
+            size += len(chunk)
+        return digest.hexdigest(), size
+
+    def _hash_file(self, path):
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as stored:
+            while True:
+                chunk = stored.read(self.chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                size += len(chunk)
+        return digest.hexdigest(), size
+
+    def export(self, sha256, destination):
+        """Copy stored content out to ``destination`` (e.g. "Save As")."""
+        shutil.copyfile(self.path_for(sha256), destination)
@@ -0,0 +1,54 @@
+"""
+utils/background.py
+
+Small helpers for background maintenance work.
+
+Classes:
+    PeriodicJob - Runs a function on a daemon thread at a fixed interval.
+"""
+
+import logging
+import threading
+
+
+class PeriodicJob:
+    """Run ``func()`` every ``interval`` seconds on a daemon thread."""
+
+    def __init__(self, name, func, interval, run_immediately=False):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.run_immediately = run_immediately
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    @property
+    def stopping(self):
+        """True once stop() was called; long-running jobs can check it between steps."""
+        return self._stop.is_set()
+
+    def pause(self, seconds):
+        """Sleep between steps of a long job; returns True if the job was stopped."""
+        return self._stop.wait(seconds)
+
+    def _run(self):
+        if not self.run_immediately and self._stop.wait(self.interval):
+            return
+        while not self._stop.is_set():
+            try:
+                self.func()
+            except Exception as e:  # pylint: disable=broad-except
+                logging.error("Background job %s failed: %s", self.name, e)
+            self._stop.wait(self.interval)
@@ -0,0 +1,143 @@
+"""
+utils/columns.py
+
+Typed column lists per table and named projections.
+
+Callers declare the fields they need, either as a projection name
+("list" for grid views, "detail" for single-record views) or as an explicit
+sequence of column names, and the data layer selects only those columns
+instead of SELECT *.
+
+Functions:
+    - resolve_fields(table, fields): Validate a projection into a column tuple.
+    - column_type(table, column): Python type of a known column.
+"""
+
+import datetime
+import re
+
+# Known columns per table, in the order SELECT lists use them, with the
+# Python type each one comes back as.
+TABLE_COLUMNS = {
+    "customers": {
+        "id": int,
+        "first_name": str,
+        "last_name": str,
+        "street": str,
+        "city": str,
+        "state": str,
+        "zip_code": str,
+        "customer_type": str,
+        "student_id": str,
+        "method_of_contact": str,
+        "phone": str,
+        "email": str,
+        "barcode": str,
+        "created_at": datetime.datetime,
+    },
+    "work_orders": {
+        "id": int,
+        "customer_id": int,
+        "status": str,
+        "priority": str,
+        "technician": str,
+        "notes": str,
+        "scan_code": str,
+        "created_at": datetime.datetime,
+    },
+    "users": {
+        "id": int,
+        "username": str,
+        "role": str,
+    },
+    "customer_notes": {
+        "customer_id": int,
+        "note": str,
+        "created_at": datetime.datetime,
+    },
+    "file_attachments": {
+        "work_order_id": int,
+        "file_name": str,
+        "file_path": str,
+        "file_type": str,
+        "sha256": str,
+        "size": int,
+    },
+    "audit_log": {
+        "id": int,
+        "user_id": int,
+        "action": str,
+        "table_name": str,
+        "record_id": int,
+        "details": str,
+        "timestamp": datetime.datetime,
+    },
+}
+
+# Named projections: slim rows for grids, wide rows for detail views.
+PROJECTIONS = {
+    "customers": {
+        "list": ("id", "first_name", "last_name", "email", "phone"),
+        "detail": (
+            "id", "first_name", "last_name", "street", "city", "state", "zip_code",
+            "customer_type", "student_id", "method_of_contact", "phone", "email",
+        ),
+    },
+    "work_orders": {
+        "list": ("id", "customer_id", "status", "technician"),
+        "detail": ("id", "customer_id", "status", "priority", "technician", "notes", "created_at"),
+    },
+    "users": {
+        "list": ("id", "username", "role"),
+        "detail": ("id", "username", "role"),
+    },
+}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def resolve_fields(table, fields=None, available=()):
+    """
+    Turn a projection into a validated tuple of column names.
+
+    Args:
+        table (str): Table name.
+        fields: A projection name ("list", "detail"), a sequence of column
+            names, or None for the table's "detail" projection.
+        available (tuple): Columns reported by the schema catalog, used for
+            tables without a typed column list.
+
+    Returns:
+        tuple: Column names, or an empty tuple if nothing is known about the
+        table (callers then fall back to every column).
+
+    Raises:
+        ValueError: For unknown projections, columns or unsafe identifiers.
+    """
+    if not _IDENTIFIER.match(table):
+        raise ValueError(f"Invalid table name: {table}")
+
+    if fields is None:
+        fields = "detail"
+    if isinstance(fields, str):
+        named = PROJECTIONS.get(table, {})
+        if fields in named:
+            return named[fields]
+        if fields == "detail":
+            known = tuple(TABLE_COLUMNS.get(table, ())) or tuple(available)
+            return known
+        raise ValueError(f"Unknown projection '{fields}' for table {table}")
+
+    columns = tuple(fields)
+    known = TABLE_COLUMNS.get(table)
+    for column in columns:
+        if not _IDENTIFIER.match(column):
+            raise ValueError(f"Invalid column name: {column}")
+        if known is not None and column not in known and column not in available:
+            raise ValueError(f"Unknown column '{column}' for table {table}")
+    return columns
+
+
+def column_type(table, column):
+    """Python type a column is returned as, or None if it isn't typed."""
+    return TABLE_COLUMNS.get(table, {}).get(column)
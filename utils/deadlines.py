@@ -0,0 +1,197 @@
+"""
+utils/deadlines.py
+
+Event-driven follow-up deadlines for open work orders.
+
+Each open order's due time is computed once (creation time plus the
+follow-up delay, moved to the next business-hours opening) and kept in a
+heap. A single timer thread sleeps until the earliest deadline and fires a
+follow-up event exactly then, so the Manager Workbench never polls the
+work_orders table. Change-feed events keep the heap current.
+
+Classes:
+    BusinessCalendar - Shop opening hours and days.
+    FollowUp - A due (or pending) follow-up for one work order.
+    DeadlineScheduler - Heap of due times plus the timer thread.
+
+Functions:
+    - mysql_dayofweek(weekday): Python weekday (Mon=0) -> MySQL DAYOFWEEK (Sun=1).
+"""
+
+import datetime
+import heapq
+import itertools
+import logging
+import threading
+from collections import namedtuple
+
+FollowUp = namedtuple("FollowUp", ["due_at", "work_order"])
+
+CLOSED_STATUS = "Closed"
+
+# How long after creation an open work order needs a customer follow-up
+FOLLOW_UP_DELAY = datetime.timedelta(hours=24)
+
+
+def mysql_dayofweek(weekday):
+    """Convert a Python weekday (Mon=0..Sun=6) to MySQL DAYOFWEEK (Sun=1..Sat=7)."""
+    return (weekday + 1) % 7 + 1
+
+
+class BusinessCalendar:
+    """Opening hours (local time) on business days (Python weekdays, Mon=0)."""
+
+    def __init__(self, open_hour=9, close_hour=17, business_days=(0, 1, 2, 3)):
+        self.open_hour = open_hour
+        self.close_hour = close_hour
+        self.business_days = frozenset(business_days)
+
+    @property
+    def closed_days(self):
+        """Python weekdays the shop is closed."""
+        return tuple(day for day in range(7) if day not in self.business_days)
+
+    def is_open(self, moment):
+        return (moment.weekday() in self.business_days
+                and self.open_hour <= moment.hour < self.close_hour)
+
+    def next_open(self, moment):
+        """``moment`` if the shop is open then, otherwise the next opening time."""
+        if self.is_open(moment):
+            return moment
+        day = moment.date()
+        if moment.hour >= self.close_hour or moment.weekday() not in self.business_days:
+            day += datetime.timedelta(days=1)
+        for _ in range(7):
+            if day.weekday() in self.business_days:
+                return datetime.datetime.combine(day, datetime.time(self.open_hour))
+            day += datetime.timedelta(days=1)
+        return moment  # no business days configured
+
+
+class DeadlineScheduler:
+    """
+    Fire follow-up events for open work orders when they come due.
+
+    Args:
+        fetch_open (callable): () -> rows of open work orders, each with "id",
+            "status" and "created_at"; read once when the scheduler starts.
+        calendar (BusinessCalendar): When follow-ups may come due.
+        delay (timedelta): Time after creation before a follow-up is due.
+    """
+
+    def __init__(self, fetch_open, calendar=None, delay=FOLLOW_UP_DELAY):
+        self.fetch_open = fetch_open
+        self.calendar = calendar or BusinessCalendar()
+        self.delay = delay
+
+        self._heap = []
+        self._entries = {}  # work order id -> scheduled FollowUp
+        self._fired = {}    # work order id -> FollowUp that has come due
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._subscribers = []
+        self._stop = False
+        self._thread = None
+
+    def due_time(self, created_at):
+        return self.calendar.next_open(created_at + self.delay)
+
+    def subscribe(self, callback):
+        """Call ``callback(follow_ups)`` with each list of newly due follow-ups."""
+        self._subscribers.append(callback)
+
+    def due_items(self):
+        """Follow-ups that have come due for orders still open, oldest first."""
+        with self._cond:
+            return sorted(self._fired.values(), key=lambda f: (f.due_at, f.work_order["id"]))
+
+    def track(self, work_order):
+        """(Re)schedule one work order; closed orders are dropped."""
+        with self._cond:
+            self._track(work_order)
+            self._cond.notify()
+
+    def _track(self, work_order):
+        order_id = work_order["id"]
+        if work_order["status"] == CLOSED_STATUS or not work_order["created_at"]:
+            self._entries.pop(order_id, None)
+            self._fired.pop(order_id, None)
+            return
+        if order_id in self._fired:
+            # Already due: keep it on the workbench with the latest details.
+            self._fired[order_id] = FollowUp(self._fired[order_id].due_at, work_order)
+            return
+        follow_up = FollowUp(self.due_time(work_order["created_at"]), work_order)
+        self._entries[order_id] = follow_up
+        heapq.heappush(self._heap, (follow_up.due_at, next(self._seq), order_id, follow_up))
+
+    def apply_changes(self, events):
+        """Change-feed subscriber: reschedule or drop the orders that changed."""
+        with self._cond:
+            for event in events:
+                self._track(event.work_order)
+            self._cond.notify()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="follow-up-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _load(self):
+        rows = self.fetch_open()
+        with self._cond:
+            for row in rows:
+                # Change-feed events that arrived first carry newer data.
+                if row["id"] not in self._entries and row["id"] not in self._fired:
+                    self._track(row)
+            self._cond.notify()
+        logging.info("Follow-up scheduler tracking %d open work orders.", len(self._entries))
+
+    def _pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, order_id, follow_up = heapq.heappop(self._heap)
+            if self._entries.get(order_id) is follow_up:  # skip superseded entries
+                del self._entries[order_id]
+                self._fired[order_id] = follow_up
+                due.append(follow_up)
+        return due
+
+    def _run(self):
+        retry = 5.0
+        while True:
+            try:
+                self._load()
+                break
+            except Exception as e:  # pylint: disable=broad-except
+                logging.warning("Follow-up scheduler could not load open orders: %s", e)
+                with self._cond:
+                    if self._cond.wait_for(lambda: self._stop, timeout=retry):
+                        return
+                retry = min(retry * 2, 300.0)
+
+        while True:
+            with self._cond:
+                if self._stop:
+                    return
+                now = datetime.datetime.now()
+                due = self._pop_due(now)
+                if not due:
+                    timeout = (self._heap[0][0] - now).total_seconds() if self._heap else None
+                    self._cond.wait(timeout)
+                    continue
+            for callback in list(self._subscribers):
+                try:
+                    callback(due)
+                except Exception as e:  # pylint: disable=broad-except
+                    logging.error("Follow-up subscriber failed: %s", e)
@@ -0,0 +1,47 @@
+"""
+utils/drivers.py
+
+Lazily imported database drivers.
+
+The MariaDB driver is a C extension that is slow to import. The module
+object here loads the real driver on first attribute access (the first
+connect, or the first time an ``except mariadb.Error`` clause is
+evaluated), so importing the application does not pay for it.
+
+Functions:
+    - lazy_import(name): A module that is executed on first attribute access.
+"""
+
+import importlib.util
+import sys
+
+
+class _MissingModule:
+    """Stands in for a driver that is not installed; fails on first use."""
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        raise ImportError(f"The {self._name} driver is not installed.")
+
+
+def lazy_import(name):
+    """Return ``name`` as a module that is only executed when first used."""
+    if name in sys.modules:
+        return sys.modules[name]
+    try:
+        spec = importlib.util.find_spec(name)
+    except ImportError:  # parent package missing
+        spec = None
+    if spec is None:
+        return _MissingModule(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+mariadb = lazy_import("mariadb")
@@ -0,0 +1,95 @@
+"""
+utils/import_budget.py
+
+Startup import budget check.
+
+Imports each module in a fresh interpreter under ``python -X importtime``
+and fails if its cumulative import time is over budget, or if it pulled in
+a module that is supposed to load lazily (the database drivers, dotenv,
+smtplib, pyarrow, numpy, http.client).
+
+Usage:
+    python -m utils.import_budget [--budget-ms MS] [--repeat N] [module ...]
+
+Exit status is 0 when every module is within budget, 1 otherwise.
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# module -> cumulative import budget (milliseconds)
+DEFAULT_BUDGETS = {
+    "config": 25,
+    "database": 120,
+    "cli": 150,
+    "main": 250,
+}
+
+# Must not be imported at startup; they load on first use.
+LAZY_MODULES = ("mariadb", "mysql.connector", "dotenv", "smtplib", "pyarrow", "numpy", "http.client")
+
+
+def measure(module, python=sys.executable):
+    """Import ``module`` in a new interpreter; returns {imported module: cumulative us}."""
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=PROJECT_ROOT, check=False,
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise RuntimeError(f"import {module} failed: {lines[-1] if lines else result.returncode}")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def check(budgets, repeat=3):
+    """Return a list of failure messages (empty when everything is within budget)."""
+    failures = []
+    for module, budget_ms in budgets.items():
+        # Best of several runs, to keep disk-cache noise out of the result
+        runs = [measure(module) for _ in range(repeat)]
+        best_ms = min(run[module] for run in runs) / 1000
+        eager = sorted({name for run in runs for name in run if name in LAZY_MODULES})
+        status = "ok" if best_ms <= budget_ms and not eager else "FAIL"
+        print(f"{module:<12} {best_ms:8.1f} ms (budget {budget_ms} ms) {status}")
+        if best_ms > budget_ms:
+            failures.append(f"{module}: {best_ms:.1f} ms exceeds its {budget_ms} ms budget")
+        if eager:
+            failures.append(f"{module}: imports {', '.join(eager)} at startup")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check startup import times against a budget.")
+    parser.add_argument("modules", nargs="*", help="modules to check (default: %(default)s)",
+                        default=list(DEFAULT_BUDGETS))
+    parser.add_argument("--budget-ms", type=float,
+                        help="one budget for every module instead of the defaults")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    budgets = {
+        module: args.budget_ms if args.budget_ms is not None else DEFAULT_BUDGETS.get(module, 100)
+        for module in args.modules
+    }
+    try:
+        failures = check(budgets, args.repeat)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+utils/journal.py
+
+Durable write-behind journal for UI mutations.
+
+Writes are appended to a local SQLite file and acknowledged immediately. A
+background worker replays them against the shop database in the order they
+were made, several per round trip, each tagged with an idempotency key so a
+replay after a crash or a lost commit acknowledgement is never applied twice.
+
+While the server is unreachable everything stays queued and replay backs
+off. A write the server rejects is parked as failed (dead-lettered) at once,
+so it never holds up the writes queued behind it.
+
+Classes:
+    WriteJournal - Local append-only queue plus replay worker.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class WriteJournal:
+    """
+    Append-only local queue of pending writes with an in-order replay worker.
+
+    ``apply_batch`` receives a list of ``(key, op, payload)`` tuples and must
+    apply them on the server in one unit, returning ``{key: result_id}``. It is
+    expected to skip keys the server has already applied.
+    """
+
+    def __init__(self, path, apply_batch, batch_size=50, transient_errors=(),
+                 retry_delay=1.0, max_retry_delay=60.0):
+        self.path = path
+        self.apply_batch = apply_batch
+        self.batch_size = batch_size
+        self.transient_errors = tuple(transient_errors)
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS journal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL UNIQUE,
+                op TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                applied_at REAL,
+                failed_at REAL,
+                result_id INTEGER,
+                error TEXT
+            )
+        """)
+        # Keep applied entries for a day so callers can still look up result ids.
+        self._conn.execute(
+            "DELETE FROM journal WHERE applied_at IS NOT NULL AND applied_at < ?",
+            (time.time() - 86400,),
+        )
+        self._conn.commit()
+
+    # -----------------------------------------------------------------------
+    # Producer side (UI thread)
+    # -----------------------------------------------------------------------
+    def submit(self, op, payload):
+        """Durably queue a write and return its idempotency key."""
+        key = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO journal (key, op, payload, created_at) VALUES (?, ?, ?, ?)",
+                (key, op, json.dumps(payload), time.time()),
+            )
+            self._conn.commit()
+        self._wake.set()
+        return key
+
+    def pending_count(self):
+        """Number of writes not yet acknowledged by the server."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM journal WHERE applied_at IS NULL AND failed_at IS NULL"
+            ).fetchone()
+        return row[0]
+
+    def failed_count(self):
+        """Number of writes the server rejected and that were set aside."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM journal WHERE failed_at IS NOT NULL"
+            ).fetchone()
+        return row[0]
+
+    def result_id(self, key):
+        """Server-side id produced by an applied write, or None if still pending."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result_id FROM journal WHERE key = ? AND applied_at IS NOT NULL", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    # -----------------------------------------------------------------------
+    # Replay worker
+    # -----------------------------------------------------------------------
+    def start(self):
+        """Start the background replay worker (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="write-journal", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stop the worker; queued writes stay on disk for the next start."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def flush_now(self):
+        """Wake the worker without waiting for the next retry interval."""
+        self._wake.set()
+
+    def _next_batch(self, limit):
+        with self._lock:
+            return self._conn.execute(
+                """
+                SELECT key, op, payload FROM journal
+                WHERE applied_at IS NULL AND failed_at IS NULL
+                ORDER BY seq LIMIT ?
+                """,
+                (limit,),
+            ).fetchall()
+
+    def _mark_applied(self, results):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE journal SET applied_at = ?, result_id = ?, error = NULL WHERE key = ?",
+                [(now, result_id, key) for key, result_id in results.items()],
+            )
+            self._conn.commit()
+
+    def _dead_letter(self, key, error):
+        """Park a rejected entry as failed; replay moves on to the next one."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE journal SET attempts = attempts + 1, error = ?, failed_at = ? WHERE key = ?",
+                (str(error), time.time(), key),
+            )
+            self._conn.commit()
+
+    def _run(self):
+        delay = self.retry_delay
+        batch_size = self.batch_size
+        while not self._stop.is_set():
+            rows = self._next_batch(batch_size)
+            if not rows:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+
+            entries = [(key, op, json.loads(payload)) for key, op, payload in rows]
+            try:
+                results = self.apply_batch(entries)
+            except self.transient_errors as e:
+                # Server unreachable: keep everything queued and back off.
+                logging.warning("Write journal replay deferred: %s", e)
+                self._wake.wait(delay)
+                self._wake.clear()
+                delay = min(delay * 2, self.max_retry_delay)
+            except Exception as e:  # pylint: disable=broad-except
+                if len(entries) > 1:
+                    # Isolate the offending write by replaying one at a time.
+                    batch_size = 1
+                else:
+                    logging.error("Write journal entry %s rejected, set aside: %s", entries[0][0], e)
+                    self._dead_letter(entries[0][0], e)
+            else:
+                self._mark_applied(results)
+                delay = self.retry_delay
+                batch_size = self.batch_size
@@ -0,0 +1,69 @@
+"""
+utils/migrations.py
+
+Versioned schema migrations.
+
+Schema changes to existing tables (new columns, indexes on hot tables) ship
+as numbered SQL scripts in migrations/ and are applied by an administrator
+with ``python cli.py migrate``, not by every terminal at startup: they need
+ALTER privilege and may rebuild or lock a table while the shop is working.
+The application only detects the result (see database.get_schema()).
+
+Scripts are named ``NNN_description.sql``; statements end with ``;`` at
+the end of a line, and ``--`` lines are comments. A script that changes
+work_orders makes the same change to work_orders_archive (migration 007).
+
+Classes:
+    Migration - One script: version, name and path.
+
+Functions:
+    - discover(directory): Migrations in version order.
+    - statements(migration): The SQL statements of one script.
+    - pending(directory, applied): Migrations whose version is not in ``applied``.
+"""
+
+import os
+import re
+from collections import namedtuple
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+Migration = namedtuple("Migration", ["version", "name", "path"])
+
+_FILE_NAME = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """Every NNN_name.sql script in ``directory``, lowest version first."""
+    found = []
+    for file_name in os.listdir(directory):
+        match = _FILE_NAME.match(file_name)
+        if match:
+            found.append(Migration(int(match.group(1)), match.group(2), os.path.join(directory, file_name)))
+    found.sort()
+    versions = [migration.version for migration in found]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return found
+
+
+def statements(migration):
+    """The statements of one script, without comments or trailing semicolons."""
+    with open(migration.path, encoding="utf-8") as file:
+        lines = [line for line in file if not line.lstrip().startswith("--")]
+    result, current = [], []
+    for line in lines:
+        current.append(line)
+        if line.rstrip().endswith(";"):
+            result.append("".join(current).strip().rstrip(";").strip())
+            current = []
+    tail = "".join(current).strip()
+    if tail:
+        result.append(tail)
+    return [statement for statement in result if statement]
+
+
+def pending(directory=MIGRATIONS_DIR, applied=()):
+    """Migrations not yet recorded as applied."""
+    applied = set(applied)
+    return [migration for migration in discover(directory) if migration.version not in applied]
@@ -0,0 +1,265 @@
+"""
+utils/notify_email.py
+
+Batched follow-up email dispatcher.
+
+Due notifications are rendered from templates and sent over one reused SMTP
+connection, paced by a rate limit, with reconnect-and-retry for transient
+failures. Delivery results are handed back in bulk so the database records
+them with one batched statement per batch instead of one per email.
+
+If the server can't be reached after the retries, the run stops there: the
+remaining notifications come back "deferred" and are left unrecorded, so
+the next run sends them instead of every message repeating the backoff.
+
+Settings (environment):
+    SMTP_HOST, SMTP_PORT, SMTP_SENDER, SMTP_USER, SMTP_PASSWORD,
+    SMTP_STARTTLS (true/false), SMTP_RATE (messages per second).
+
+Classes:
+    SMTPUnavailable - The SMTP server could not be reached.
+    DeliveryResult - Outcome of one notification.
+    NotificationDispatcher - Renders and sends notifications in batches.
+
+Functions:
+    - send_due_notifications(): Send every follow-up that is due now.
+"""
+
+import datetime
+import logging
+import smtplib
+import time
+from collections import namedtuple
+from email.message import EmailMessage
+from string import Template
+
+from config import get_settings
+from utils.deadlines import BusinessCalendar, FOLLOW_UP_DELAY
+
+DeliveryResult = namedtuple("DeliveryResult", ["work_order_id", "status", "sent_at", "error"])
+
+DEFAULT_SUBJECT = "Update on your repair (work order $work_order_id)"
+DEFAULT_BODY = """Hello $first_name,
+
+We're following up on work order $work_order_id, currently "$status".
+Your technician, $technician, will be in touch if anything else is needed.
+Reply to this email or call the shop with any questions.
+
+Thank you,
+The Repair Shop
+"""
+
+# Errors worth a reconnect and another attempt (plus 4xx replies); anything
+# else, such as refused recipients or 5xx replies, fails the message.
+TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class SMTPUnavailable(Exception):
+    """The SMTP server could not be reached (or refused the session) after all retries."""
+
+
+class NotificationDispatcher:
+    """
+    Send notification emails over a single reused SMTP connection.
+
+    Each notification is a mapping with at least "work_order_id" and "email";
+    every other key is available to the subject/body templates.
+    """
+
+    def __init__(self, host, port, sender, username=None, password=None, starttls=False,
+                 batch_size=500, rate_per_second=10.0, max_retries=3, retry_delay=1.0,
+                 subject_template=DEFAULT_SUBJECT, body_template=DEFAULT_BODY,
+                 smtp_factory=smtplib.SMTP):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.batch_size = batch_size
+        self.min_interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.subject_template = Template(subject_template)
+        self.body_template = Template(body_template)
+        self.smtp_factory = smtp_factory
+
+        self._smtp = None
+        self._last_send = 0.0
+
+    @classmethod
+    def from_env(cls, **overrides):
+        config = get_settings()
+        settings = {
+            "host": config.smtp_host,
+            "port": config.smtp_port,
+            "sender": config.smtp_sender,
+            "username": config.smtp_user,
+            "password": config.smtp_password,
+            "starttls": config.smtp_starttls,
+            "rate_per_second": config.smtp_rate,
+        }
+        settings.update(overrides)
+        return cls(**settings)
+
+    def render(self, notification):
+        """Build the EmailMessage for one notification."""
+        fields = {key: "" if value is None else value for key, value in dict(notification).items()}
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = notification["email"]
+        message["Subject"] = self.subject_template.safe_substitute(fields)
+        message.set_content(self.body_template.safe_substitute(fields))
+        return message
+
+    # -----------------------------------------------------------------------
+    # Connection handling
+    # -----------------------------------------------------------------------
+    def _connect(self):
+        smtp = self.smtp_factory(self.host, self.port, timeout=30)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except BaseException:
+            smtp.close()
+            raise
+        self._smtp = smtp
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+    def _throttle(self):
+        wait = self._last_send + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_send = time.monotonic()
+
+    def _send(self, message):
+        """
+        Send one message, reconnecting on transient failures.
+
+        Raises:
+            SMTPUnavailable: If no session could be opened, or the connection
+                kept dropping, through every retry.
+        """
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            if self._smtp is None:
+                try:
+                    self._connect()
+                except (smtplib.SMTPException, OSError) as e:
+                    refused = isinstance(e, smtplib.SMTPResponseException) and not 400 <= e.smtp_code < 500
+                    if last_attempt or refused:  # e.g. bad credentials: no message can go out
+                        raise SMTPUnavailable(f"{self.host}:{self.port}: {e}") from e
+                    time.sleep(delay)
+                    delay *= 2
+                    continue
+            try:
+                self._throttle()
+                self._smtp.send_message(message)
+                return
+            except smtplib.SMTPResponseException as e:
+                if not 400 <= e.smtp_code < 500 or last_attempt:
+                    raise
+            except TRANSIENT_ERRORS as e:
+                if last_attempt:
+                    raise SMTPUnavailable(f"{self.host}:{self.port}: {e}") from e
+            # Drop the connection and try again after a backoff.
+            self.close()
+            time.sleep(delay)
+            delay *= 2
+
+    # -----------------------------------------------------------------------
+    # Dispatch
+    # -----------------------------------------------------------------------
+    def dispatch(self, notifications, record=None):
+        """
+        Send ``notifications`` and return their DeliveryResults.
+
+        Args:
+            notifications (iterable): Notification mappings.
+            record (callable): Called once per batch with that batch's sent and
+                failed results (e.g. database.record_notification_deliveries).
+
+        If the server becomes unreachable, the notification being sent and
+        every later one come back "deferred" and are not passed to ``record``.
+        """
+        results = []
+        batch = []
+        notifications = iter(notifications)
+        try:
+            for notification in notifications:
+                try:
+                    batch.append(self._deliver(notification))
+                except SMTPUnavailable as e:
+                    logging.error("SMTP server unavailable, deferring the rest of this run: %s", e)
+                    self._flush(batch, record, results)
+                    results.extend(
+                        DeliveryResult(pending["work_order_id"], "deferred", None, str(e))
+                        for pending in (notification, *notifications)
+                    )
+                    return results
+                if len(batch) >= self.batch_size:
+                    self._flush(batch, record, results)
+                    batch = []
+            self._flush(batch, record, results)
+        finally:
+            self.close()
+        return results
+
+    def _deliver(self, notification):
+        work_order_id = notification["work_order_id"]
+        try:
+            self._send(self.render(notification))
+        except SMTPUnavailable:
+            raise
+        except (smtplib.SMTPException, OSError, ValueError) as e:
+            logging.error("Notification for work order %s failed: %s", work_order_id, e)
+            return DeliveryResult(work_order_id, "failed", None, str(e))
+        return DeliveryResult(work_order_id, "sent", datetime.datetime.now(), None)
+
+    @staticmethod
+    def _flush(batch, record, results):
+        if not batch:
+            return
+        if record:
+            record(batch)
+        results.extend(batch)
+
+
+def send_due_notifications(dispatcher=None, calendar=None, now=None, progress=None):
+    """
+    Email every customer whose work order follow-up is due and not yet sent.
+
+    Returns:
+        list: DeliveryResults for this run.
+    """
+    # Deferred so the dispatcher itself can be used without a database.
+    from database import get_pending_notification_emails, record_notification_deliveries
+
+    now = now or datetime.datetime.now()
+    calendar = calendar or BusinessCalendar()
+    dispatcher = dispatcher or NotificationDispatcher.from_env()
+
+    rows = get_pending_notification_emails(now - FOLLOW_UP_DELAY)
+    due = [row for row in rows if calendar.next_open(row["created_at"] + FOLLOW_UP_DELAY) <= now]
+
+    def record(batch):
+        record_notification_deliveries(batch)
+        if progress:
+            progress(len(batch))
+
+    results = dispatcher.dispatch(due, record)
+    sent = sum(1 for result in results if result.status == "sent")
+    deferred = sum(1 for result in results if result.status == "deferred")
+    logging.info("Follow-up emails: %d sent, %d failed, %d deferred.",
+                 sent, len(results) - sent - deferred, deferred)
+    return results
@@ -0,0 +1,90 @@
+"""
+utils/parts_index.py
+
+In-memory autocomplete index over the parts catalog.
+
+Every part is filed under its part number and each word of its name (all
+lower-cased) in one sorted key list, so a prefix lookup is a binary search
+plus a short scan: instant even with tens of thousands of SKUs, and no
+database round trip per keystroke.
+
+Classes:
+    Part - One catalog entry.
+    PartsIndex - Sorted prefix index over Parts.
+"""
+
+import bisect
+import threading
+from collections import namedtuple
+
+Part = namedtuple("Part", ["id", "part_number", "name", "manufacturer", "model", "quantity_on_hand"])
+
+
+class PartsIndex:
+    """Prefix search over part numbers and name words."""
+
+    def __init__(self, parts=()):
+        self._lock = threading.Lock()
+        self._parts = {}  # id -> Part
+        self._keys = []   # sorted (key, part id)
+        self.replace(parts)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from catalog rows in Part field order (see database.get_parts_catalog)."""
+        return cls(Part(*row) for row in rows)
+
+    def __len__(self):
+        return len(self._parts)
+
+    def replace(self, parts):
+        """Swap in a freshly loaded catalog."""
+        parts = {part.id: part for part in parts}
+        keys = sorted(key for part in parts.values() for key in self._keys_for(part))
+        with self._lock:
+            self._parts, self._keys = parts, keys
+
+    @staticmethod
+    def _keys_for(part):
+        words = {(part.part_number or "").lower()}
+        words.update((part.name or "").lower().split())
+        return [(word, part.id) for word in words if word]
+
+    def get(self, part_id):
+        return self._parts.get(part_id)
+
+    def search(self, text, limit=20):
+        """
+        Parts whose part number or any name word starts with ``text``
+        (case-insensitive); further words in ``text`` must all match too.
+        Exact part-number matches come first.
+        """
+        terms = text.lower().split()
+        if not terms:
+            return []
+        with self._lock:
+            parts, keys = self._parts, self._keys
+        matches = None
+        for term in terms:
+            found = set()
+            for i in range(bisect.bisect_left(keys, (term, -1)), len(keys)):
+                key, part_id = keys[i]
+                if not key.startswith(term):
+                    break
+                found.add(part_id)
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+        first = terms[0]
+        ranked = sorted(
+            (parts[part_id] for part_id in matches),
+            key=lambda part: (part.part_number.lower() != first, part.part_number),
+        )
+        return ranked[:limit]
+
+    def adjust_stock(self, part_id, delta):
+        """Reflect a committed stock change without reloading the catalog."""
+        with self._lock:
+            part = self._parts.get(part_id)
+            if part is not None:
+                self._parts[part_id] = part._replace(quantity_on_hand=part.quantity_on_hand + delta)
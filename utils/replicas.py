@@ -0,0 +1,115 @@
+"""
+utils/replicas.py
+
+Read replica selection.
+
+Reads rotate round-robin over the replicas that are currently healthy. A
+replica that fails to connect, fails mid-query or falls too far behind the
+primary is taken out of rotation for ``retry_interval`` seconds; the health
+check (or the next read after that) brings it back.
+
+Classes:
+    Replica - One replica endpoint and its counters.
+    ReplicaSet - Round-robin choice among healthy replicas.
+"""
+
+import itertools
+import logging
+import threading
+import time
+
+
+class Replica:
+    __slots__ = ("host", "port", "down_until", "reads", "failures", "lag")
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.down_until = 0.0
+        self.reads = 0
+        self.failures = 0
+        self.lag = None  # seconds behind the primary at the last health check
+
+    @property
+    def name(self):
+        return f"{self.host}:{self.port}"
+
+    def healthy(self, now=None):
+        return (now or time.monotonic()) >= self.down_until
+
+
+class ReplicaSet:
+    """
+    Args:
+        endpoints: (host, port) pairs.
+        connect (callable): (host, port) -> connection; raises if unreachable.
+        retry_interval (float): Seconds a failed replica sits out.
+        max_lag (float): Replicas further behind than this (per the health
+            check) sit out too; None disables the lag check.
+    """
+
+    def __init__(self, endpoints, connect, retry_interval=30.0, max_lag=None):
+        self.replicas = [Replica(host, port) for host, port in endpoints]
+        self.connect = connect
+        self.retry_interval = retry_interval
+        self.max_lag = max_lag
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """(connection, replica) from the next healthy replica, or None if none is usable."""
+        now = time.monotonic()
+        start = next(self._next)
+        count = len(self.replicas)
+        for offset in range(count):
+            replica = self.replicas[(start + offset) % count]
+            if not replica.healthy(now):
+                continue
+            try:
+                connection = self.connect(replica.host, replica.port)
+            except Exception as e:  # pylint: disable=broad-except
+                self.mark_down(replica, e)
+                continue
+            with self._lock:
+                replica.reads += 1
+            return connection, replica
+        return None
+
+    def mark_down(self, replica, error):
+        with self._lock:
+            replica.failures += 1
+            replica.down_until = time.monotonic() + self.retry_interval
+        logging.warning("Read replica %s out of rotation for %.0fs: %s",
+                        replica.name, self.retry_interval, error)
+
+    def check(self, probe):
+        """
+        Health check every replica: ``probe(connection)`` runs a trivial query
+        and returns the replica's lag in seconds (or None if unknown).
+        """
+        for replica in self.replicas:
+            try:
+                connection = self.connect(replica.host, replica.port)
+                try:
+                    lag = probe(connection)
+                finally:
+                    connection.close()
+            except Exception as e:  # pylint: disable=broad-except
+                self.mark_down(replica, e)
+                continue
+            replica.lag = lag
+            if self.max_lag is not None and lag is not None and lag > self.max_lag:
+                self.mark_down(replica, f"{lag}s behind the primary")
+            elif not replica.healthy():
+                logging.info("Read replica %s back in rotation.", replica.name)
+                replica.down_until = 0.0
+
+    def stats(self):
+        now = time.monotonic()
+        return {
+            replica.name: {
+                "healthy": replica.healthy(now), "reads": replica.reads,
+                "failures": replica.failures, "lag": replica.lag,
+            }
+            for replica in self.replicas
+        }
@@ -0,0 +1,212 @@
+"""
+utils/reports.py
+
+Technician throughput and turnaround reports.
+
+Work order lifecycle rows are loaded in bulk as columns and reduced with
+array operations: per-technician completed counts, median and p90
+turnaround, and a histogram of how long open orders have been waiting.
+NumPy is used when installed; without it the same numbers are computed in
+plain Python (slower, but fine for small shops).
+
+Usage:
+    python -m utils.reports [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+
+Classes:
+    TechnicianStats - One technician's row of the report.
+    Report - A full report for a date range.
+    ReportCache - Recent reports keyed by date range, with a time-to-live.
+
+Functions:
+    - build_report(start, end, finished, backlog, now): Reduce lifecycle columns to a Report.
+    - format_report(report): Plain-text rendering for the command line.
+"""
+
+import datetime
+import math
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# Backlog age histogram bin edges, in days
+BACKLOG_EDGES_DAYS = (0, 1, 3, 7, 14, 30, math.inf)
+
+TechnicianStats = namedtuple("TechnicianStats", ["technician", "completed", "median_hours", "p90_hours"])
+# backlog: [(label, open orders in that age bin)]
+Report = namedtuple("Report", ["start", "end", "technicians", "backlog", "open_orders", "computed_at"])
+
+_np = None
+
+
+def _numpy():
+    """numpy, or None if it is not installed."""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _np = numpy
+    return _np or None
+
+
+def _bin_labels():
+    labels = []
+    for low, high in zip(BACKLOG_EDGES_DAYS, BACKLOG_EDGES_DAYS[1:]):
+        labels.append(f"{low}+ days" if high == math.inf else f"{low}-{high} days")
+    return labels
+
+
+def build_report(start, end, finished, backlog, now=None):
+    """
+    Args:
+        finished: Columns "technician", "created", "finished" (epoch seconds)
+            of orders completed in [start, end), e.g. a ColumnBatch.
+        backlog: Columns "technician", "created" of orders still open.
+        now (float): Epoch seconds backlog ages are measured at.
+
+    Returns:
+        Report, technicians ordered by completed count (most first).
+    """
+    now = time.time() if now is None else now
+    np = _numpy()
+    reduce = _reduce_numpy if np is not None else _reduce_python
+    stats, backlog_counts = reduce(finished, backlog, now)
+    stats.sort(key=lambda row: (-row.completed, row.technician))
+    return Report(start, end, stats, list(zip(_bin_labels(), backlog_counts)), sum(backlog_counts), now)
+
+
+def _reduce_numpy(finished, backlog, now):
+    np = _numpy()
+    stats = []
+    if len(finished):
+        # Technician names -> small integer codes (one dict lookup per row
+        # beats sorting Python strings inside np.unique)
+        codes = {}
+        technicians = finished["technician"]
+        group = np.fromiter(
+            (codes.setdefault(name, len(codes)) for name in technicians),
+            dtype=np.int64, count=len(technicians),
+        )
+        names = list(codes)
+        hours = (np.asarray(finished["finished"], dtype=np.float64)
+                 - np.asarray(finished["created"], dtype=np.float64)) / 3600.0
+        # Sort by technician, then turnaround: each group becomes a sorted run
+        order = np.lexsort((hours, group))
+        hours = hours[order]
+        counts = np.bincount(group, minlength=len(names))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        def quantile(q):
+            position = starts + (counts - 1) * q
+            low = np.floor(position).astype(np.int64)
+            high = np.ceil(position).astype(np.int64)
+            return hours[low] + (hours[high] - hours[low]) * (position - low)
+
+        medians, p90s = quantile(0.5), quantile(0.9)
+        stats = [
+            TechnicianStats(str(name), int(count), float(median), float(p90))
+            for name, count, median, p90 in zip(names, counts, medians, p90s)
+        ]
+    ages = (now - np.asarray(backlog["created"], dtype=np.float64)) / 86400.0 if len(backlog) else np.empty(0)
+    histogram, _ = np.histogram(np.clip(ages, 0, None), bins=np.array(BACKLOG_EDGES_DAYS, dtype=np.float64))
+    return stats, [int(n) for n in histogram]
+
+
+def _quantile(values, q):
+    """Linear-interpolated quantile of sorted ``values`` (numpy's default method)."""
+    position = (len(values) - 1) * q
+    low, high = math.floor(position), math.ceil(position)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def _reduce_python(finished, backlog, now):
+    by_technician = {}
+    for technician, created, done in zip(finished["technician"], finished["created"], finished["finished"]):
+        by_technician.setdefault(str(technician), []).append((float(done) - float(created)) / 3600.0)
+    stats = []
+    for technician, hours in by_technician.items():
+        hours.sort()
+        stats.append(TechnicianStats(technician, len(hours), _quantile(hours, 0.5), _quantile(hours, 0.9)))
+    counts = [0] * (len(BACKLOG_EDGES_DAYS) - 1)
+    for created in backlog["created"]:
+        age = max(0.0, (now - float(created)) / 86400.0)
+        for i, high in enumerate(BACKLOG_EDGES_DAYS[1:]):
+            if age < high:
+                counts[i] += 1
+                break
+    return stats, counts
+
+
+class ReportCache:
+    """Reports keyed by ``(start, end)``; entries expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries=16, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> Report
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            report = self._entries.get(key)
+            if report is None:
+                return None
+            if time.time() - report.computed_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return report
+
+    def put(self, key, report):
+        with self._lock:
+            self._entries[key] = report
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def format_report(report):
+    """Plain-text table of a Report."""
+    lines = [
+        f"Technician report {report.start:%Y-%m-%d} to {report.end:%Y-%m-%d}",
+        "",
+        f"{'Technician':<20} {'Completed':>9} {'Median h':>9} {'P90 h':>9}",
+    ]
+    for row in report.technicians:
+        lines.append(f"{row.technician:<20} {row.completed:>9} {row.median_hours:>9.1f} {row.p90_hours:>9.1f}")
+    lines += ["", f"Open orders: {report.open_orders}"]
+    lines += [f"  {label:<12} {count:>6}" for label, count in report.backlog]
+    return "\n".join(lines)
+
+
+def _date(text):
+    return datetime.datetime.strptime(text, "%Y-%m-%d")
+
+
+def main(argv=None):
+    import argparse  # pylint: disable=import-outside-toplevel
+    today = datetime.datetime.combine(datetime.date.today(), datetime.time())
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--from", dest="start", type=_date, default=today - datetime.timedelta(days=365))
+    parser.add_argument("--to", dest="end", type=_date, default=today + datetime.timedelta(days=1),
+                        help="exclusive end date (default: tomorrow)")
+    args = parser.parse_args(argv)
+
+    from database import DatabaseError, get_technician_report  # pylint: disable=import-outside-toplevel
+    try:
+        report = get_technician_report(args.start, args.end)
+    except DatabaseError as e:
+        print(f"Report failed: {e}", file=sys.stderr)
+        return 1
+    print(format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
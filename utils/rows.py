@@ -0,0 +1,129 @@
+"""
+utils/rows.py
+
+Row factories for query results.
+
+Every factory takes the column names from ``cursor.description`` and the raw
+driver rows and returns the shape callers work with:
+
+    - tuple_rows: the driver's plain tuples, unchanged.
+    - record_rows: compact ``__slots__`` records (tuple subclasses) that
+      support both ``row[0]`` and ``row["column"]``.
+    - columnar_rows: one ColumnBatch holding each column in a single
+      array, for large result sets kept in memory.
+
+Classes:
+    ColumnBatch - Column-major, array-backed result set.
+"""
+
+from array import array
+from functools import lru_cache
+
+
+@lru_cache(maxsize=256)
+def record_class(fields):
+    """
+    Return a tuple subclass for ``fields`` (cached per column tuple).
+
+    Instances carry no per-row dict, so they cost the same as a plain tuple,
+    and still unpack, compare and feed Treeview ``values=`` like one.
+    """
+    index = {name: i for i, name in enumerate(fields)}
+
+    class Record(tuple):
+        __slots__ = ()
+        _fields = fields
+
+        def __getitem__(self, key):
+            if isinstance(key, str):
+                return tuple.__getitem__(self, index[key])
+            return tuple.__getitem__(self, key)
+
+        def get(self, key, default=None):
+            """Mapping-style lookup by column name."""
+            position = index.get(key)
+            return default if position is None else tuple.__getitem__(self, position)
+
+        def keys(self):
+            return self._fields
+
+        def _asdict(self):
+            return dict(zip(self._fields, self))
+
+        def __repr__(self):
+            pairs = ", ".join(f"{name}={value!r}" for name, value in zip(self._fields, self))
+            return f"Record({pairs})"
+
+    return Record
+
+
+def tuple_rows(fields, rows):  # pylint: disable=unused-argument
+    return rows
+
+
+def record_rows(fields, rows):
+    cls = record_class(tuple(fields))
+    return [cls(row) for row in rows]
+
+
+def columnar_rows(fields, rows):
+    return ColumnBatch(fields, rows)
+
+
+def _pack_column(values):
+    """Store all-int or all-float columns in a typed array; anything else as a tuple."""
+    if values and all(type(v) is int for v in values):  # pylint: disable=unidiomatic-typecheck
+        try:
+            return array("q", values)
+        except OverflowError:
+            return tuple(values)
+    if values and all(type(v) is float for v in values):  # pylint: disable=unidiomatic-typecheck
+        return array("d", values)
+    return tuple(values)
+
+
+class ColumnBatch:
+    """
+    Column-major result set.
+
+    Integer and float columns are kept in ``array`` buffers instead of one
+    Python object per cell. Indexing by position returns a record for that
+    row; indexing by name returns the whole column.
+    """
+
+    __slots__ = ("_fields", "_index", "_columns", "_length")
+
+    def __init__(self, fields, rows):
+        self._fields = tuple(fields)
+        self._index = {name: i for i, name in enumerate(self._fields)}
+        rows = list(rows)
+        self._length = len(rows)
+        if rows:
+            self._columns = [_pack_column(column) for column in zip(*rows)]
+        else:
+            self._columns = [() for _ in self._fields]
+
+    @property
+    def fields(self):
+        return self._fields
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._columns[self._index[key]]
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("ColumnBatch index out of range")
+        return record_class(self._fields)(column[key] for column in self._columns)
+
+    def __iter__(self):
+        cls = record_class(self._fields)
+        for row in zip(*self._columns):
+            yield cls(row)
+
+    def column(self, name):
+        """All values of one column (array or tuple)."""
+        return self._columns[self._index[name]]
@@ -0,0 +1,89 @@
+"""
+utils/schema.py
+
+Cached schema capability detection.
+
+The catalog reads information_schema once and remembers which tables and
+columns exist, so query builders can pick the right column list up front
+instead of trying an extended query and falling back on failure.
+
+Classes:
+    SchemaCatalog - Table/column cache with helpers for building column lists.
+"""
+
+import logging
+import threading
+import time
+
+
+class SchemaCatalog:
+    """Cache of the tables and columns present in the connected database."""
+
+    def __init__(self, retry_interval=60.0):
+        self.retry_interval = retry_interval
+        self._tables = None
+        self._last_failure = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._tables is not None
+
+    def load(self, fetch_all, database):
+        """
+        Read information_schema for ``database`` using ``fetch_all``.
+
+        Failures are logged and leave the catalog unloaded; another attempt is
+        made at most once per ``retry_interval`` seconds.
+        """
+        with self._lock:
+            if self._tables is not None:
+                return True
+            if self._last_failure and time.monotonic() - self._last_failure < self.retry_interval:
+                return False
+            try:
+                rows = fetch_all(
+                    """
+                    SELECT table_name, column_name
+                    FROM information_schema.columns
+                    WHERE table_schema = %s
+                    ORDER BY table_name, ordinal_position
+                    """,
+                    (database,),
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                logging.error("Schema introspection failed: %s", e)
+                self._last_failure = time.monotonic()
+                return False
+
+            tables = {}
+            for table_name, column_name in rows:
+                tables.setdefault(table_name.lower(), []).append(column_name.lower())
+            self._tables = {name: tuple(cols) for name, cols in tables.items()}
+            logging.info("Schema catalog loaded: %d tables", len(self._tables))
+            return True
+
+    def invalidate(self):
+        """Forget the cached schema (e.g. after a migration)."""
+        with self._lock:
+            self._tables = None
+            self._last_failure = None
+
+    def has_table(self, table):
+        return bool(self._tables) and table.lower() in self._tables
+
+    def has_column(self, table, column):
+        return column.lower() in self.columns(table)
+
+    def columns(self, table):
+        """Columns of ``table`` in ordinal order (empty if unknown)."""
+        if not self._tables:
+            return ()
+        return self._tables.get(table.lower(), ())
+
+    def pick_columns(self, table, base, optional=()):
+        """
+        Build a column list: every ``base`` column plus the ``optional`` ones
+        the table actually has. Only ``base`` is returned while unloaded.
+        """
+        return list(base) + [col for col in optional if self.has_column(table, col)]
@@ -0,0 +1,104 @@
+"""
+utils/service_client.py
+
+Client for the shared-cache service (service.py).
+
+A terminal in client mode sends its cacheable reads to the service instead
+of MariaDB, and tells the service which data it has just changed so every
+terminal's next read sees the write. One keep-alive HTTP connection is
+kept per thread.
+
+If the service cannot be reached the client raises ServiceUnavailable and
+stays "down" for ``retry_interval`` seconds, so callers fall back to the
+database directly without paying a connect timeout on every call.
+
+Classes:
+    ServiceUnavailable - The service could not be reached.
+    ServiceCallError - The service ran the operation and it failed.
+    ServiceClient - Calls operations and posts invalidations.
+"""
+
+import json
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+from utils import wire
+
+
+class ServiceUnavailable(ConnectionError):
+    """The service could not be reached (callers fall back to the database)."""
+
+
+class ServiceCallError(Exception):
+    """An operation failed inside the service; ``kind`` is the remote exception class name."""
+
+    def __init__(self, kind, message):
+        super().__init__(message)
+        self.kind = kind
+
+
+class ServiceClient:
+    """HTTP/JSON client for one service URL, e.g. ``http://127.0.0.1:8765``."""
+
+    def __init__(self, url, timeout=5.0, retry_interval=30.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self._local = threading.local()
+        self._down_until = 0.0
+
+    def _connection(self):
+        import http.client  # pylint: disable=import-outside-toplevel
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def _post(self, path, body):
+        if time.monotonic() < self._down_until:
+            raise ServiceUnavailable("Service marked unavailable; retrying later.")
+        # http.client costs ~30 ms to import; only client mode needs it
+        import http.client  # pylint: disable=import-outside-toplevel
+        payload = body.encode("utf-8")
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request("POST", path, payload, {"Content-Type": "application/json"})
+                response = connection.getresponse()
+                return response.status, response.read().decode("utf-8")
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                self._local.connection = None
+                # A keep-alive connection the server closed: retry once on a fresh one
+                if attempt == 0 and isinstance(e, (http.client.RemoteDisconnected, BrokenPipeError,
+                                                   ConnectionResetError)):
+                    continue
+                self._down_until = time.monotonic() + self.retry_interval
+                logging.warning("Cache service %s:%s unreachable: %s", self.host, self.port, e)
+                raise ServiceUnavailable(str(e)) from e
+        raise ServiceUnavailable("Service connection failed.")
+
+    def call(self, op, args=(), kwargs=None):
+        """Run read operation ``op`` through the service and return its decoded result."""
+        body = json.dumps({"op": op, "args": wire.encode(list(args)), "kwargs": wire.encode(kwargs or {})})
+        status, text = self._post("/call", body)
+        reply = json.loads(text)
+        if status != 200 or not reply.get("ok"):
+            raise ServiceCallError(reply.get("type", "Error"), reply.get("error", f"HTTP {status}"))
+        return wire.decode(reply["result"])
+
+    def invalidate(self, tags):
+        """Tell the service these tables changed; best effort."""
+        try:
+            self._post("/invalidate", json.dumps({"tags": sorted(tags)}))
+        except ServiceUnavailable:
+            pass  # entries still expire by TTL
+
+    def stats(self):
+        status, text = self._post("/stats", "{}")
+        return json.loads(text) if status == 200 else {}
@@ -0,0 +1,64 @@
+"""
+utils/session.py
+
+Login-time prefetch of session data.
+
+As soon as a user is authenticated, the data the main window shows first
+(dashboard metrics, assigned work orders, messages, pick lists) is loaded
+concurrently on a small thread pool while the window is being built. The
+window then reads each value from the cache instead of querying serially.
+
+Classes:
+    SessionCache - Named values loading concurrently in the background.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+
+class SessionCache:
+    """
+    Run ``loaders`` (name -> callable) concurrently and hold their results.
+
+    Reading a value waits for its loader if it is still running; a loader
+    that failed yields the default, so callers can fall back to a direct query.
+    """
+
+    def __init__(self, loaders, max_workers=4):
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="session-prefetch")
+        self._futures = {name: self._executor.submit(loader) for name, loader in loaders.items()}
+        # Let the workers finish in the background; no new work is submitted.
+        self._executor.shutdown(wait=False)
+
+    def __contains__(self, name):
+        return name in self._futures
+
+    def done(self, name):
+        """True once ``name`` has finished loading (successfully or not)."""
+        future = self._futures.get(name)
+        return future is not None and future.done()
+
+    def get(self, name, default=None, timeout=None):
+        """
+        The prefetched value for ``name``.
+
+        Waits up to ``timeout`` seconds (forever if None) for it to load, and
+        returns ``default`` if it is unknown, failed, or not ready in time.
+        """
+        future = self._futures.get(name)
+        if future is None:
+            return default
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            return default
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning("Session prefetch of %s failed: %s", name, e)
+            return default
+
+    def when_ready(self, name, callback):
+        """Call ``callback(value)`` (on a worker thread) once ``name`` has loaded."""
+        future = self._futures.get(name)
+        if future is None:
+            return
+        future.add_done_callback(lambda _future: callback(self.get(name)))
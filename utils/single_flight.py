@@ -0,0 +1,70 @@
+"""
+utils/single_flight.py
+
+Request coalescing for concurrent identical calls.
+
+When several threads ask for the same thing at the same moment (a dashboard
+refresh and the login prefetch both loading metrics, two panes loading one
+customer's orders), the first caller runs the query and the others wait for
+its result instead of issuing their own. Nothing is cached: once the call
+finishes, the next caller runs it again.
+
+Classes:
+    SingleFlight - Shares one in-flight execution per key.
+"""
+
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """``do(key, func)`` runs ``func`` once per key at a time; concurrent callers share it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0  # calls that ran func
+        self.shared = 0    # calls that waited for another caller's result instead
+
+    def do(self, key, func):
+        """
+        Returns:
+            tuple: (result, shared) where ``shared`` is True if another
+            caller's execution was reused. Its exception is re-raised too.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self):
+        with self._lock:
+            return {"executed": self.executed, "shared": self.shared, "in_flight": len(self._calls)}
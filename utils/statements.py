@@ -0,0 +1,103 @@
+"""
+utils/statements.py
+
+Server-side prepared statement caching.
+
+Each connection keeps its own LRU of prepared cursors keyed by SQL text, so
+a hot lookup (customer by barcode, work order by scan code) is parsed and
+planned by the server once per pooled connection instead of on every call.
+Evicting a statement closes its cursor, which frees it on the server.
+Statements only survive between checkouts if the pool does not reset the
+session (see database._statements_reusable()).
+
+Classes:
+    StatementCache - Per-connection LRU of prepared cursors with hit counters.
+"""
+
+import threading
+from collections import OrderedDict
+
+_ATTRIBUTE = "_prepared_statements"
+
+
+class StatementCache:
+    """
+    Args:
+        capacity (int): Prepared statements kept per connection; 0 disables
+            caching (every call gets a fresh cursor).
+        prepare (callable): connection -> new prepared cursor.
+    """
+
+    def __init__(self, capacity, prepare):
+        self.capacity = capacity
+        self.prepare = prepare
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _statements(connection):
+        # Kept on the connection itself: a pooled connection carries its
+        # statements from one checkout to the next, and a closed one takes
+        # them with it when it is collected.
+        statements = getattr(connection, _ATTRIBUTE, None)
+        if statements is None:
+            statements = OrderedDict()  # sql -> cursor, least recently used first
+            try:
+                setattr(connection, _ATTRIBUTE, statements)
+            except AttributeError:  # connection type takes no attributes: don't cache
+                return None
+        return statements
+
+    def cursor(self, connection, sql):
+        """
+        A prepared cursor for ``sql`` on ``connection``, reused if this
+        connection prepared the same text before. A connection is used by
+        one thread at a time, so its cursors are never shared concurrently.
+        """
+        if self.capacity <= 0:
+            return self.prepare(connection)
+        with self._lock:
+            statements = self._statements(connection)
+            if statements is None:
+                self.misses += 1
+                return self.prepare(connection)
+            cursor = statements.get(sql)
+            if cursor is not None:
+                statements.move_to_end(sql)
+                self.hits += 1
+                return cursor
+            self.misses += 1
+            cursor = statements[sql] = self.prepare(connection)
+            evicted = []
+            while len(statements) > self.capacity:
+                evicted.append(statements.popitem(last=False)[1])
+                self.evictions += 1
+        for old in evicted:
+            _close(old)
+        return cursor
+
+    def discard(self, connection, sql):
+        """Forget (and close) a statement after it failed, so the next call re-prepares it."""
+        with self._lock:
+            statements = self._statements(connection)
+            cursor = statements.pop(sql, None) if statements else None
+        if cursor is not None:
+            _close(cursor)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "capacity": self.capacity, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+def _close(cursor):
+    try:
+        cursor.close()
+    except Exception:  # pylint: disable=broad-except
+        pass  # the connection may already be gone
@@ -0,0 +1,109 @@
+"""
+utils/thumbnails.py
+
+On-disk LRU cache of attachment previews.
+
+Each image attachment is downscaled once to a small PNG named after its
+SHA-256, so reopening a work order shows previews without decoding the
+full-size photos again. Hits refresh the file's mtime; when the cache grows
+past its byte budget the least recently used previews are deleted.
+
+Pillow is optional and imported on first use. Without it (or for files
+that are not images) no preview is made and callers show the name only.
+
+Classes:
+    ThumbnailCache - Generates and caches previews keyed by content hash.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+
+_pil_image = None
+
+
+def _pillow():
+    """PIL.Image, or None if Pillow is not installed."""
+    global _pil_image
+    if _pil_image is None:
+        try:
+            from PIL import Image
+        except ImportError:
+            logging.info("Pillow not installed; attachment previews disabled.")
+            Image = False
+        _pil_image = Image
+    return _pil_image or None
+
+
+class ThumbnailCache:
+    """Previews of at most ``size`` pixels a side, capped at ``max_bytes`` on disk."""
+
+    def __init__(self, root, size=64, max_bytes=64 * 1024 * 1024):
+        self.root = os.path.abspath(root)
+        self.size = size
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes = None           # current cache size, scanned on first write
+        self._not_images = set()     # hashes Pillow could not open
+
+    def path_for(self, sha256):
+        return os.path.join(self.root, f"{sha256}-{self.size}.png")
+
+    def get(self, sha256, source_path):
+        """Path of the preview PNG, generating it on first request; None if there is none."""
+        if not sha256 or sha256 in self._not_images:
+            return None
+        path = self.path_for(sha256)
+        try:
+            os.utime(path)  # mark as recently used
+            return path
+        except FileNotFoundError:
+            pass
+        return self._generate(sha256, source_path, path)
+
+    def _generate(self, sha256, source_path, path):
+        image_module = _pillow()
+        if image_module is None:
+            return None
+        os.makedirs(self.root, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.root, prefix="thumb-", suffix=".png")
+        os.close(fd)
+        try:
+            with image_module.open(source_path) as image:
+                image.thumbnail((self.size, self.size))
+                image.save(temp_path, "PNG")
+            os.replace(temp_path, path)
+        except (OSError, ValueError) as e:  # not an image, truncated, missing file
+            os.unlink(temp_path)
+            logging.debug("No preview for %s: %s", source_path, e)
+            self._not_images.add(sha256)
+            return None
+        self._account(os.path.getsize(path))
+        return path
+
+    def _account(self, added):
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(entry.stat().st_size for entry in self._entries())
+            else:
+                self._bytes += added
+            if self._bytes <= self.max_bytes:
+                return
+            # Evict least recently used down to 80% of the budget
+            entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+            for entry in entries:
+                if self._bytes <= self.max_bytes * 0.8:
+                    break
+                try:
+                    size = entry.stat().st_size
+                    os.unlink(entry.path)
+                    self._bytes -= size
+                except FileNotFoundError:
+                    pass
+
+    def _entries(self):
+        return [
+            entry for entry in os.scandir(self.root)
+            if entry.is_file() and not entry.name.startswith("thumb-")
+        ]
@@ -0,0 +1,86 @@
+"""
+utils/wire.py
+
+JSON encoding of query results for the shared-cache service.
+
+Results cross the wire with their Python shape intact: records come back as
+records (index and column-name access), tuples as tuples, and datetimes,
+dates and Decimals as themselves. Lists of records from one query send
+their column names once.
+
+Functions:
+    - encode(value): Python result -> JSON-compatible structure.
+    - decode(data): The inverse of encode.
+    - dumps(value) / loads(text): encode/decode to and from JSON text.
+"""
+
+import datetime
+import json
+from decimal import Decimal
+
+from utils.rows import record_class
+
+
+def _is_record(value):
+    return isinstance(value, tuple) and hasattr(value, "_fields") and hasattr(value, "keys")
+
+
+def encode(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, datetime.datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, datetime.timedelta):
+        return {"$td": value.total_seconds()}
+    if isinstance(value, Decimal):
+        return {"$dec": str(value)}
+    if _is_record(value):
+        return {"$r": list(value._fields), "v": [encode(v) for v in value]}
+    if isinstance(value, tuple):
+        return {"$t": [encode(v) for v in value]}
+    if isinstance(value, list):
+        if value and all(_is_record(v) for v in value) and len({v._fields for v in value}) == 1:
+            return {"$rs": list(value[0]._fields), "v": [[encode(c) for c in v] for v in value]}
+        return [encode(v) for v in value]
+    if isinstance(value, dict):
+        return {"$m": [[encode(k), encode(v)] for k, v in value.items()]}
+    raise TypeError(f"Cannot encode {type(value).__name__} for the wire")
+
+
+def decode(data):
+    if isinstance(data, list):
+        return [decode(v) for v in data]
+    if not isinstance(data, dict):
+        return data
+    if "$rs" in data:
+        cls = record_class(tuple(data["$rs"]))
+        return [cls(decode(c) for c in row) for row in data["v"]]
+    if "$r" in data:
+        return record_class(tuple(data["$r"]))(decode(v) for v in data["v"])
+    if "$t" in data:
+        return tuple(decode(v) for v in data["$t"])
+    if "$m" in data:
+        return {_hashable(decode(k)): decode(v) for k, v in data["$m"]}
+    if "$dt" in data:
+        return datetime.datetime.fromisoformat(data["$dt"])
+    if "$d" in data:
+        return datetime.date.fromisoformat(data["$d"])
+    if "$td" in data:
+        return datetime.timedelta(seconds=data["$td"])
+    if "$dec" in data:
+        return Decimal(data["$dec"])
+    raise ValueError(f"Unknown wire object: {sorted(data)}")
+
+
+def _hashable(key):
+    return tuple(key) if isinstance(key, list) else key
+
+
+def dumps(value):
+    return json.dumps(encode(value), separators=(",", ":"), sort_keys=True)
+
+
+def loads(text):
+    return decode(json.loads(text))